@@ -0,0 +1,163 @@
+import hashlib
+import re
+import sqlite3
+import time
+from typing import Dict, Iterable, Optional
+
+from event_store import STOPWORDS, Event
+from log_clusters import tokenize
+
+# --- Answer cache ---
+# Help-desk questions repeat, and so do the error events behind them. An
+# answer is cached under the normalised question plus a fingerprint of the
+# events that were retrieved for it, as (source, event ID, message template).
+# When the relevant events change, the fingerprint changes and the old answer
+# is no longer found; the next answer for that question replaces it. A
+# question that is worded differently but has nearly the same words (Jaccard
+# similarity of the normalised words) can reuse an answer for the same
+# fingerprint. Entries expire after a TTL, and the least recently used ones
+# are evicted beyond max_entries. Only standalone questions should be looked
+# up: a follow-up ("why does it do that?") means something else in another
+# conversation.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS answers (
+    question TEXT NOT NULL,      -- normalised
+    fingerprint TEXT NOT NULL,
+    original TEXT NOT NULL,      -- as asked
+    answer TEXT NOT NULL,
+    created REAL NOT NULL,
+    used REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (question, fingerprint)
+);
+CREATE INDEX IF NOT EXISTS answers_fingerprint ON answers (fingerprint);
+CREATE INDEX IF NOT EXISTS answers_used ON answers (used);
+"""
+
+_SUFFIXES = ("ing", "ed", "es", "s")
+NEGATIONS = {"no", "not", "never", "without"}
+# Words that point back at earlier turns
+FOLLOW_UP = set("""again also above earlier else instead it its previous same that them these they this
+those too""".split())
+
+
+def _stem(word: str) -> str:
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[:-len(suffix)]
+            # stopped -> stopp -> stop
+            if len(word) > 3 and word[-1] == word[-2] and word[-1] not in "aeiouls":
+                word = word[:-1]
+            return word
+    return word
+
+
+def normalize_question(question: str) -> str:
+    # Lower case, no stopwords, crude stems, sorted unique: "Why does my
+    # laptop keep crashing?" and "laptop crashes, why?" both give "crash"
+    words = {_stem(w) for w in re.findall(r"\w+", question.lower()) if w not in STOPWORDS}
+    return " ".join(sorted(words))
+
+
+def is_standalone(question: str) -> bool:
+    # False when the question refers to something said earlier in the
+    # conversation; a false alarm only costs a cache lookup
+    words = re.findall(r"\w+", question.lower())
+    if words[:1] in (["and"], ["but"], ["so"], ["then"]) or words[:2] in (["what", "about"], ["how", "about"]):
+        return False
+    return not FOLLOW_UP.intersection(words)
+
+
+def fingerprint(events: Iterable[Event], miner=None) -> str:
+    # Templates come from the store's TemplateMiner when the events carry a
+    # cluster ID, so repeats with other variable parts keep the fingerprint;
+    # otherwise the message with its variables masked stands in
+    clusters = miner.clusters if miner is not None else {}
+    kinds = set()
+    for ev in events:
+        cluster = clusters.get(ev.template)
+        template = cluster.template if cluster is not None else " ".join(tokenize(ev.message))
+        kinds.add(f"{ev.source}\x1f{ev.event_id}\x1f{template}")
+    kinds = sorted(kinds)
+    return hashlib.sha1("\x1e".join(kinds).encode()).hexdigest()
+
+
+def _jaccard(a: str, b: str) -> float:
+    a, b = set(a.split()), set(b.split())
+    if a & NEGATIONS != b & NEGATIONS:
+        # "disk not failing" is never a rewording of "disk failing"
+        return 0.0
+    return len(a & b) / len(a | b) if a | b else 0.0
+
+
+class AnswerCache:
+    def __init__(self, path: str = ":memory:", ttl: float = 7 * 86400, max_entries: int = 1000,
+                 similarity: Optional[float] = 0.7):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.similarity = similarity  # None: exact question matches only
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+        self.counts: Dict[str, int] = {"hits": 0, "near_hits": 0, "misses": 0,
+                                       "invalidated": 0, "expired": 0, "evicted": 0}
+
+    def get(self, question: str, fp: str) -> Optional[str]:
+        norm = normalize_question(question)
+        if not norm:
+            return None
+        now = time.time()
+        with self.db:
+            self.counts["expired"] += self.db.execute("DELETE FROM answers WHERE created < ?",
+                                                      (now - self.ttl,)).rowcount
+            row = self.db.execute("SELECT question, answer FROM answers WHERE question = ? AND fingerprint = ?",
+                                  (norm, fp)).fetchone()
+            kind = "hits"
+            if row is None and self.similarity is not None:
+                # Near-duplicate wording, same events
+                best = None
+                for q, answer in self.db.execute("SELECT question, answer FROM answers WHERE fingerprint = ?", (fp,)):
+                    sim = _jaccard(norm, q)
+                    if sim >= self.similarity and (best is None or sim > best[0]):
+                        best = (sim, q, answer)
+                if best is not None:
+                    row, kind = best[1:], "near_hits"
+            if row is None:
+                self.counts["misses"] += 1
+                return None
+            self.db.execute("UPDATE answers SET used = ?, hits = hits + 1 WHERE question = ? AND fingerprint = ?",
+                            (now, row[0], fp))
+        self.counts[kind] += 1
+        return row[1]
+
+    def put(self, question: str, fp: str, answer: str):
+        norm = normalize_question(question)
+        if not norm:
+            return
+        now = time.time()
+        with self.db:
+            # Answers to this question for other events are out of date
+            self.counts["invalidated"] += self.db.execute(
+                "DELETE FROM answers WHERE question = ? AND fingerprint != ?", (norm, fp)).rowcount
+            self.db.execute("INSERT OR REPLACE INTO answers (question, fingerprint, original, answer, created, used) "
+                            "VALUES (?, ?, ?, ?, ?, ?)", (norm, fp, question, answer, now, now))
+            excess = self.db.execute("SELECT count(*) FROM answers").fetchone()[0] - self.max_entries
+            if excess > 0:
+                self.counts["evicted"] += self.db.execute(
+                    "DELETE FROM answers WHERE rowid IN (SELECT rowid FROM answers ORDER BY used LIMIT ?)",
+                    (excess,)).rowcount
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.counts["hits"] + self.counts["near_hits"] + self.counts["misses"]
+        entries = self.db.execute("SELECT count(*) FROM answers").fetchone()[0]
+        hit_rate = (self.counts["hits"] + self.counts["near_hits"]) / lookups if lookups else 0.0
+        return {**self.counts, "entries": entries, "hit_rate": round(hit_rate, 3)}
+
+    def clear(self):
+        with self.db:
+            self.db.execute("DELETE FROM answers")
+
+    def close(self):
+        self.db.close()
@@ -1,117 +1,187 @@
-import win32evtlog
-import win32evtlogutil
-import win32con
-import datetime
-import sys
+import os
+import time
 import argparse
 from typing import List, Dict
 from openai import OpenAI
+from event_store import CHANNELS, EventStore, open_source
+from extractor import Win32Source
+from retrieval import Retriever
+from log_clusters import TemplateMiner
+from llm import BASE_URL, REQUEST_ERRORS, SYSTEM_PROMPT, Reply, stream_chat, user_message
+from conversation import Conversation, strip_reasoning
+from answer_cache import AnswerCache, fingerprint, is_standalone
 
 # --- CLI parsing for fresh context ---
+HERE = os.path.dirname(os.path.abspath(__file__))
 parser = argparse.ArgumentParser()
 parser.add_argument(
     "--new-context",
     action="store_true",
-    help="Start with a fresh in-memory history"
+    help="Start with a fresh history instead of continuing the saved session"
+)
+parser.add_argument(
+    "--session",
+    default=os.path.join(HERE, "armbot_session.json"),
+    help="Where the conversation is saved between runs"
+)
+parser.add_argument(
+    "--history-budget",
+    type=int,
+    default=2048,
+    help="Token budget for the conversation sent with each question (older turns are summarised)"
+)
+parser.add_argument(
+    "--index",
+    default=os.path.join(HERE, "armbot_events.db"),
+    help="SQLite event index, kept between runs"
+)
+parser.add_argument(
+    "--logs",
+    nargs="+",
+    metavar="FILE",
+    help="Ingest exported logs (.evtx, .xml, .json/.jsonl) instead of the live event log"
+)
+parser.add_argument(
+    "--question",
+    help="Ask one question and exit instead of starting the interactive session"
+)
+parser.add_argument(
+    "--log-budget",
+    type=int,
+    default=768,
+    help="Token budget for the log entries sent with each question"
+)
+parser.add_argument(
+    "--cache",
+    default=os.path.join(HERE, "armbot_answers.db"),
+    help="SQLite answer cache, kept between runs"
+)
+parser.add_argument(
+    "--no-cache",
+    action="store_true",
+    help="Always ask the model, without reading or storing cached answers"
+)
+parser.add_argument(
+    "--cache-ttl-hours",
+    type=float,
+    default=24 * 7,
+    help="How long a cached answer is reused"
 )
 args = parser.parse_args()
 
-# --- Extract recent system logs ---
-def extract_windows_logs(log_type: str = "System", max_entries: int = 20) -> List[str]:
-    valid = ["System", "Application", "Security"]
-    if log_type not in valid:
-        raise ValueError(f"Invalid log type. Must be one of {valid}")
-    try:
-        hand = win32evtlog.OpenEventLog("localhost", log_type)
-    except Exception as e:
-        print(f"Error opening event log: {e}")
-        return []
-    flags = win32evtlog.EVENTLOG_BACKWARDS_READ | win32evtlog.EVENTLOG_SEQUENTIAL_READ
-    levels = {
-        win32con.EVENTLOG_ERROR_TYPE: "ERROR",
-        win32con.EVENTLOG_WARNING_TYPE: "WARNING",
-        win32con.EVENTLOG_INFORMATION_TYPE: "INFO"
-    }
-    logs = []
-    try:
-        events = win32evtlog.ReadEventLog(hand, flags, 0)
-        for i, ev in enumerate(events):
-            if i >= max_entries:
-                break
-            lvl = ev.EventType
-            if lvl not in levels:
-                continue
-            ts = datetime.datetime.strptime(
-                ev.TimeGenerated.Format(), '%a %b %d %H:%M:%S %Y'
-            ).isoformat()
-            msg = win32evtlogutil.SafeFormatMessage(ev, log_type) or "No message available"
-            logs.append(f"[{ts}] {levels[lvl]} - {ev.SourceName}: {msg.strip()}")
-    except Exception as e:
-        print(f"Error reading event log: {e}")
-    finally:
-        win32evtlog.CloseEventLog(hand)
-    return logs
+# --- Ingest new events into the local index ---
+# Repeated events are clustered into templates as they are stored
+store = EventStore(args.index, miner=TemplateMiner())
 
-logs = extract_windows_logs("System", max_entries=15)
-log_block = "\n".join(logs) if logs else ""
+def ingest_logs(channels: List[str] = CHANNELS) -> Dict[str, int]:
+    sources = [open_source(path) for path in args.logs] if args.logs else [Win32Source(channels)]
+    added: Dict[str, int] = {}
+    for source in sources:
+        try:
+            for channel, n in store.ingest(source).items():
+                added[channel] = added.get(channel, 0) + n
+        except Exception as e:
+            # Whatever was stored before the failure stays in the index
+            print(f"Error reading event log: {e}")
+    return added
 
-# --- In-memory chat buffer ---
-messages: List[Dict] = []
-if args.new_context:
-    messages.clear()
-    print("Context cleared — starting fresh.")
+ingest_logs()
+
+# Log entries are picked per question from all channels
+retriever = Retriever(store, budget=args.log_budget)
 
-# Minimal system prompt
-messages = []
+# --- Conversation memory (saved between runs) ---
+conversation = Conversation(SYSTEM_PROMPT, budget=args.history_budget, path=args.session)
 if args.new_context:
-    messages.clear()
+    conversation.clear()
+    print("Context cleared — starting fresh.")
+else:
+    conversation.load()
 
-messages.append({
-    "role": "system",
-    "content": """\
-You are a Windows-on-ARM troubleshooting assistant. Always respond in English.
-Use the system logs provided and your knowledge of Windows internals to:
-  1. Diagnose the root cause of the user’s problem.
-  2. Propose clear, step-by-step solutions.
-Only reference log entries that are directly relevant to the issue."""
-})
+# --- Answer cache (keyed on the question and the events behind it) ---
+cache = None if args.no_cache else AnswerCache(args.cache, ttl=args.cache_ttl_hours * 3600)
 
 
 # Instantiate local OpenAI client
 client = OpenAI(
-    base_url="http://localhost:5272/v1",
+    base_url=BASE_URL,
     api_key="unused"
 )
 
-def query_llm(user_question: str) -> str:
+def query_llm(user_question: str) -> Reply:
+    t0 = time.perf_counter()
+    retrieved = retriever.retrieve(user_question)
+    lines = [line for _, line in retrieved]
+    # Same question, same relevant events: the stored answer still applies.
+    # Not for a follow-up, which is answered in the light of the turns
+    # before it (on the first question of a conversation there are none).
+    fp = fingerprint([ev for ev, _ in retrieved], store.miner)
+    first = not conversation.turns and not conversation.summary
+    use_cache = cache is not None and (first or is_standalone(user_question))
+    cached = cache.get(user_question, fp) if use_cache else None
+    # Log lines already in the conversation aren't sent again
+    new_lines = conversation.new_lines(lines)
     # Build the user message with logs
-    user_content = f"Ignore chat history if not relevant. New User question: {user_question}\n\n"
-    if log_block:
-        user_content += f"System Logs:\n{log_block}\n"
+    user_content = user_message(user_question, new_lines, sent_earlier=bool(lines))
+
+    conversation.add_user(user_question, user_content, new_lines)
+    if cached is not None:
+        print(cached, end="", flush=True)
+        conversation.add_assistant(cached)
+        conversation.save()
+        elapsed = time.perf_counter() - t0
+        return Reply(cached, elapsed, 0, elapsed, False, cached=True)
+    # Tokens are printed as they arrive
+    try:
+        reply = stream_chat(client, conversation.messages(), on_text=lambda text: print(text, end="", flush=True))
+    except REQUEST_ERRORS:
+        # The question isn't left in the conversation without its answer
+        conversation.pop()
+        raise
+    if reply.cancelled:
+        # A half answer isn't kept as context for follow-up questions
+        conversation.pop()
     else:
-        user_content += "No system logs available.\n"
+        conversation.add_assistant(reply.text)
+        conversation.save()
+        # Cached without the reasoning, which isn't worth replaying
+        if use_cache and strip_reasoning(reply.text):
+            cache.put(user_question, fp, strip_reasoning(reply.text))
+    return reply
 
-    messages.append({"role": "user", "content": user_content})
-    resp = client.chat.completions.create(
-        model="qnn-deepseek-r1-distill-qwen-1.5b",
-        messages=messages,
-        max_tokens=2048,
-        temperature=0.6,
-        top_p=0.9,
-    )
-    answer = resp.choices[0].message.content
-    messages.append({"role": "assistant", "content": answer})
-    return answer
+def answer(question: str):
+    print("\n[Thinking...]\n")
+    try:
+        reply = query_llm(question)
+    except REQUEST_ERRORS as e:
+        print(f"\nError querying the model: {e}")
+        return
+    print(f"\n\n{reply.stats()} [history ~{conversation.tokens()} tokens]")
 
 def main():
-    print(f"[{'fresh' if args.new_context else 'continued'} context]")
-    question = input("How can I help with your system?\n").strip()
-    if not question:
-        print("Error: Question cannot be empty.")
+    turns = len(conversation.turns) // 2 + len(conversation.summary)
+    print(f"[{'fresh context' if args.new_context or not turns else f'continued context, {turns} earlier questions'}]")
+    if args.question:
+        answer(args.question)
         return
 
-    print("\n[Thinking...]\n")
-    print(query_llm(question))
+    # Follow-up questions share the conversation. Ctrl-C stops an answer that
+    # is being generated; Ctrl-C or Ctrl-D at the prompt (or "exit") quits.
+    print("How can I help with your system? Ctrl-C stops an answer, 'exit' quits.")
+    while True:
+        try:
+            question = input("\n> ").strip()
+        except (EOFError, KeyboardInterrupt):
+            print()
+            break
+        if question.lower() in ("exit", "quit"):
+            break
+        if not question:
+            print("Error: Question cannot be empty.")
+            continue
+        answer(question)
+    if cache is not None:
+        print(f"[answer cache: {cache.stats()}]")
 
 if __name__ == "__main__":
     main()
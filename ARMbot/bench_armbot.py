@@ -0,0 +1,212 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Dict, List, Optional
+
+from openai import OpenAI
+
+from conversation import Conversation
+from event_store import EventStore, open_source
+from llm import SYSTEM_PROMPT, stream_chat, user_message
+from log_clusters import TemplateMiner
+from mock_server import MockServer
+from retrieval import Retriever
+from synthetic_logs import QUESTIONS, synthetic_events, write_jsonl
+
+# --- End-to-end benchmark ---
+# Runs the armbot.py question path (index an export, retrieve the relevant
+# events, build the prompt, stream the answer) on synthetic exports of several
+# sizes, against the mock server standing in for the model. Each size runs in
+# a fresh process so its memory is its own. Per size it records extraction
+# (ingest) time, index size and peak memory; per question retrieval time,
+# prompt tokens, time to first token and total latency. Every run is appended
+# to a JSON-lines results file with its configuration and git commit, and the
+# table compares it with the previous run.
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def fixture(directory: str, events: int, seed: int = 0) -> str:
+    # Synthetic export, written once and reused: the same size and seed give
+    # the same events
+    path = os.path.join(directory, f"events-{events}-{seed}.jsonl")
+    if not os.path.exists(path):
+        tmp = path + ".tmp"
+        write_jsonl(tmp, synthetic_events(events, seed=seed))
+        os.replace(tmp, path)
+    return path
+
+
+def peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def measure(path: str, base_url: str, questions: List[str], repeat: int, log_budget: int) -> Dict:
+    # One fixture, in its own process
+    tmp = tempfile.mkdtemp()
+    index = os.path.join(tmp, "events.db")
+    store = EventStore(index, miner=TemplateMiner())
+    t0 = time.perf_counter()
+    store.ingest(open_source(path))
+    extract = time.perf_counter() - t0
+    count = store.count()
+    retriever = Retriever(store, budget=log_budget)
+    client = OpenAI(base_url=base_url, api_key="unused", max_retries=0)
+
+    results = []
+    for question in questions:
+        runs = []
+        for _ in range(repeat):
+            # A fresh session, as on the first question of a run of armbot.py
+            conversation = Conversation(SYSTEM_PROMPT)
+            t0 = time.perf_counter()
+            lines = [line for _, line in retriever.retrieve(question)]
+            retrieve = time.perf_counter() - t0
+            conversation.add_user(question, user_message(question, lines), lines)
+            reply = stream_chat(client, conversation.messages())
+            runs.append((retrieve, conversation.tokens(), len(lines), reply.ttft or 0.0,
+                         retrieve + reply.seconds, reply.tokens))
+        median = [statistics.median(column) for column in zip(*runs)]
+        results.append({"question": question, "retrieve_ms": round(median[0] * 1000, 2),
+                        "prompt_tokens": int(median[1]), "log_lines": int(median[2]),
+                        "ttft_s": round(median[3], 4), "total_s": round(median[4], 4),
+                        "completion_tokens": int(median[5])})
+    client.close()
+
+    # Python allocations of the same work, traced separately so tracing
+    # doesn't slow the timings above
+    store.close()
+    tracemalloc.start()
+    traced = EventStore(miner=TemplateMiner())
+    traced.ingest(open_source(path))
+    retriever = Retriever(traced, budget=log_budget)
+    for question in questions:
+        retriever.retrieve(question)
+    py_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    traced.close()
+    index_mb = os.path.getsize(index) / 2**20
+    os.remove(index)
+    os.rmdir(tmp)
+
+    return {"events": count, "extract_s": round(extract, 3), "events_per_s": round(count / extract),
+            "index_mb": round(index_mb, 2), "py_peak_mb": round(py_peak / 2**20, 1),
+            "rss_peak_mb": None if peak_rss_mb() is None else round(peak_rss_mb(), 1),
+            "questions": results}
+
+
+def totals(size: Dict) -> Dict:
+    # Means over the questions
+    qs = size["questions"]
+    return {key: statistics.mean(q[key] for q in qs)
+            for key in ("retrieve_ms", "prompt_tokens", "ttft_s", "total_s")}
+
+
+def git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE,
+                             capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def previous_run(path: str, config: Dict) -> Optional[Dict]:
+    # The latest earlier run with the same server and question settings
+    if not os.path.exists(path):
+        return None
+    last = None
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                run = json.loads(line)
+            except ValueError:
+                continue
+            if run.get("config") == config:
+                last = run
+    return last
+
+
+def change(new: float, old: Optional[float]) -> str:
+    if not old:
+        return ""
+    return f"{(new - old) / old:+.0%}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end ARMbot benchmark on synthetic logs and a mock model")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000],
+                        help="Events per fixture")
+    parser.add_argument("--questions", type=int, default=len(QUESTIONS), help="How many of the built-in questions")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per question; the median is kept")
+    parser.add_argument("--token-ms", type=float, default=20, help="Mock model: milliseconds per generated token")
+    parser.add_argument("--prefill-us", type=float, default=500, help="Mock model: microseconds per prompt token")
+    parser.add_argument("--answer-tokens", type=int, default=64)
+    parser.add_argument("--log-budget", type=int, default=768)
+    parser.add_argument("--fixtures", default=os.path.join(tempfile.gettempdir(), "armbot_fixtures"))
+    parser.add_argument("--results", default="bench_results.jsonl", help="Runs are appended here")
+    parser.add_argument("--label", default="", help="Name for this run in the results file")
+    args = parser.parse_args()
+
+    os.makedirs(args.fixtures, exist_ok=True)
+    questions = [q for q, _ in QUESTIONS[:args.questions]]
+    config = {"questions": questions, "repeat": args.repeat, "token_ms": args.token_ms,
+              "prefill_us": args.prefill_us, "answer_tokens": args.answer_tokens, "log_budget": args.log_budget}
+    before = previous_run(args.results, config)
+    before_sizes = {s["events"]: s for s in before["sizes"]} if before else {}
+
+    server = MockServer(token_latency=args.token_ms / 1000, prefill_latency=args.prefill_us / 1e6,
+                        answer_tokens=args.answer_tokens)
+    server.start()
+    sizes = []
+    try:
+        for events in args.sizes:
+            path = fixture(args.fixtures, events)
+            with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as pool:
+                sizes.append(pool.submit(measure, path, server.base_url, questions,
+                                         args.repeat, args.log_budget).result())
+    finally:
+        server.stop()
+
+    run = {"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "label": args.label, "commit": git_commit(),
+           "python": sys.version.split()[0], "config": config, "sizes": sizes}
+    with open(args.results, "a", encoding="utf-8") as f:
+        f.write(json.dumps(run) + "\n")
+
+    print(f"{len(questions)} questions x {args.repeat}, mock model {args.token_ms:.0f} ms/token, "
+          f"{args.prefill_us:.0f} us/prompt token, {args.answer_tokens} tokens per answer")
+    if before:
+        print(f"changes against {before['time']} {before['label'] or before['commit'] or ''}".rstrip())
+    print(f"\n{'events':>9}{'extract s':>11}{'ev/s':>10}{'index MB':>10}{'py MB':>8}{'rss MB':>8}"
+          f"{'retr ms':>9}{'prompt':>8}{'ttft s':>8}{'total s':>9}")
+    for size in sizes:
+        mean, old = totals(size), before_sizes.get(size["events"])
+        old_mean = totals(old) if old else {}
+        rss = f"{size['rss_peak_mb']:.0f}" if size["rss_peak_mb"] is not None else "-"
+        print(f"{size['events']:>9,}{size['extract_s']:>11.2f}{size['events_per_s']:>10,}{size['index_mb']:>10.1f}"
+              f"{size['py_peak_mb']:>8.1f}{rss:>8}{mean['retrieve_ms']:>9.1f}{mean['prompt_tokens']:>8.0f}"
+              f"{mean['ttft_s']:>8.2f}{mean['total_s']:>9.2f}")
+        if old:
+            print(f"{'':>9}{change(size['extract_s'], old['extract_s']):>11}{'':>10}"
+                  f"{change(size['index_mb'], old['index_mb']):>10}{change(size['py_peak_mb'], old['py_peak_mb']):>8}"
+                  f"{'':>8}{change(mean['retrieve_ms'], old_mean['retrieve_ms']):>9}"
+                  f"{change(mean['prompt_tokens'], old_mean['prompt_tokens']):>8}"
+                  f"{change(mean['ttft_s'], old_mean['ttft_s']):>8}{change(mean['total_s'], old_mean['total_s']):>9}")
+    print(f"\nper-question results: {args.results}")
+
+
+if __name__ == "__main__":
+    main()
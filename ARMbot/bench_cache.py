@@ -0,0 +1,85 @@
+import argparse
+import time
+
+from answer_cache import AnswerCache, fingerprint
+from event_store import EventStore
+from log_clusters import TemplateMiner
+from retrieval import Retriever
+from synthetic_logs import QUESTIONS, synthetic_events
+
+# --- Answer cache benchmark ---
+# Fills the cache with one answer per question, then replays the questions
+# as asked, reworded, and after new events have been ingested, reporting
+# hits, near-duplicate hits and misses, and the time a cached answer takes
+# (retrieval for the fingerprint plus the lookup).
+
+REWORDED = [
+    "laptop crashes and reboots, why?",
+    "Teams keeps freezing, then it closes itself",
+    "Wi-Fi disconnects whenever the laptop wakes up from sleep",
+    "Did someone try logging in to my account?",
+    "CPU throttled? the laptop feels slow",
+    "Is the disk failing?",
+    "A service stops unexpectedly",
+]
+
+
+class _Synthetic:
+    def __init__(self, count, seed=0, first_record=1, start=1_735_689_600.0):
+        self.args = (count, seed, start, 20.0, first_record)
+
+    def events(self, checkpoints):
+        return synthetic_events(*self.args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Answer cache hit rates and latency")
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument("--tail", type=int, default=2_000, help="New events before the last round")
+    parser.add_argument("--similarity", type=float, default=0.7)
+    args = parser.parse_args()
+
+    store = EventStore(miner=TemplateMiner())
+    store.ingest(_Synthetic(args.events))
+    retriever = Retriever(store)
+    cache = AnswerCache(similarity=args.similarity)
+
+    def ask(question, answer=None):
+        t0 = time.perf_counter()
+        events = [ev for ev, _ in retriever.retrieve(question)]
+        t1 = time.perf_counter()
+        fp = fingerprint(events, store.miner)
+        cached = cache.get(question, fp)
+        t2 = time.perf_counter()
+        if cached is None and answer is not None:
+            cache.put(question, fp, answer)
+        return cached is not None, (t1 - t0) * 1000, (t2 - t1) * 1000
+
+    for question, _ in QUESTIONS:
+        ask(question, f"answer to {question}")
+
+    print(f"{'round':<34}{'hits':>6}{'retrieval ms':>14}{'lookup ms':>11}")
+    rounds = [("same questions", [q for q, _ in QUESTIONS]),
+              ("reworded", REWORDED)]
+    for name, questions in rounds:
+        before = dict(cache.counts)
+        results = [ask(q) for q in questions]
+        hits = sum(hit for hit, _, _ in results)
+        print(f"{name:<34}{f'{hits}/{len(questions)}':>6}"
+              f"{sum(r for _, r, _ in results) / len(results):>14.1f}"
+              f"{sum(l for _, _, l in results) / len(results):>11.2f}")
+        near = cache.counts["near_hits"] - before["near_hits"]
+        if near:
+            print(f"{'':<4}{near} of them near-duplicate matches")
+
+    store.ingest(_Synthetic(args.tail, seed=1, first_record=args.events + 1, start=time.time()))
+    results = [ask(q, f"new answer to {q}") for q, _ in QUESTIONS]
+    hits = sum(hit for hit, _, _ in results)
+    print(f"{f'after {args.tail} new events':<34}{f'{hits}/{len(QUESTIONS)}':>6}"
+          f"{sum(r for _, r, _ in results) / len(results):>14.1f}"
+          f"{sum(l for _, _, l in results) / len(results):>11.2f}")
+    print(f"\nstats: {cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
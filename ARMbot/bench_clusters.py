@@ -0,0 +1,83 @@
+import argparse
+import time
+
+from event_store import EventStore, format_event
+from log_clusters import TemplateMiner
+from retrieval import Retriever
+from synthetic_logs import QUESTIONS, synthetic_events
+from tokens import count_tokens
+
+# --- Template clustering benchmark ---
+# Miner throughput on a large synthetic corpus, how much a window of recent
+# events shrinks when each cluster becomes one line, and how many distinct
+# templates a question's context carries under the same token budget with
+# and without clustering in the store.
+
+
+class _Synthetic:
+    def __init__(self, count, seed=0, first_record=1, start=1_735_689_600.0):
+        self.args = (count, seed, start, 20.0, first_record)
+
+    def events(self, checkpoints):
+        return synthetic_events(*self.args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drain-style template clustering benchmark")
+    parser.add_argument("--events", type=int, default=1_000_000, help="Corpus for miner throughput")
+    parser.add_argument("--index-events", type=int, default=100_000, help="Events in the retrieval index")
+    parser.add_argument("--windows", default="100,1000,10000")
+    parser.add_argument("--budget", type=int, default=768)
+    args = parser.parse_args()
+
+    # Throughput
+    corpus = list(synthetic_events(args.events))
+    miner = TemplateMiner()
+    t0 = time.perf_counter()
+    for ev in corpus:
+        miner.add(ev)
+    secs = time.perf_counter() - t0
+    print(f"miner: {args.events} events in {secs:.2f} s ({args.events / secs:,.0f} events/s, "
+          f"{secs / args.events * 1e6:.1f} us/event), {len(miner.clusters)} clusters")
+
+    # Compression of the most recent events
+    print(f"\n{'window':>8}{'verbatim tok':>14}{'clustered tok':>15}{'ratio':>8}{'templates':>11}")
+    for window in map(int, args.windows.split(",")):
+        recent = corpus[-window:]
+        verbatim = count_tokens("\n".join(format_event(ev) for ev in recent))
+        clusters = TemplateMiner().summarize(recent)
+        clustered = count_tokens("\n".join(c.line() for c in clusters))
+        print(f"{window:>8}{verbatim:>14}{clustered:>15}{verbatim / clustered:>7.1f}x{len(clusters):>11}")
+    del corpus
+
+    # Distinct templates per question context, same budget
+    plain = EventStore()
+    plain.ingest(_Synthetic(args.index_events))
+    clustered = EventStore(miner=TemplateMiner())
+    clustered.ingest(_Synthetic(args.index_events))
+    labels = TemplateMiner()
+    for ev in plain.recent(limit=args.index_events):
+        labels.add(ev)
+
+    def templates(store, question):
+        events = [ev for ev, _ in Retriever(store, budget=args.budget).retrieve(question)]
+        return len({labels.add(ev).id for ev in events}), len(events)
+
+    print(f"\n{'question':<58}{'templates in context':>22}")
+    print(f"{'':<58}{'plain':>11}{'clustered':>11}")
+    for question, _ in QUESTIONS:
+        a, _ = templates(plain, question)
+        b, _ = templates(clustered, question)
+        print(f"{question[:56]:<58}{a:>11}{b:>11}")
+
+    # Incremental update: a tail of new events into the clustered store
+    tail = max(args.index_events // 100, 1)
+    t0 = time.perf_counter()
+    clustered.ingest(_Synthetic(tail, seed=1, first_record=args.index_events + 1, start=time.time()))
+    secs = time.perf_counter() - t0
+    print(f"\nincremental: {tail} new events ingested and clustered in {secs * 1000:.0f} ms "
+          f"({secs / tail * 1e6:.0f} us/event, index {clustered.count()} events)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+
+from openai import OpenAI
+
+from fleet import find_devices, prepare, run_fleet
+from llm import stream_chat
+from mock_server import MockServer
+from synthetic_logs import QUESTIONS, synthetic_events, write_jsonl
+
+# --- Fleet throughput benchmark ---
+# Diagnoses a directory of synthetic device exports against the mock server,
+# first the way armbot.py would (one synchronous request after another),
+# then through fleet mode at several concurrency caps, and once more with
+# the server failing a share of requests to exercise the retries. The mock
+# server's slots, prefill and per-token latency stand in for the local NPU.
+
+
+def summarize(name, latencies, ttfts, seconds, requests, server, base=None):
+    p95 = sorted(latencies)[int(0.95 * (len(latencies) - 1))] if latencies else 0.0
+    ttft = statistics.mean(ttfts) if ttfts else 0.0
+    print(f"{name:<30}{requests / seconds:>8.2f}{seconds:>8.1f}{ttft:>9.2f}{p95:>9.2f}"
+          f"{server.stats['connections']:>7}{(base or seconds) / seconds:>8.1f}x")
+
+
+def run_sequential(devices, questions, server, log_budget):
+    # The interactive path: a synchronous client, one request at a time
+    client = OpenAI(base_url=server.base_url, api_key="unused", max_retries=0)
+    latencies, ttfts, n = [], [], 0
+    t0 = time.perf_counter()
+    for name, path in devices.items():
+        for job in prepare(name, path, questions, log_budget):
+            reply = stream_chat(client, job.messages)
+            latencies.append(reply.seconds)
+            ttfts.append(reply.ttft)
+            n += 1
+    seconds = time.perf_counter() - t0
+    client.close()
+    return n, seconds, latencies, ttfts
+
+
+def run_async(devices, questions, server, out_path, **options):
+    with open(out_path, "w", encoding="utf-8") as out:
+        summary = asyncio.run(run_fleet(devices, questions, out, base_url=server.base_url, **options))
+    with open(out_path, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    done = [r for r in records if "answer" in r]
+    return summary, [r["seconds"] for r in done], [r["ttft"] for r in done]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fleet mode throughput against a mock inference server")
+    parser.add_argument("--devices", type=int, default=8)
+    parser.add_argument("--events", type=int, default=5_000, help="Events per device export")
+    parser.add_argument("--questions", type=int, default=3)
+    parser.add_argument("--slots", type=int, default=2, help="Requests the mock server generates at once")
+    parser.add_argument("--token-ms", type=float, default=10)
+    parser.add_argument("--prefill-us", type=float, default=300)
+    parser.add_argument("--answer-tokens", type=int, default=48)
+    parser.add_argument("--fail-rate", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=1, help="Picks which requests the server fails")
+    args = parser.parse_args()
+
+    questions = [q for q, _ in QUESTIONS[:args.questions]]
+    with tempfile.TemporaryDirectory() as tmp:
+        logs = os.path.join(tmp, "logs")
+        os.mkdir(logs)
+        for i in range(args.devices):
+            write_jsonl(os.path.join(logs, f"device-{i:03d}.jsonl"), synthetic_events(args.events, seed=i))
+        devices = find_devices(logs)
+        out_path = os.path.join(tmp, "results.jsonl")
+        requests = len(devices) * len(questions)
+        print(f"{len(devices)} devices x {len(questions)} questions, {args.events} events each; mock server: "
+              f"{args.slots} slots, {args.token_ms:.0f} ms/token, {args.prefill_us:.0f} us/prompt token, "
+              f"{args.answer_tokens} tokens per answer")
+        print(f"\n{'configuration':<30}{'req/s':>8}{'s':>8}{'ttft s':>9}{'p95 s':>9}{'conns':>7}{'speedup':>9}")
+
+        def server(fail_rate=0.0):
+            s = MockServer(token_latency=args.token_ms / 1000, prefill_latency=args.prefill_us / 1e6,
+                           answer_tokens=args.answer_tokens, slots=args.slots, fail_rate=fail_rate, seed=args.seed)
+            s.start()
+            return s
+
+        s = server()
+        n, base, latencies, ttfts = run_sequential(devices, questions, s, 768)
+        summarize("sequential, sync client (old)", latencies, ttfts, base, n, s)
+        s.stop()
+
+        for concurrency in sorted({1, args.slots, args.slots + 1, 2 * args.slots, 4 * args.slots}):
+            s = server()
+            summary, latencies, ttfts = run_async(devices, questions, s, out_path, concurrency=concurrency)
+            summarize(f"fleet, {concurrency} in flight", latencies, ttfts, summary["seconds"], requests, s, base)
+            s.stop()
+
+        s = server(args.fail_rate)
+        summary, latencies, ttfts = run_async(devices, questions, s, out_path, concurrency=args.slots + 1,
+                                              backoff=0.05)
+        summarize(f"fleet, {args.fail_rate:.0%} 503s", latencies, ttfts, summary["seconds"], requests, s, base)
+        print(f"{'':<4}{s.stats['failed']} requests failed by the server; {summary['answered']}/{requests} "
+              f"answered after {summary['retries']} retries, {summary['failed']} given up")
+        s.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import argparse
+import os
+import tempfile
+import time
+
+from event_store import EventStore, JsonSource
+from synthetic_logs import synthetic_events, write_jsonl
+
+# --- Ingestion and query benchmark ---
+# Writes a synthetic export, ingests it into a fresh index, appends a tail of
+# new events and ingests again (only the tail should be read into the store),
+# then times searches and "most recent" queries against the index.
+
+QUESTIONS = [
+    "Why is my laptop crashing and rebooting?",
+    "Teams keeps freezing and closing",
+    "wifi disconnects after sleep",
+    "failed logon attempts",
+    "kernel power 41",
+    "disk errors retried",
+]
+
+
+def timed(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Event index ingestion and query benchmark")
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--tail", type=int, default=10_000, help="Events appended for the incremental run")
+    parser.add_argument("--batch", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--dir", help="Work directory (default: a temporary one)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        export = os.path.join(tmp, "events.jsonl")
+        _, secs = timed(write_jsonl, export, synthetic_events(args.events))
+        print(f"export: {args.events} events, {os.path.getsize(export) / 1e6:.0f} MB ({secs:.1f} s to write)")
+
+        store = EventStore(os.path.join(tmp, "events.db"))
+        added, secs = timed(store.ingest, JsonSource(export), batch=args.batch)
+        total = sum(added.values())
+        print(f"full ingest:        {total} events in {secs:.2f} s ({total / secs:,.0f} events/s)")
+
+        # Append a tail continuing every channel's record numbers
+        write_jsonl(export, synthetic_events(args.tail, seed=1, start=time.time() - 3600,
+                                             first_record=args.events + 1), append=True)
+        added, secs = timed(store.ingest, JsonSource(export), batch=args.batch)
+        print(f"incremental ingest: {sum(added.values())} new events in {secs:.2f} s "
+              f"(whole export re-scanned, only the tail stored)")
+        added, secs = timed(store.ingest, JsonSource(export), batch=args.batch)
+        print(f"no-op ingest:       {sum(added.values())} new events in {secs:.2f} s")
+        store.db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        print(f"index: {store.count()} events, {os.path.getsize(store.path) / 1e6:.0f} MB")
+
+        print(f"{'query':<45}{'search ms':>10}{'hits':>6}")
+        for question in QUESTIONS:
+            _, secs = timed(lambda: [store.search(question, limit=15) for _ in range(args.repeat)])
+            hits = len(store.search(question, limit=15))
+            print(f"{question:<45}{secs * 1000 / args.repeat:>10.2f}{hits:>6}")
+        _, secs = timed(lambda: [store.recent(["System"], 15) for _ in range(args.repeat)])
+        print(f"{'15 most recent System events':<45}{secs * 1000 / args.repeat:>10.2f}{15:>6}")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import argparse
+import time
+
+from event_store import EventStore, format_event
+from retrieval import Retriever
+from synthetic_logs import QUESTIONS, synthetic_events
+from tokens import count_tokens
+
+# --- Retrieval benchmark ---
+# The old prompt context (the 15 newest System events, whatever the question)
+# against question-aware retrieval under a token budget, over a synthetic
+# index: prompt tokens, how many of the event kinds that answer each question
+# made it into the prompt, and retrieval time.
+
+
+class _Synthetic:
+    def __init__(self, count):
+        self.count = count
+
+    def events(self, checkpoints):
+        return synthetic_events(self.count)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Question-aware retrieval vs the 15 newest System events")
+    parser.add_argument("--events", type=int, default=200_000)
+    parser.add_argument("--budget", type=int, default=768)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    store = EventStore()
+    store.ingest(_Synthetic(args.events))
+    retriever = Retriever(store, budget=args.budget)
+
+    print(f"{args.events} events, budget {args.budget} tokens")
+    print(f"{'question':<58}{'tokens':>14}{'answering kinds':>18}{'ms':>7}")
+    print(f"{'':<58}{'old':>7}{'new':>7}{'old':>9}{'new':>9}")
+    totals = [0, 0, 0, 0, 0]
+    for question, wanted in QUESTIONS:
+        old = store.recent(["System"], 15, levels=["ERROR", "WARNING", "INFO"])
+        old_tokens = count_tokens("\n".join(format_event(ev) for ev in old))
+        old_hits = len(wanted & {(ev.source, ev.event_id) for ev in old})
+
+        t0 = time.perf_counter()
+        for _ in range(args.repeat):
+            context = retriever.context(question)
+        ms = (time.perf_counter() - t0) * 1000 / args.repeat
+        new = [ev for ev, _ in retriever.retrieve(question)]
+        new_hits = len(wanted & {(ev.source, ev.event_id) for ev in new})
+        new_tokens = count_tokens(context)
+
+        print(f"{question[:56]:<58}{old_tokens:>7}{new_tokens:>7}"
+              f"{f'{old_hits}/{len(wanted)}':>9}{f'{new_hits}/{len(wanted)}':>9}{ms:>7.1f}")
+        for i, v in enumerate((old_tokens, new_tokens, old_hits, new_hits, len(wanted))):
+            totals[i] += v
+    print(f"{'total':<58}{totals[0]:>7}{totals[1]:>7}"
+          f"{f'{totals[2]}/{totals[4]}':>9}{f'{totals[3]}/{totals[4]}':>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import json
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Set
+
+from tokens import count_tokens, truncate_tokens
+
+# --- Conversation memory ---
+# Keeps the chat history inside a token budget. Every message is counted when
+# it is added. Log lines are sent once per session: a follow-up question only
+# carries lines the model hasn't seen yet. When the history goes over budget
+# the oldest turns are folded into a short summary (question plus the start
+# of the answer), and the log lines they carried become sendable again. The
+# session can be saved to disk and picked up by the next run.
+
+MESSAGE_OVERHEAD = 4  # role and separators per message, as chat templates add them
+
+_REASONING = re.compile(r"<think>.*?</think>\s*", re.S)
+
+
+def strip_reasoning(text: str) -> str:
+    # R1-style models think out loud in <think>...</think>; only the answer is
+    # worth keeping as context
+    return _REASONING.sub("", text).strip()
+
+
+class Conversation:
+    def __init__(self, system: str, budget: int = 2048, keep_turns: int = 2,
+                 summary_budget: int = 256, answer_tokens: int = 48, path: Optional[str] = None):
+        self.system = system
+        self.budget = budget
+        self.keep_turns = keep_turns
+        self.summary_budget = summary_budget
+        self.answer_tokens = answer_tokens
+        self.path = path
+        self.turns: List[Dict] = []    # {"role", "content", "tokens", "question"?, "logs"?}
+        self.summary: List[str] = []   # one line per folded turn
+        self.sent: Set[str] = set()     # log lines the model has in its context
+
+    # --- Building the request ---
+    def new_lines(self, lines: Iterable[str]) -> List[str]:
+        return [line for line in lines if line not in self.sent]
+
+    def add_user(self, question: str, content: str, logs: Iterable[str] = ()):
+        logs = list(logs)
+        self.sent.update(logs)
+        self._append({"role": "user", "content": content, "question": question, "logs": logs})
+
+    def add_assistant(self, text: str):
+        self._append({"role": "assistant", "content": strip_reasoning(text)})
+        self._fit()
+
+    def pop(self):
+        # Drop the last message (a question whose answer was cancelled)
+        msg = self.turns.pop()
+        self.sent.difference_update(msg.get("logs", ()))
+
+    def _append(self, msg: Dict):
+        msg["tokens"] = count_tokens(msg["content"]) + MESSAGE_OVERHEAD
+        self.turns.append(msg)
+
+    def _summary_message(self) -> Optional[Dict]:
+        if not self.summary:
+            return None
+        return {"role": "system", "content": "Earlier in this conversation:\n" + "\n".join(self.summary)}
+
+    def messages(self) -> List[Dict]:
+        # What goes to the server
+        msgs = [{"role": "system", "content": self.system}]
+        summary = self._summary_message()
+        if summary:
+            msgs.append(summary)
+        msgs += [{"role": m["role"], "content": m["content"]} for m in self.turns]
+        return msgs
+
+    def tokens(self) -> int:
+        # Estimated prompt size, from the per-message counts
+        summary = self._summary_message()
+        total = count_tokens(self.system) + MESSAGE_OVERHEAD + sum(m["tokens"] for m in self.turns)
+        return total + (count_tokens(summary["content"]) + MESSAGE_OVERHEAD if summary else 0)
+
+    # --- Compaction ---
+    def _fit(self):
+        # Fold the oldest (question, answer) pairs into the summary until the
+        # history fits, always keeping the last keep_turns pairs verbatim
+        while self.tokens() > self.budget and len(self.turns) > 2 * self.keep_turns:
+            user, assistant = self.turns[0], self.turns[1]
+            del self.turns[:2]
+            answer = truncate_tokens(" ".join(assistant["content"].split()), self.answer_tokens)
+            self.summary.append(f"- Q: {user.get('question', user['content'])} A: {answer}")
+            # The model no longer sees these log lines; resend them if they matter again
+            self.sent.difference_update(user.get("logs", ()))
+            while len(self.summary) > 1 and count_tokens("\n".join(self.summary)) > self.summary_budget:
+                self.summary.pop(0)
+        # Recent turns alone over budget: the summary goes first
+        while self.summary and self.tokens() > self.budget:
+            self.summary.pop(0)
+
+    # --- Persistence ---
+    def save(self):
+        if not self.path:
+            return
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"turns": self.turns, "summary": self.summary, "sent": sorted(self.sent)}, f)
+        os.replace(tmp, self.path)
+
+    def load(self) -> bool:
+        # Restores a saved session; False when there is none
+        if not self.path or not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error loading session: {e}")
+            return False
+        self.turns, self.summary, self.sent = state["turns"], state["summary"], set(state["sent"])
+        # Turns saved after an interrupted answer end on a question
+        if self.turns and self.turns[-1]["role"] == "user":
+            self.pop()
+        self._fit()
+        return True
+
+    def clear(self):
+        self.turns, self.summary, self.sent = [], [], set()
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
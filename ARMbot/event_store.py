@@ -0,0 +1,444 @@
+import datetime
+import json
+import os
+import re
+import sqlite3
+import time
+import xml.etree.ElementTree as ET
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+# --- Persistent event index ---
+# Events are ingested incrementally into a local SQLite database with an FTS5
+# index over message, source and event ID. Every channel of every host keeps
+# a checkpoint (the last record number stored and its time), so a run only
+# reads what was logged since the previous one, and older events stay
+# searchable after the live log has rotated them out. Clearing a log restarts
+# its record numbers at 1; a source that notices yields Cleared(host,
+# channel), and that channel's events from then on are stored under a new
+# generation with the checkpoint started over. Sources are pluggable: the
+# live log (extractor.Win32Source) or exported EVTX / XML / JSON files, so
+# everything but the live source runs on any OS.
+
+CHANNELS = ["System", "Application", "Security"]
+
+
+class Event(NamedTuple):
+    channel: str
+    record: int      # per-channel record number (EventRecordID)
+    time: float      # seconds since the epoch
+    level: str       # ERROR, WARNING, INFO, AUDIT_SUCCESS, AUDIT_FAILURE
+    source: str
+    event_id: int
+    message: str
+    template: Optional[int] = None  # cluster ID, when the store has a TemplateMiner
+    host: str = ""   # computer the event was logged on (the export's name when unknown)
+
+
+class Cleared(NamedTuple):
+    # Yielded by a source, ahead of the channel's new events, when it finds
+    # the channel's log was cleared since the checkpoint
+    host: str
+    channel: str
+
+
+class Checkpoint(NamedTuple):
+    record: int      # last record number stored for the (host, channel)
+    time: float      # that record's time
+
+
+Checkpoints = Dict[Tuple[str, str], Checkpoint]
+
+
+def format_event(ev: Event) -> str:
+    ts = datetime.datetime.fromtimestamp(ev.time).isoformat()
+    return f"[{ts}] {ev.level} - {ev.source}: {ev.message}"
+
+
+# --- Sources ---
+# A source yields the events newer than the (host, channel) checkpoints it
+# is given, in record order per channel.
+
+# A record at or below the checkpoint that was logged this much later than
+# the checkpoint's record can only come from a log that was cleared since
+# (exports of the same record in two formats differ by rounding only)
+CLEAR_SLACK = 1.0
+
+
+def after_checkpoints(events: Iterable[Event], checkpoints: Checkpoints) -> Iterator:
+    # Filters exported events against the checkpoints. Record numbers that
+    # restarted (an export taken after the log was cleared) yield Cleared
+    # first, and all of that channel's events are kept.
+    restarted = set()
+    for ev in events:
+        key = (ev.host, ev.channel)
+        cp = checkpoints.get(key)
+        if cp is None or key in restarted or ev.record > cp.record:
+            yield ev
+        elif ev.time > cp.time + CLEAR_SLACK:
+            restarted.add(key)
+            yield Cleared(*key)
+            yield ev
+
+
+def _parse_time(value) -> float:
+    if isinstance(value, (int, float)):
+        return float(value)
+    # ConvertTo-Json writes DateTime as "/Date(1735689600000)/"
+    m = re.match(r"/Date\((-?\d+)", value)
+    if m:
+        return int(m.group(1)) / 1000
+    # EVTX/XML SystemTime carries 7 fractional digits, more than fromisoformat takes
+    value = re.sub(r"(\.\d{6})\d+", r"\1", value.replace("Z", "+00:00"))
+    return datetime.datetime.fromisoformat(value).timestamp()
+
+
+class JsonSource:
+    # JSON lines or a JSON array. Keys are Event's field names, or the ones
+    # `Get-WinEvent | ConvertTo-Json` writes (LogName, RecordId, TimeCreated,
+    # LevelDisplayName, ProviderName, Id, Message).
+    KEYS = {"LogName": "channel", "RecordId": "record", "TimeCreated": "time", "LevelDisplayName": "level",
+            "ProviderName": "source", "Id": "event_id", "Message": "message", "MachineName": "host"}
+    LEVELS = {"Critical": "ERROR", "Error": "ERROR", "Warning": "WARNING", "Information": "INFO"}
+
+    def __init__(self, path: str):
+        self.path = path
+        self.host = os.path.basename(path)  # for records that don't name their computer
+
+    def _records(self) -> Iterator[dict]:
+        with open(self.path, encoding="utf-8-sig") as f:
+            first = f.read(1)
+            while first.isspace():
+                first = f.read(1)
+            f.seek(0)
+            if first == "[":
+                yield from json.load(f)
+                return
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def events(self, checkpoints: Checkpoints) -> Iterator[Event]:
+        return after_checkpoints(self._events(), checkpoints)
+
+    def _events(self) -> Iterator[Event]:
+        for obj in self._records():
+            obj = {self.KEYS.get(k, k): v for k, v in obj.items()}
+            level = self.LEVELS.get(obj.get("level"), obj.get("level") or "INFO")
+            yield Event(obj["channel"], int(obj["record"]), _parse_time(obj["time"]), level,
+                        obj["source"], int(obj["event_id"]), (obj.get("message") or "No message available").strip(),
+                        host=obj.get("host") or self.host)
+
+
+XML_NS = "{http://schemas.microsoft.com/win/2004/08/events/event}"
+XML_LEVELS = {"0": "INFO", "1": "ERROR", "2": "ERROR", "3": "WARNING", "4": "INFO"}
+AUDIT_FAILURE_KEYWORD = 0x0010000000000000
+
+
+def _xml_event(node, host: str = "") -> Event:
+    # One <Event> element as written by wevtutil / EvtRender; `host` when it
+    # names no Computer
+    system = node.find(f"{XML_NS}System")
+    level = XML_LEVELS.get(system.findtext(f"{XML_NS}Level") or "4", "INFO")
+    keywords = int(system.findtext(f"{XML_NS}Keywords") or "0", 16)
+    if system.findtext(f"{XML_NS}Channel") == "Security":
+        level = "AUDIT_FAILURE" if keywords & AUDIT_FAILURE_KEYWORD else "AUDIT_SUCCESS"
+    message = node.findtext(f"{XML_NS}RenderingInfo/{XML_NS}Message")
+    if not message:
+        # Unrendered export: fall back to the raw insertion strings
+        data = node.findall(f"{XML_NS}EventData/{XML_NS}Data")
+        message = " ".join(f"{d.get('Name')}: {d.text}" if d.get("Name") else (d.text or "") for d in data)
+    return Event(system.findtext(f"{XML_NS}Channel"),
+                 int(system.findtext(f"{XML_NS}EventRecordID")),
+                 _parse_time(system.find(f"{XML_NS}TimeCreated").get("SystemTime")),
+                 level,
+                 system.find(f"{XML_NS}Provider").get("Name"),
+                 int(system.findtext(f"{XML_NS}EventID")),
+                 (message or "No message available").strip(),
+                 host=system.findtext(f"{XML_NS}Computer") or host)
+
+
+class XmlSource:
+    # `wevtutil qe System /f:xml /rd:false > system.xml`: a run of <Event>
+    # elements with no root, parsed incrementally so large exports stream
+    def __init__(self, path: str):
+        self.path = path
+        self.host = os.path.basename(path)
+
+    def events(self, checkpoints: Checkpoints) -> Iterator[Event]:
+        return after_checkpoints(self._events(), checkpoints)
+
+    def _events(self) -> Iterator[Event]:
+        parser = ET.XMLPullParser(events=("end",))
+        parser.feed("<Events>")
+        with open(self.path, encoding="utf-8-sig") as f:
+            # An export may start with its own XML declaration
+            chunk = re.sub(r"^\s*<\?xml[^>]*\?>", "", f.read(1 << 20))
+            while chunk:
+                parser.feed(chunk)
+                yield from self._drain(parser)
+                chunk = f.read(1 << 20)
+        parser.feed("</Events>")
+        yield from self._drain(parser)
+
+    def _drain(self, parser) -> Iterator[Event]:
+        for _, node in parser.read_events():
+            if node.tag != f"{XML_NS}Event":
+                continue
+            ev = _xml_event(node, self.host)
+            node.clear()
+            yield ev
+
+
+class EvtxSource:
+    # Binary .evtx export, read with python-evtx (pip install python-evtx)
+    def __init__(self, path: str):
+        self.path = path
+        self.host = os.path.basename(path)
+
+    def events(self, checkpoints: Checkpoints) -> Iterator[Event]:
+        try:
+            import Evtx.Evtx as evtx
+        except ImportError as e:
+            raise ImportError("Reading .evtx files needs python-evtx: pip install python-evtx") from e
+        return after_checkpoints(self._events(evtx), checkpoints)
+
+    def _events(self, evtx) -> Iterator[Event]:
+        with evtx.Evtx(self.path) as log:
+            for record in log.records():
+                yield _xml_event(ET.fromstring(record.xml()), self.host)
+
+
+def open_source(path: str):
+    # Picks the file source from the extension
+    sources = {".evtx": EvtxSource, ".xml": XmlSource, ".json": JsonSource, ".jsonl": JsonSource}
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in sources:
+        raise ValueError(f"Invalid log file type. Must be one of {list(sources)}")
+    return sources[ext](path)
+
+
+# --- Store ---
+# Record numbers are unique per host and channel only until the log is
+# cleared, so rows are keyed on (host, channel, generation, record)
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    host TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    record INTEGER NOT NULL,
+    time REAL NOT NULL,
+    level TEXT NOT NULL,
+    source TEXT NOT NULL,
+    event_id INTEGER NOT NULL,
+    message TEXT NOT NULL,
+    template INTEGER,
+    generation INTEGER NOT NULL,
+    UNIQUE (host, channel, generation, record)
+);
+CREATE INDEX IF NOT EXISTS events_time ON events (time);
+CREATE INDEX IF NOT EXISTS events_channel_time ON events (channel, time);
+CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5 (
+    message, source, event_id, content='events', content_rowid='id',
+    tokenize='porter unicode61'
+);
+CREATE TABLE IF NOT EXISTS templates (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    event_id INTEGER NOT NULL,
+    level TEXT NOT NULL,
+    template TEXT NOT NULL,
+    prefix TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    first REAL NOT NULL,
+    last REAL NOT NULL,
+    example TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    host TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    record INTEGER NOT NULL,
+    time REAL NOT NULL,
+    generation INTEGER NOT NULL,
+    updated REAL NOT NULL,
+    PRIMARY KEY (host, channel)
+);
+"""
+SOURCE_COLUMNS = "channel, record, time, level, source, event_id, message"
+COLUMNS = SOURCE_COLUMNS + ", template, host"
+
+
+# Words too common in questions to say anything about the events
+# Negations ("no", "not", "without") are kept: they change what is asked
+STOPWORDS = set("""a about after again all always am an and any are as at be been before being but by
+can could did do does doing every feel feels for from get gets getting has have having help how i if in
+into is it its itself just keep keeping keeps laptop machine me my myself now of on or pc please so
+some someone something still that the then there this time times to too up very was what when whenever
+where which while why will with would you your""".split())
+
+
+def fts_query(text: str) -> str:
+    # Free text -> FTS5 query: every word quoted (no operator injection), OR-ed
+    words = [w for w in re.findall(r"\w+", text.lower()) if w not in STOPWORDS]
+    return " OR ".join(f'"{w}"' for w in dict.fromkeys(words))
+
+
+class EventStore:
+    # With a TemplateMiner (log_clusters.py) every stored event is assigned a
+    # template cluster as it is appended, and the clusters are saved next to
+    # the events, so they survive restarts and only new events are clustered
+    def __init__(self, path: str = ":memory:", miner=None):
+        self.path = path
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        if self.db.execute("SELECT 1 FROM sqlite_master WHERE name = 'events'").fetchone():
+            # Indexes created before template clustering
+            if "template" not in [row[1] for row in self.db.execute("PRAGMA table_info(events)")]:
+                self.db.execute("ALTER TABLE events ADD COLUMN template INTEGER")
+        self.db.executescript(SCHEMA)
+        self.miner = miner
+        if miner is not None:
+            miner.load(self.db.execute("SELECT * FROM templates"))
+            with self.db:
+                self._assign_templates(0)
+
+    def checkpoints(self) -> Checkpoints:
+        return {(host, channel): Checkpoint(record, t) for host, channel, record, t
+                in self.db.execute("SELECT host, channel, record, time FROM checkpoints")}
+
+    def reset_channel(self, host: str, channel: str):
+        # The channel's log was cleared: later records start a new generation
+        # and the checkpoint starts over, so reused record numbers are stored
+        with self.db:
+            self.db.execute(
+                "INSERT INTO checkpoints (host, channel, record, time, generation, updated) VALUES (?, ?, 0, 0, 1, ?) "
+                "ON CONFLICT (host, channel) DO UPDATE SET record = 0, time = 0, updated = excluded.updated, "
+                "generation = generation + 1", (host, channel, time.time()))
+
+    def ingest(self, source, batch: int = 10_000) -> Dict[str, int]:
+        # Appends what the source has beyond the checkpoints; returns new
+        # events per channel. Each batch and its checkpoint move commit together,
+        # so an interrupted run resumes where it stopped.
+        checkpoints = self.checkpoints()
+        added: Dict[str, int] = {}
+        pending: List[Event] = []
+        for ev in source.events(checkpoints):
+            if isinstance(ev, Cleared):
+                if pending:
+                    self._append(pending, added)
+                    pending = []
+                self.reset_channel(ev.host, ev.channel)
+                continue
+            pending.append(ev)
+            if len(pending) >= batch:
+                self._append(pending, added)
+                pending = []
+        if pending:
+            self._append(pending, added)
+        return added
+
+    def _append(self, events: List[Event], added: Dict[str, int]):
+        top: Dict[Tuple[str, str], Event] = {}
+        for ev in events:
+            key = (ev.host, ev.channel)
+            if key not in top or ev.record > top[key].record:
+                top[key] = ev
+            added[ev.channel] = added.get(ev.channel, 0) + 1
+        with self.db:
+            generations = {(host, channel): generation for host, channel, generation
+                           in self.db.execute("SELECT host, channel, generation FROM checkpoints")}
+            last_id = self.db.execute("SELECT coalesce(max(id), 0) FROM events").fetchone()[0]
+            # Re-read records of the current generation are skipped
+            self.db.executemany(f"INSERT OR IGNORE INTO events ({SOURCE_COLUMNS}, host, generation) "
+                                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                [ev[:7] + (ev.host, generations.get((ev.host, ev.channel), 0)) for ev in events])
+            # External-content FTS: index only the rows this batch added
+            self.db.execute("INSERT INTO events_fts (rowid, message, source, event_id) "
+                            "SELECT id, message, source, event_id FROM events WHERE id > ?", (last_id,))
+            if self.miner is not None:
+                self._assign_templates(last_id)
+            # Records only grow within a generation; reset_channel starts the
+            # checkpoint over when the log is cleared
+            now = time.time()
+            self.db.executemany(
+                "INSERT INTO checkpoints (host, channel, record, time, generation, updated) VALUES (?, ?, ?, ?, 0, ?) "
+                "ON CONFLICT (host, channel) DO UPDATE SET "
+                "time = CASE WHEN excluded.record > record THEN excluded.time ELSE time END, "
+                "record = max(record, excluded.record), updated = excluded.updated",
+                [(ev.host, ev.channel, ev.record, ev.time, now) for ev in top.values()])
+
+    def _assign_templates(self, after_id: int, batch: int = 10_000):
+        # Clusters the events past after_id that have none yet, then saves the
+        # clusters they touched. Runs inside the caller's transaction.
+        touched = {}
+        while True:
+            rows = self.db.execute(f"SELECT id, {SOURCE_COLUMNS} FROM events "
+                                   "WHERE id > ? AND template IS NULL ORDER BY id LIMIT ?",
+                                   (after_id, batch)).fetchall()
+            if not rows:
+                break
+            updates = []
+            for row in rows:
+                cluster = self.miner.add(Event(*row[1:]))
+                touched[cluster.id] = cluster
+                updates.append((cluster.id, row[0]))
+            self.db.executemany("UPDATE events SET template = ? WHERE id = ?", updates)
+            after_id = rows[-1][0]
+        self.db.executemany("INSERT OR REPLACE INTO templates VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                            [c.row() for c in touched.values()])
+
+    @staticmethod
+    def _filters(channels: Optional[Iterable[str]], levels: Optional[Iterable[str]], prefix: str = ""):
+        clauses, params = [], []
+        if channels:
+            channels = list(channels)
+            clauses.append(f"{prefix}channel IN ({','.join('?' * len(channels))})")
+            params += channels
+        if levels:
+            levels = list(levels)
+            clauses.append(f"{prefix}level IN ({','.join('?' * len(levels))})")
+            params += levels
+        return clauses, params
+
+    def recent(self, channels: Optional[Iterable[str]] = None, limit: int = 15,
+               levels: Optional[Iterable[str]] = None) -> List[Event]:
+        clauses, params = self._filters(channels, levels)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self.db.execute(f"SELECT {COLUMNS} FROM events {where} ORDER BY time DESC LIMIT ?",
+                               params + [limit])
+        return [Event(*row) for row in rows]
+
+    def search(self, text: str, channels: Optional[Iterable[str]] = None, limit: int = 15,
+               levels: Optional[Iterable[str]] = None) -> List[Event]:
+        # Best FTS5 (bm25) matches for free text, newest first among equals
+        return [ev for _, ev in self.search_scored(text, channels, limit, levels)]
+
+    def search_scored(self, text: str, channels: Optional[Iterable[str]] = None, limit: int = 15,
+                      levels: Optional[Iterable[str]] = None,
+                      weights=(1.0, 2.0, 2.0)) -> List[Tuple[float, Event]]:
+        # (BM25 score, event) pairs, best first; higher is better. `weights`
+        # are the per-column BM25 weights for message, source and event ID.
+        query = fts_query(text)
+        if not query:
+            return []
+        clauses, params = self._filters(channels, levels, "e.")
+        where = "".join(f" AND {c}" for c in clauses)
+        cols = ", ".join(f"e.{c.strip()}" for c in COLUMNS.split(","))
+        rank = f"bm25(events_fts, {', '.join(str(float(w)) for w in weights)})"
+        rows = self.db.execute(
+            f"SELECT {rank} AS rank, {cols} FROM events_fts JOIN events e ON e.id = events_fts.rowid "
+            f"WHERE events_fts MATCH ?{where} ORDER BY rank, e.time DESC LIMIT ?",
+            [query] + params + [limit])
+        # FTS5 reports BM25 negated so that ascending order is best first
+        return [(-row[0], Event(*row[1:])) for row in rows]
+
+    def latest_time(self) -> Optional[float]:
+        return self.db.execute("SELECT max(time) FROM events").fetchone()[0]
+
+    def count(self, channel: Optional[str] = None) -> int:
+        if channel is None:
+            return self.db.execute("SELECT count(*) FROM events").fetchone()[0]
+        return self.db.execute("SELECT count(*) FROM events WHERE channel = ?", (channel,)).fetchone()[0]
+
+    def close(self):
+        self.db.close()
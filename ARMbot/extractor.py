@@ -0,0 +1,305 @@
+import datetime
+import functools
+import platform
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+from event_store import CHANNELS, Checkpoints, Cleared, Event
+
+# --- Parallel event extraction ---
+# Channels are read concurrently on a bounded pool; each worker turns raw
+# records into Events and hands them over in batches through a bounded queue,
+# so a large first read never sits in memory at once. Reading and message
+# formatting are pluggable: the live log goes through pywin32, while the fake
+# reader and formatter let throughput be measured on any OS.
+#
+# win32evtlogutil.SafeFormatMessage looks up the source's message DLLs in the
+# registry, loads them, formats and unloads them again for every event. Here
+# the DLLs stay loaded per (channel, source), the message template is resolved
+# once per (source, event ID) through an LRU, and the insertion strings are
+# substituted in Python. Timestamps are taken straight from TimeGenerated
+# instead of being formatted and parsed back.
+
+# EventType values (win32con.EVENTLOG_*_TYPE / AUDIT_*); 0 is EVENTLOG_SUCCESS
+LEVELS = {0: "INFO", 1: "ERROR", 2: "WARNING", 4: "INFO", 8: "AUDIT_SUCCESS", 16: "AUDIT_FAILURE"}
+
+_INSERT = re.compile(r"%(\d+)(?:![^!]*!)?|%([ntrb%.!0])")
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": " ", "%": "%", ".": ".", "!": "!", "0": ""}
+
+
+def expand_message(template: str, inserts: Optional[Iterable[str]]) -> str:
+    # FormatMessage's %1..%99 (with optional !printf!) and escape sequences
+    inserts = list(inserts or ())
+
+    def sub(m):
+        if m.group(1):
+            i = int(m.group(1)) - 1
+            return inserts[i] if i < len(inserts) else m.group(0)
+        return _ESCAPES[m.group(2)]
+
+    return _INSERT.sub(sub, template)
+
+
+# --- Message formatters ---
+# template(channel, source, event_id) -> message template, or None
+
+class Win32Formatter:
+    # Message tables of the source's EventMessageFile DLLs (Windows only)
+    def __init__(self):
+        self._modules: Dict[tuple, List] = {}
+        self._lock = threading.Lock()
+
+    def _handles(self, channel: str, source: str) -> List:
+        import win32api
+        import win32con
+
+        with self._lock:
+            if (channel, source) in self._modules:
+                return self._modules[(channel, source)]
+            handles = []
+            try:
+                key = win32api.RegOpenKey(win32con.HKEY_LOCAL_MACHINE,
+                                          f"SYSTEM\\CurrentControlSet\\Services\\EventLog\\{channel}\\{source}")
+                try:
+                    dlls = win32api.RegQueryValueEx(key, "EventMessageFile")[0]
+                finally:
+                    win32api.RegCloseKey(key)
+            except win32api.error:
+                dlls = ""
+            for dll in filter(None, dlls.split(";")):
+                try:
+                    handles.append(win32api.LoadLibraryEx(win32api.ExpandEnvironmentStrings(dll), 0,
+                                                          win32con.LOAD_LIBRARY_AS_DATAFILE))
+                except win32api.error:
+                    continue
+            self._modules[(channel, source)] = handles
+            return handles
+
+    def template(self, channel: str, source: str, event_id: int) -> Optional[str]:
+        import win32api
+        import win32con
+
+        flags = win32con.FORMAT_MESSAGE_FROM_HMODULE | win32con.FORMAT_MESSAGE_IGNORE_INSERTS
+        lang = win32api.MAKELANGID(win32con.LANG_NEUTRAL, win32con.SUBLANG_NEUTRAL)
+        for handle in self._handles(channel, source):
+            try:
+                return win32api.FormatMessageW(flags, handle, event_id, lang, None)
+            except win32api.error:
+                continue
+        return None
+
+    def close(self):
+        import win32api
+        with self._lock:
+            for handles in self._modules.values():
+                for handle in handles:
+                    win32api.FreeLibrary(handle)
+            self._modules.clear()
+
+
+class FakeFormatter:
+    # Every template is "%1" (the fake reader puts the whole message in the
+    # first insertion string). `cost` seconds per lookup stand in for the
+    # registry read and DLL load; the sleep releases the GIL as those do.
+    def __init__(self, cost: float = 0.0002):
+        self.cost = cost
+
+    def template(self, channel: str, source: str, event_id: int) -> Optional[str]:
+        if self.cost:
+            time.sleep(self.cost)
+        return "%1"
+
+    def close(self):
+        pass
+
+
+class CachedFormatter:
+    # LRU over any formatter's template lookups
+    def __init__(self, provider, maxsize: int = 4096):
+        self.provider = provider
+        self.template = functools.lru_cache(maxsize=maxsize)(provider.template)
+
+    def cache_info(self):
+        return self.template.cache_info()
+
+    def close(self):
+        self.provider.close()
+
+
+# --- Readers ---
+# read(channel, after) -> batches of raw records newer than `after`, with the
+# attributes of pywin32's PyEventLogRecord. When the log was cleared since
+# `after`, CLEARED comes first and every record is read.
+
+CLEARED = object()
+
+class Win32Reader:
+    def __init__(self, server: str = "localhost"):
+        self.server = server
+
+    def read(self, channel: str, after: int) -> Iterator[list]:
+        import win32evtlog
+
+        hand = win32evtlog.OpenEventLog(self.server, channel)
+        try:
+            oldest = win32evtlog.GetOldestEventLogRecord(hand)
+            newest = oldest + win32evtlog.GetNumberOfEventLogRecords(hand) - 1
+            if after > newest:
+                # Record numbers went backwards: the log was cleared
+                yield CLEARED
+                after = 0
+            if newest <= after:
+                return
+            # Seek to the first unread record, then read forwards sequentially
+            flags = win32evtlog.EVENTLOG_FORWARDS_READ | win32evtlog.EVENTLOG_SEEK_READ
+            offset = max(after + 1, oldest)
+            while True:
+                batch = win32evtlog.ReadEventLog(hand, flags, offset)
+                if not batch:
+                    break
+                yield [r for r in batch if r.RecordNumber > after]
+                flags = win32evtlog.EVENTLOG_FORWARDS_READ | win32evtlog.EVENTLOG_SEQUENTIAL_READ
+                offset = 0
+        finally:
+            win32evtlog.CloseEventLog(hand)
+
+
+class FakeTime(datetime.datetime):
+    # pywintypes.datetime's Format(), for the old strptime round trip
+    def Format(self, fmt: str = "%a %b %d %H:%M:%S %Y") -> str:
+        return self.strftime(fmt)
+
+
+class RawRecord(NamedTuple):
+    RecordNumber: int
+    TimeGenerated: datetime.datetime
+    EventType: int
+    SourceName: str
+    EventID: int
+    StringInserts: tuple
+
+
+class FakeReader:
+    # Synthetic events as raw records, per channel. `read_cost` seconds per
+    # batch stand in for the ReadEventLog call.
+    TYPES = {level: t for t, level in LEVELS.items() if t}
+
+    def __init__(self, events: Iterable[Event], batch: int = 512, read_cost: float = 0.002):
+        self.records: Dict[str, List[RawRecord]] = {}
+        for ev in events:
+            self.records.setdefault(ev.channel, []).append(self._raw(ev, ev.record))
+        self.batch = batch
+        self.read_cost = read_cost
+
+    def _raw(self, ev: Event, record: int) -> RawRecord:
+        return RawRecord(record, FakeTime.fromtimestamp(ev.time), self.TYPES[ev.level], ev.source,
+                         ev.event_id, (ev.message,))
+
+    def clear(self, channel: str, events: Iterable[Event] = ()):
+        # Clears the channel's log, then logs `events` into it, numbered from
+        # 1 again as Windows does
+        self.records[channel] = [self._raw(ev, i) for i, ev in enumerate(events, 1)]
+
+    def read(self, channel: str, after: int) -> Iterator[list]:
+        records = self.records.get(channel, [])
+        if after > (records[-1].RecordNumber if records else 0):
+            yield CLEARED
+            after = 0
+        records = [r for r in records if r.RecordNumber > after]
+        for i in range(0, len(records), self.batch):
+            if self.read_cost:
+                time.sleep(self.read_cost)
+            yield records[i:i + self.batch]
+
+
+# --- Extractor (an event_store source) ---
+class ChannelExtractor:
+    def __init__(self, reader, formatter, channels: Iterable[str] = CHANNELS,
+                 workers: Optional[int] = None, queue_batches: int = 8, host: str = ""):
+        self.channels = list(channels)
+        for channel in self.channels:
+            if channel not in CHANNELS:
+                raise ValueError(f"Invalid log type. Must be one of {CHANNELS}")
+        self.reader = reader
+        self.formatter = formatter
+        self.workers = workers or len(self.channels)
+        self.queue_batches = queue_batches
+        self.host = host  # the computer whose log is read; scopes the checkpoints
+
+    def convert(self, channel: str, rec) -> Optional[Event]:
+        level = LEVELS.get(rec.EventType)
+        if level is None:
+            return None
+        template = self.formatter.template(channel, rec.SourceName, rec.EventID)
+        if template is not None:
+            msg = expand_message(template, rec.StringInserts)
+        else:
+            msg = " ".join(rec.StringInserts or ())
+        return Event(channel, rec.RecordNumber, rec.TimeGenerated.timestamp(), level,
+                     rec.SourceName, rec.EventID & 0xFFFF, msg.strip() or "No message available", host=self.host)
+
+    def events(self, checkpoints: Checkpoints) -> Iterator[Event]:
+        # Batches arrive interleaved across channels, in record order within
+        # each. A channel that fails doesn't stop the others; its error is
+        # raised once everything readable has been yielded.
+        batches: queue.Queue = queue.Queue(self.queue_batches)
+        stop = threading.Event()
+        errors = []
+
+        def put(item):
+            while not stop.is_set():
+                try:
+                    batches.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def work(channel):
+            try:
+                cp = checkpoints.get((self.host, channel))
+                for raw in self.reader.read(channel, cp.record if cp else 0):
+                    if raw is CLEARED:
+                        # Ahead of the channel's events, so the store
+                        # restarts its checkpoint before storing them
+                        if not put([Cleared(self.host, channel)]):
+                            return
+                        continue
+                    events = [ev for ev in (self.convert(channel, rec) for rec in raw) if ev is not None]
+                    if not put(events):
+                        return
+            except Exception as e:
+                errors.append(e)
+            put(None)
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="extract") as pool:
+            for channel in self.channels:
+                pool.submit(work, channel)
+            try:
+                done = 0
+                while done < len(self.channels):
+                    events = batches.get()
+                    if events is None:
+                        done += 1
+                        continue
+                    yield from events
+            finally:
+                stop.set()
+        if errors:
+            raise errors[0]
+
+    def close(self):
+        self.formatter.close()
+
+
+class Win32Source(ChannelExtractor):
+    # The live event log
+    def __init__(self, channels: Iterable[str] = CHANNELS, server: str = "localhost",
+                 workers: Optional[int] = None, cache_size: int = 4096):
+        host = platform.node() if server == "localhost" else server
+        super().__init__(Win32Reader(server), CachedFormatter(Win32Formatter(), cache_size), channels, workers,
+                         host=host)
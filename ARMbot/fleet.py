@@ -0,0 +1,230 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Optional
+
+import openai
+from openai import AsyncOpenAI
+
+from answer_cache import AnswerCache, fingerprint
+from conversation import strip_reasoning
+from event_store import EventStore, open_source
+from llm import BASE_URL, MODEL, REQUEST_ERRORS, SYSTEM_PROMPT, TRANSPORT_ERRORS, astream_chat, user_message
+from log_clusters import TemplateMiner
+from retrieval import Retriever
+from tokens import count_tokens
+
+# --- Fleet mode ---
+# Diagnoses many devices at once from their exported event logs (one file per
+# device in a directory) and a list of questions. Each export is indexed in
+# memory on a worker thread and the prompts for all questions are built
+# there, while the event loop keeps the inference server busy. One async
+# client is shared, so connections are reused; a semaphore caps the requests
+# in flight to what the server can take. Connection errors (including those
+# raised mid-stream), 429s and 5xx responses are retried with exponential
+# backoff and jitter; a question that still fails is recorded as failed
+# without stopping the rest. Every answer is written as one JSON line as soon
+# as it completes.
+
+EXTENSIONS = (".evtx", ".xml", ".json", ".jsonl")
+
+
+class Job(NamedTuple):
+    device: str
+    question: str
+    messages: List[Dict]
+    prompt_tokens: int
+    log_lines: int
+    fingerprint: str
+
+
+def find_devices(directory: str) -> Dict[str, str]:
+    # Device name -> export path, named after the file
+    devices = {}
+    for name in sorted(os.listdir(directory)):
+        stem, ext = os.path.splitext(name)
+        if ext.lower() in EXTENSIONS:
+            if stem in devices:
+                raise ValueError(f"Device {stem} has more than one export in {directory}")
+            devices[stem] = os.path.join(directory, name)
+    return devices
+
+
+def read_questions(path: str) -> List[str]:
+    # One question per line; blank lines and # comments are skipped
+    with open(path, encoding="utf-8") as f:
+        questions = [line.strip() for line in f]
+    return [q for q in questions if q and not q.startswith("#")]
+
+
+def prepare(device: str, path: str, questions: List[str], log_budget: int = 768) -> List[Job]:
+    # Runs on a worker thread: index the export, then build one prompt per question
+    store = EventStore(miner=TemplateMiner())
+    try:
+        store.ingest(open_source(path))
+        retriever = Retriever(store, budget=log_budget)
+        jobs = []
+        for question in questions:
+            retrieved = retriever.retrieve(question)
+            lines = [line for _, line in retrieved]
+            messages = [{"role": "system", "content": SYSTEM_PROMPT},
+                        {"role": "user", "content": user_message(question, lines)}]
+            jobs.append(Job(device, question, messages, sum(count_tokens(m["content"]) for m in messages),
+                            len(lines), fingerprint([ev for ev, _ in retrieved], store.miner)))
+        return jobs
+    finally:
+        store.close()
+
+
+def _retry_delay(error: Exception, attempt: int, backoff: float, max_backoff: float) -> Optional[float]:
+    # Seconds to wait before the next attempt, or None when retrying won't help
+    if isinstance(error, (openai.RateLimitError, openai.InternalServerError)):
+        retry_after = error.response.headers.get("retry-after")
+        if retry_after is not None:
+            try:
+                return min(max_backoff, float(retry_after))
+            except ValueError:
+                pass
+    elif not isinstance(error, (openai.APIConnectionError,) + TRANSPORT_ERRORS):  # includes timeouts
+        return None
+    return min(max_backoff, backoff * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+
+
+class Fleet:
+    def __init__(self, client: AsyncOpenAI, out, concurrency: int = 2, prepare_workers: int = 1,
+                 retries: int = 4, backoff: float = 0.5, max_backoff: float = 30.0,
+                 log_budget: int = 768, cache: Optional[AnswerCache] = None, model: str = MODEL, **params):
+        self.client = client
+        self.out = out                      # text file the JSON lines go to
+        self.concurrency = concurrency      # requests in flight, matched to the server
+        self.prepare_workers = prepare_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.log_budget = log_budget
+        self.cache = cache
+        self.model = model
+        self.params = params
+        self.counts: Dict[str, int] = {"answered": 0, "cached": 0, "failed": 0, "retries": 0}
+
+    def _write(self, record: Dict):
+        self.out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.out.flush()
+
+    async def diagnose(self, job: Job, gate: asyncio.Semaphore) -> Dict:
+        record = {"device": job.device, "question": job.question, "prompt_tokens": job.prompt_tokens,
+                  "log_lines": job.log_lines}
+        cached = self.cache.get(job.question, job.fingerprint) if self.cache is not None else None
+        if cached is not None:
+            self.counts["cached"] += 1
+            record.update(answer=cached, cached=True, attempts=0)
+            self._write(record)
+            return record
+
+        attempt = 0
+        while True:
+            attempt += 1
+            async with gate:
+                try:
+                    reply = await astream_chat(self.client, job.messages, model=self.model, **self.params)
+                    error = None
+                except REQUEST_ERRORS as e:
+                    error = e
+            if error is None:
+                answer = strip_reasoning(reply.text)
+                if self.cache is not None and answer:
+                    self.cache.put(job.question, job.fingerprint, answer)
+                self.counts["answered"] += 1
+                record.update(answer=answer, cached=False, attempts=attempt, ttft=reply.ttft,
+                              seconds=reply.seconds, completion_tokens=reply.tokens)
+                break
+            # The wait happens outside the gate, so other requests go ahead
+            delay = _retry_delay(error, attempt, self.backoff, self.max_backoff) if attempt <= self.retries else None
+            if delay is None:
+                self.counts["failed"] += 1
+                record.update(error=f"{type(error).__name__}: {error}", attempts=attempt)
+                break
+            self.counts["retries"] += 1
+            await asyncio.sleep(delay)
+        self._write(record)
+        return record
+
+    async def run(self, devices: Dict[str, str], questions: List[str]) -> Dict:
+        loop = asyncio.get_running_loop()
+        gate = asyncio.Semaphore(self.concurrency)
+        # Prepared but unanswered devices are bounded, so a large fleet
+        # isn't all held in memory while the server works through it
+        pending = asyncio.Semaphore(self.concurrency + self.prepare_workers)
+        t0 = time.perf_counter()
+
+        async def device(name: str, path: str):
+            async with pending:
+                try:
+                    jobs = await loop.run_in_executor(executor, prepare, name, path, questions, self.log_budget)
+                except Exception as e:
+                    self.counts["failed"] += len(questions)
+                    self._write({"device": name, "error": f"Error reading {path}: {e}"})
+                    return
+                results = await asyncio.gather(*(self.diagnose(job, gate) for job in jobs), return_exceptions=True)
+                for job, result in zip(jobs, results):
+                    if isinstance(result, Exception):
+                        # Anything diagnose doesn't handle fails this question only
+                        self.counts["failed"] += 1
+                        self._write({"device": job.device, "question": job.question,
+                                     "error": f"{type(result).__name__}: {result}"})
+
+        with ThreadPoolExecutor(self.prepare_workers, thread_name_prefix="fleet-prepare") as executor:
+            await asyncio.gather(*(device(name, path) for name, path in devices.items()))
+        return {**self.counts, "devices": len(devices), "seconds": time.perf_counter() - t0}
+
+
+async def run_fleet(devices: Dict[str, str], questions: List[str], out, base_url: str = BASE_URL,
+                    timeout: float = 600.0, **options) -> Dict:
+    # One client for the whole run: its connection pool is what gets reused.
+    # Its own retries are off; Fleet retries with backoff outside the gate.
+    client = AsyncOpenAI(base_url=base_url, api_key="unused", max_retries=0, timeout=timeout)
+    try:
+        return await Fleet(client, out, **options).run(devices, questions)
+    finally:
+        await client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Diagnose a fleet of devices from their exported event logs")
+    parser.add_argument("logs", help="Directory with one export per device (.evtx, .xml, .json, .jsonl)")
+    parser.add_argument("--questions", required=True, help="Text file, one question per line")
+    parser.add_argument("--out", default="fleet_results.jsonl", help="JSON lines, one per device and question")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--model", default=MODEL)
+    parser.add_argument("--concurrency", type=int, default=2,
+                        help="Requests in flight; the server's parallel slots plus one keeps it busy")
+    parser.add_argument("--prepare-workers", type=int, default=1, help="Threads indexing exports")
+    parser.add_argument("--retries", type=int, default=4)
+    parser.add_argument("--backoff", type=float, default=0.5, help="First retry delay in seconds, doubled each time")
+    parser.add_argument("--log-budget", type=int, default=768)
+    parser.add_argument("--cache", help="Answer cache file shared across devices (off by default)")
+    args = parser.parse_args()
+
+    devices = find_devices(args.logs)
+    questions = read_questions(args.questions)
+    if not devices or not questions:
+        print(f"Error: nothing to do ({len(devices)} device exports, {len(questions)} questions).")
+        return
+    cache = AnswerCache(args.cache) if args.cache else None
+    print(f"{len(devices)} devices x {len(questions)} questions, {args.concurrency} requests in flight")
+    with open(args.out, "w", encoding="utf-8") as out:
+        summary = asyncio.run(run_fleet(devices, questions, out, base_url=args.base_url, model=args.model,
+                                        concurrency=args.concurrency, prepare_workers=args.prepare_workers,
+                                        retries=args.retries, backoff=args.backoff,
+                                        log_budget=args.log_budget, cache=cache))
+    total = summary["answered"] + summary["cached"]
+    print(f"{total} answers ({summary['cached']} cached), {summary['failed']} failed, "
+          f"{summary['retries']} retries in {summary['seconds']:.1f} s -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
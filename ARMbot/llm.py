@@ -0,0 +1,130 @@
+import asyncio
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import openai
+
+try:
+    import httpx
+except ImportError:  # newer openai releases depend on the httpx2 fork
+    import httpx2 as httpx
+
+# --- Streaming chat completions ---
+# Answers are streamed token by token from the OpenAI-compatible server, so
+# text appears as soon as prefill is done, and Ctrl-C stops a generation
+# without leaving the program. Every reply carries its timings.
+
+BASE_URL = "http://localhost:5272/v1"
+MODEL = "qnn-deepseek-r1-distill-qwen-1.5b"
+PARAMS = dict(max_tokens=2048, temperature=0.6, top_p=0.9)
+
+# Minimal system prompt
+SYSTEM_PROMPT = """\
+You are a Windows-on-ARM troubleshooting assistant. Always respond in English.
+Use the system logs provided and your knowledge of Windows internals to:
+  1. Diagnose the root cause of the user’s problem.
+  2. Propose clear, step-by-step solutions.
+Only reference log entries that are directly relevant to the issue."""
+
+# What a request can fail with: the API's errors, plus transport errors and
+# timeouts raised while a stream is read, which the client doesn't wrap
+TRANSPORT_ERRORS = (httpx.TransportError, asyncio.TimeoutError)
+REQUEST_ERRORS = (openai.OpenAIError,) + TRANSPORT_ERRORS
+
+
+class Reply(NamedTuple):
+    text: str
+    ttft: Optional[float]  # seconds from request to first token (None: no token arrived)
+    tokens: int            # completion tokens (server usage if reported, else content chunks)
+    seconds: float         # request to last token
+    cancelled: bool
+    cached: bool = False   # served from the answer cache, no request made
+
+    @property
+    def rate(self) -> float:
+        # Decode speed: tokens after the first over the time after the first
+        if self.ttft is None or self.tokens < 2 or self.seconds <= self.ttft:
+            return 0.0
+        return (self.tokens - 1) / (self.seconds - self.ttft)
+
+    def stats(self) -> str:
+        ttft = f"{self.ttft:.2f} s" if self.ttft is not None else "-"
+        note = " | cancelled" if self.cancelled else " | cached" if self.cached else ""
+        return (f"[first token {ttft} | {self.tokens} tokens | {self.rate:.1f} tok/s | "
+                f"{self.seconds:.2f} s{note}]")
+
+
+def user_message(question: str, lines: List[str], sent_earlier: bool = False) -> str:
+    # The question with the log lines that go with it; sent_earlier when the
+    # relevant lines are already in the conversation
+    content = f"Ignore chat history if not relevant. New User question: {question}\n\n"
+    if lines:
+        log_block = "\n".join(lines)
+        content += f"System Logs:\n{log_block}\n"
+    elif sent_earlier:
+        content += "System Logs: the relevant entries were sent earlier in this conversation.\n"
+    else:
+        content += "No system logs available.\n"
+    return content
+
+
+def stream_chat(client, messages: List[Dict], on_text: Optional[Callable[[str], None]] = None,
+                model: str = MODEL, **params) -> Reply:
+    # Streams one completion, passing each piece of text to on_text. Ctrl-C
+    # closes the connection (the server stops generating) and returns what
+    # arrived so far with cancelled=True.
+    params = {**PARAMS, **params}
+    t0 = time.perf_counter()
+    ttft, chunks, usage, pieces = None, 0, None, []
+    stream = None
+    cancelled = False
+    try:
+        stream = client.chat.completions.create(model=model, messages=messages, stream=True, **params)
+        for chunk in stream:
+            if getattr(chunk, "usage", None) is not None:
+                usage = chunk.usage.completion_tokens
+            if not chunk.choices:
+                continue
+            text = chunk.choices[0].delta.content
+            if not text:
+                continue
+            if ttft is None:
+                ttft = time.perf_counter() - t0
+            chunks += 1
+            pieces.append(text)
+            if on_text is not None:
+                on_text(text)
+    except KeyboardInterrupt:
+        cancelled = True
+    finally:
+        if stream is not None:
+            stream.close()
+    return Reply("".join(pieces), ttft, usage or chunks, time.perf_counter() - t0, cancelled)
+
+
+async def astream_chat(client, messages: List[Dict], on_text: Optional[Callable[[str], None]] = None,
+                       model: str = MODEL, **params) -> Reply:
+    # stream_chat for an AsyncOpenAI client. Cancelling the task closes the
+    # stream and propagates; errors from the server are raised as they are.
+    params = {**PARAMS, **params}
+    t0 = time.perf_counter()
+    ttft, chunks, usage, pieces = None, 0, None, []
+    stream = await client.chat.completions.create(model=model, messages=messages, stream=True, **params)
+    try:
+        async for chunk in stream:
+            if getattr(chunk, "usage", None) is not None:
+                usage = chunk.usage.completion_tokens
+            if not chunk.choices:
+                continue
+            text = chunk.choices[0].delta.content
+            if not text:
+                continue
+            if ttft is None:
+                ttft = time.perf_counter() - t0
+            chunks += 1
+            pieces.append(text)
+            if on_text is not None:
+                on_text(text)
+    finally:
+        await stream.close()
+    return Reply("".join(pieces), ttft, usage or chunks, time.perf_counter() - t0, False)
@@ -0,0 +1,139 @@
+import datetime
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from event_store import Event
+from tokens import truncate_tokens
+
+# --- Template clustering (Drain-style) ---
+# Repeated events differ only in IDs, addresses, counters and timestamps.
+# Messages are tokenised with the obvious variables masked, then routed the
+# way Drain's fixed-depth parse tree routes them: by (source, event ID), token
+# count and the first `depth` tokens (tokens with digits go down a wildcard
+# branch). The tree is flattened into one dict keyed by that path, so routing
+# is a hash lookup. The leaf holds a handful of clusters; the event joins the
+# most similar one if enough tokens agree, and positions that disagree become
+# <*>. Adding an event is O(1) amortised.
+
+WILDCARD = "<*>"
+
+# Variables masked before tokenising (GUIDs, IPv4[:port], ISO timestamps,
+# hex, numbers), as one alternation so a message is scanned once
+MASK = re.compile("|".join([
+    r"\{?[0-9A-Fa-f]{8}-[0-9A-Fa-f]{4}-[0-9A-Fa-f]{4}-[0-9A-Fa-f]{4}-[0-9A-Fa-f]{12}\}?",
+    r"\b\d{1,3}(?:\.\d{1,3}){3}(?::\d+)?\b",
+    r"\b\d{4}-\d{2}-\d{2}[T ][\d:.]+Z?",
+    r"\b0x[0-9A-Fa-f]+\b",
+    r"(?<![\w.])-?\d+(?:\.\d+)*(?![\w.])",
+]))
+
+
+def tokenize(message: str) -> List[str]:
+    return MASK.sub(WILDCARD, message).split()
+
+
+class Cluster:
+    def __init__(self, cluster_id: int, ev: Event, tokens: List[str], path: Tuple = ()):
+        self.id = cluster_id
+        self.path = path  # the leaf it lives in; merging can change the template's prefix
+        self.source = ev.source
+        self.event_id = ev.event_id
+        self.level = ev.level
+        self.tokens = tokens
+        self.count = 0
+        self.first = ev.time
+        self.last = ev.time
+        self.example = ev.message
+
+    @property
+    def template(self) -> str:
+        return " ".join(self.tokens)
+
+    def similarity(self, tokens: List[str]) -> float:
+        # Share of positions that agree, a wildcard agreeing with anything
+        same = sum(1 for a, b in zip(self.tokens, tokens) if a == b or a == WILDCARD)
+        return same / len(tokens) if tokens else 1.0
+
+    def add(self, ev: Event, tokens: List[str]):
+        self.tokens = [a if a == b else WILDCARD for a, b in zip(self.tokens, tokens)]
+        self.count += 1
+        self.first = min(self.first, ev.time)
+        if ev.time >= self.last:
+            # The example is the most recent occurrence
+            self.last = ev.time
+            self.example = ev.message
+            self.level = ev.level
+
+    def line(self, max_example_tokens: Optional[int] = None) -> str:
+        # One prompt line: latest occurrence, with the count and time span
+        # when the cluster has repeats
+        last = datetime.datetime.fromtimestamp(self.last).isoformat(timespec="seconds")
+        example = self.example if max_example_tokens is None else truncate_tokens(self.example, max_example_tokens)
+        line = f"[{last}] {self.level} - {self.source}: {example}"
+        if self.count > 1:
+            first = datetime.datetime.fromtimestamp(self.first).isoformat(timespec="seconds")
+            line += f" (x{self.count} since {first})"
+        return line
+
+    # Storage: (id, source, event_id, level, template, prefix, count, first,
+    # last, example), prefix being the leaf's token prefix
+
+    def row(self) -> tuple:
+        return (self.id, self.source, self.event_id, self.level, self.template, " ".join(self.path[3:]),
+                self.count, self.first, self.last, self.example)
+
+    @classmethod
+    def from_row(cls, row) -> "Cluster":
+        cluster_id, source, event_id, level, template, prefix, count, first, last, example = row
+        tokens = template.split(" ")
+        path = (source, event_id, len(tokens), *(prefix.split(" ") if prefix else ()))
+        cluster = cls(cluster_id, Event("", 0, first, level, source, event_id, example), tokens, path)
+        cluster.count, cluster.last = count, last
+        return cluster
+
+
+class TemplateMiner:
+    def __init__(self, sim_threshold: float = 0.5, depth: int = 2, max_clusters_per_leaf: int = 50):
+        self.sim_threshold = sim_threshold
+        self.depth = depth
+        self.max_clusters_per_leaf = max_clusters_per_leaf
+        self.clusters: Dict[int, Cluster] = {}
+        self._leaves: Dict[Tuple, List[Cluster]] = {}
+        self._next_id = 1
+
+    def _path(self, source: str, event_id: int, tokens: List[str]) -> Tuple:
+        prefix = [WILDCARD if any(c.isdigit() for c in t) else t for t in tokens[:self.depth]]
+        return (source, event_id, len(tokens), *prefix)
+
+    def add(self, ev: Event) -> Cluster:
+        tokens = tokenize(ev.message)
+        leaf = self._leaves.setdefault(self._path(ev.source, ev.event_id, tokens), [])
+        best, best_sim = None, -1.0
+        for cluster in leaf:
+            sim = cluster.similarity(tokens)
+            if sim > best_sim:
+                best, best_sim = cluster, sim
+        if best is None or (best_sim < self.sim_threshold and len(leaf) < self.max_clusters_per_leaf):
+            best = Cluster(self._next_id, ev, tokens, self._path(ev.source, ev.event_id, tokens))
+            self._next_id += 1
+            self.clusters[best.id] = best
+            leaf.append(best)
+        best.add(ev, tokens)
+        return best
+
+    def load(self, rows: Iterable[tuple]):
+        # Clusters saved with Cluster.row(), back into their leaves
+        for row in rows:
+            cluster = Cluster.from_row(row)
+            self.clusters[cluster.id] = cluster
+            self._leaves.setdefault(cluster.path, []).append(cluster)
+            self._next_id = max(self._next_id, cluster.id + 1)
+
+    def summarize(self, events: Iterable[Event]) -> List[Cluster]:
+        # Clusters for a batch of events (assigning them first), most recent last
+        seen: Dict[int, Cluster] = {}
+        for ev in events:
+            cluster = self.add(ev)
+            seen[cluster.id] = cluster
+        return sorted(seen.values(), key=lambda c: c.last)
+
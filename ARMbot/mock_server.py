@@ -0,0 +1,227 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import threading
+import time
+from typing import Dict, Optional
+
+from tokens import count_tokens
+
+# --- Mock OpenAI-compatible server ---
+# A stand-in for the local inference server, for offline benchmarks. It serves
+# /v1/chat/completions (streamed or not) and /v1/models over HTTP/1.1 with
+# keep-alive. Timing follows a local NPU: a fixed number of generation slots
+# (requests beyond them queue), prefill time proportional to the prompt
+# tokens, then one token every token_latency seconds. Answers are
+# deterministic, derived from the prompt. fail_rate answers that share of
+# requests with a 503 to exercise client retries.
+
+VOCABULARY = ("the driver event log shows service crash restart update check device power "
+              "network adapter disk memory error warning reinstall firmware settings "
+              "open run command reboot verify Windows ARM64 application").split()
+
+
+class MockServer:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, token_latency: float = 0.02,
+                 prefill_latency: float = 0.0005, answer_tokens: int = 64, slots: int = 1,
+                 fail_rate: float = 0.0, seed: int = 0):
+        self.host = host
+        self.port = port
+        self.token_latency = token_latency      # seconds per generated token
+        self.prefill_latency = prefill_latency  # seconds per prompt token
+        self.answer_tokens = answer_tokens      # unless max_tokens asks for fewer
+        self.slots = slots
+        self.fail_rate = fail_rate
+        self.random = random.Random(seed)
+        self.stats: Dict[str, int] = {"connections": 0, "requests": 0, "failed": 0, "cancelled": 0,
+                                      "prompt_tokens": 0, "completion_tokens": 0, "peak_in_flight": 0}
+        self._active = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1"
+
+    # --- Running in the background ---
+    def start(self) -> str:
+        # Serves on its own thread and event loop; returns the base URL
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self._listen())
+            ready.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name="mock-server", daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self.base_url
+
+    def stop(self):
+        if self._loop is None:
+            return
+        async def shutdown():
+            self._server.close()
+            await self._server.wait_closed()
+        asyncio.run_coroutine_threadsafe(shutdown(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = None
+
+    async def _listen(self):
+        self._server = await asyncio.start_server(self._connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._gate = asyncio.Semaphore(self.slots)
+
+    async def serve_forever(self):
+        await self._listen()
+        async with self._server:
+            await self._server.serve_forever()
+
+    # --- HTTP ---
+    async def _connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.stats["connections"] += 1
+        try:
+            while True:
+                line = await reader.readline()
+                if not line.strip():
+                    break
+                method, path, _ = line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    header = await reader.readline()
+                    if header in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = header.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                await self._route(method, path.split("?")[0], body, writer)
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _send(self, writer, status: int, payload: dict):
+        body = json.dumps(payload).encode()
+        reason = {200: "OK", 400: "Bad Request", 404: "Not Found", 503: "Service Unavailable"}[status]
+        writer.write(f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+        await writer.drain()
+
+    async def _route(self, method: str, path: str, body: bytes, writer):
+        if method == "GET" and path == "/v1/models":
+            await self._send(writer, 200, {"object": "list", "data": [{"id": "mock", "object": "model"}]})
+        elif method == "POST" and path == "/v1/chat/completions":
+            try:
+                request = json.loads(body)
+            except ValueError as e:
+                await self._send(writer, 400, {"error": {"message": f"Invalid JSON: {e}", "type": "invalid_request_error"}})
+                return
+            await self._complete(request, writer)
+        else:
+            await self._send(writer, 404, {"error": {"message": f"No route {method} {path}", "type": "not_found"}})
+
+    # --- Completions ---
+    def _answer(self, messages) -> list:
+        # The same prompt always gets the same answer
+        digest = hashlib.sha1(json.dumps(messages, sort_keys=True).encode()).digest()
+        r = random.Random(digest)
+        return [r.choice(VOCABULARY) for _ in range(self.answer_tokens)]
+
+    async def _complete(self, request: dict, writer):
+        self.stats["requests"] += 1
+        if self.fail_rate and self.random.random() < self.fail_rate:
+            self.stats["failed"] += 1
+            await self._send(writer, 503, {"error": {"message": "Model busy", "type": "server_error"}})
+            return
+        messages = request.get("messages", [])
+        prompt_tokens = sum(count_tokens(m.get("content") or "") for m in messages)
+        words = self._answer(messages)[:request.get("max_tokens") or self.answer_tokens]
+        model = request.get("model", "mock")
+        stream = request.get("stream", False)
+        created = int(time.time())
+        rid = f"chatcmpl-mock-{self.stats['requests']}"
+
+        self._active += 1
+        self.stats["peak_in_flight"] = max(self.stats["peak_in_flight"], self._active)
+        try:
+            async with self._gate:
+                await asyncio.sleep(prompt_tokens * self.prefill_latency)
+                self.stats["prompt_tokens"] += prompt_tokens
+                if not stream:
+                    await asyncio.sleep(len(words) * self.token_latency)
+                    self.stats["completion_tokens"] += len(words)
+                    await self._send(writer, 200, {
+                        "id": rid, "object": "chat.completion", "created": created, "model": model,
+                        "choices": [{"index": 0, "finish_reason": "stop",
+                                     "message": {"role": "assistant", "content": " ".join(words)}}],
+                        "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(words),
+                                  "total_tokens": prompt_tokens + len(words)}})
+                    return
+                await self._stream(writer, rid, created, model, words, prompt_tokens,
+                                   (request.get("stream_options") or {}).get("include_usage", False))
+        except ConnectionError:
+            # The client went away mid-answer (cancelled); generation stops
+            self.stats["cancelled"] += 1
+            raise
+        finally:
+            self._active -= 1
+
+    async def _stream(self, writer, rid, created, model, words, prompt_tokens, include_usage):
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                     b"Cache-Control: no-cache\r\nTransfer-Encoding: chunked\r\n\r\n")
+
+        async def event(payload, last=False):
+            data = f"data: {payload if isinstance(payload, str) else json.dumps(payload)}\n\n".encode()
+            # The terminating chunk goes out with [DONE], so a client that stops
+            # reading at [DONE] finds the response complete and keeps the connection
+            writer.write(f"{len(data):x}\r\n".encode() + data + b"\r\n" + (b"0\r\n\r\n" if last else b""))
+            await writer.drain()
+
+        def chunk(delta, finish=None):
+            return {"id": rid, "object": "chat.completion.chunk", "created": created, "model": model,
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": finish}]}
+
+        await event(chunk({"role": "assistant", "content": ""}))
+        for i, word in enumerate(words):
+            await asyncio.sleep(self.token_latency)
+            await event(chunk({"content": word if i == 0 else " " + word}))
+            self.stats["completion_tokens"] += 1
+        await event(chunk({}, "stop"))
+        if include_usage:
+            await event({"id": rid, "object": "chat.completion.chunk", "created": created, "model": model,
+                         "choices": [], "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(words),
+                                                  "total_tokens": prompt_tokens + len(words)}})
+        await event("[DONE]", last=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock OpenAI-compatible chat server for offline runs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5272)
+    parser.add_argument("--token-ms", type=float, default=20, help="Milliseconds per generated token")
+    parser.add_argument("--prefill-us", type=float, default=500, help="Microseconds per prompt token")
+    parser.add_argument("--answer-tokens", type=int, default=64)
+    parser.add_argument("--slots", type=int, default=1, help="Requests generated at the same time")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Share of requests answered with 503")
+    args = parser.parse_args()
+
+    server = MockServer(args.host, args.port, args.token_ms / 1000, args.prefill_us / 1e6,
+                        args.answer_tokens, args.slots, args.fail_rate)
+    print(f"Serving on http://{args.host}:{args.port}/v1 (Ctrl-C stops)")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        print(f"\n{server.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from event_store import Event, EventStore, format_event
+from tokens import count_tokens, truncate_tokens
+
+# --- Question-aware retrieval ---
+# Candidates are the index's BM25 matches for the question plus the most
+# recent errors and warnings (so "my laptop is slow" still sees failures when
+# no word matches). Each candidate is scored
+#
+#   (relevance + prior) * severity[level] * recency
+#
+# where relevance is BM25 over the question expanded with SYNONYMS,
+# normalised to the best match, and recency decays with a half-life from the
+# newest event in the index towards a floor, so old but relevant events
+# aren't dropped entirely. The best events are packed
+# into a token budget, at most `per_kind` per (source, event ID) so one noisy
+# event doesn't fill it, and returned in time order. When the store clusters
+# events into templates, each cluster is sent once as a summary line.
+
+# Help-desk words -> the vocabulary event messages use for the same thing.
+# Keys match word prefixes ("crash" covers crashes, crashing, crashed).
+SYNONYMS: Dict[str, str] = {
+    "crash": "crashed bugcheck rebooted faulting",
+    "reboot": "rebooted bugcheck shutting",
+    "restart": "rebooted restart",
+    "bsod": "bugcheck dump",
+    "blue": "bugcheck dump",
+    "freez": "hang stopped interacting",
+    "hang": "hang stopped interacting",
+    "froze": "hang stopped interacting",
+    "slow": "limited reduced performance",
+    "throttl": "limited reduced performance",
+    "lag": "limited reduced performance",
+    "wifi": "wlan wireless network",
+    "wi-fi": "wlan wireless network",
+    "internet": "wlan wireless network",
+    "sleep": "sleep",
+    "wake": "sleep",
+    "login": "logon failed",
+    "password": "logon failed password",
+    "try": "failed",
+    "tried": "failed",
+    "attempt": "failed",
+    "drive": "disk",
+    "ssd": "disk",
+    "stop": "terminated stopped",
+}
+
+
+def expand_query(question: str) -> str:
+    # The question plus the event vocabulary for the words it uses
+    text = re.sub(r"\blog(ging|ged)? ?(in|on)\b", "login", question.lower())
+    extra = [v for word in re.findall(r"[\w-]+", text)
+             for k, v in SYNONYMS.items() if word.startswith(k)]
+    return " ".join([text] + extra)
+
+
+SEVERITY: Dict[str, float] = {
+    "ERROR": 1.0,
+    "AUDIT_FAILURE": 0.9,
+    "WARNING": 0.6,
+    "INFO": 0.3,
+    "AUDIT_SUCCESS": 0.15,
+}
+
+
+class Retriever:
+    def __init__(self, store: EventStore, budget: int = 768, candidates: int = 300,
+                 half_life_days: float = 7.0, recency_floor: float = 0.3, prior: float = 0.15,
+                 per_kind: int = 3, max_event_tokens: int = 96,
+                 severity: Optional[Dict[str, float]] = None,
+                 channels: Optional[Iterable[str]] = None):
+        self.store = store
+        self.budget = budget
+        self.candidates = candidates
+        self.half_life = half_life_days * 86400
+        self.recency_floor = recency_floor
+        self.prior = prior
+        self.per_kind = per_kind
+        self.max_event_tokens = max_event_tokens
+        self.severity = severity or SEVERITY
+        self.channels = list(channels) if channels else None
+
+    def score(self, question: str) -> List[Tuple[float, Event]]:
+        matches = self.store.search_scored(expand_query(question), self.channels, self.candidates)
+        best = matches[0][0] if matches else 1.0
+        relevance = {ev: s / best for s, ev in matches}
+        for ev in self.store.recent(self.channels, self.candidates // 2,
+                                    levels=["ERROR", "AUDIT_FAILURE", "WARNING"]):
+            relevance.setdefault(ev, 0.0)
+
+        newest = self.store.latest_time() or 0.0
+        scored = []
+        for ev, rel in relevance.items():
+            decay = 0.5 ** (max(newest - ev.time, 0.0) / self.half_life)
+            recency = self.recency_floor + (1 - self.recency_floor) * decay
+            scored.append(((rel + self.prior) * self.severity.get(ev.level, 0.3) * recency, ev))
+        scored.sort(key=lambda x: (-x[0], -x[1].time))
+        return scored
+
+    def retrieve(self, question: str) -> List[Tuple[Event, str]]:
+        # Best (event, prompt line) pairs that fit the budget, oldest first.
+        # With template clusters in the store an event stands for its whole
+        # cluster: one line with its count and time span, and further events
+        # of the same cluster are skipped.
+        clusters = self.store.miner.clusters if self.store.miner is not None else None
+        picked, used, kinds, seen = [], 0, {}, set()
+        for _, ev in self.score(question):
+            kind = (ev.source, ev.event_id)
+            if kinds.get(kind, 0) >= self.per_kind or ev.template in seen:
+                continue
+            cluster = clusters.get(ev.template) if clusters is not None else None
+            if cluster is not None:
+                line, t = cluster.line(self.max_event_tokens), cluster.last
+            else:
+                line, t = self.format(ev), ev.time
+            cost = count_tokens(line) + 1  # + newline
+            if used + cost > self.budget:
+                continue
+            picked.append((t, ev, line))
+            used += cost
+            kinds[kind] = kinds.get(kind, 0) + 1
+            if cluster is not None:
+                seen.add(cluster.id)
+        picked.sort(key=lambda x: x[0])
+        return [(ev, line) for _, ev, line in picked]
+
+    def format(self, ev: Event) -> str:
+        return truncate_tokens(format_event(ev), self.max_event_tokens)
+
+    def context(self, question: str) -> str:
+        return "\n".join(line for _, line in self.retrieve(question))
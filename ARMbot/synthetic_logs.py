@@ -0,0 +1,169 @@
+import argparse
+import json
+import random
+from typing import Callable, Iterator, List, NamedTuple
+
+from event_store import Event
+
+# --- Synthetic Windows event logs ---
+# Benchmarks and offline runs need logs without a Windows machine. The
+# generator mixes the sources that dominate real System, Application and
+# Security channels, with variable parts (PIDs, GUIDs, addresses, counters)
+# changing between repeats the way they do in real logs.
+
+
+class Template(NamedTuple):
+    channel: str
+    source: str
+    event_id: int
+    level: str
+    weight: float
+    message: Callable[[random.Random], str]
+
+
+SERVICES = ["Windows Update", "Background Intelligent Transfer Service", "Windows Search",
+            "Print Spooler", "Qualcomm Wi-Fi Service", "Windows Defender Antivirus Service",
+            "Delivery Optimization", "Connected Devices Platform Service"]
+APPS = ["msedge.exe", "Teams.exe", "explorer.exe", "OneDrive.exe", "python.exe",
+        "Code.exe", "Spotify.exe", "SearchHost.exe"]
+MODULES = ["ntdll.dll", "KERNELBASE.dll", "ucrtbase.dll", "d3d11.dll", "xtajit64.dll", "qcdxkm.sys"]
+USERS = ["alice", "bob", "SYSTEM", "LOCAL SERVICE", "NETWORK SERVICE", "admin"]
+
+
+def _hex(r: random.Random, digits: int) -> str:
+    return f"{r.getrandbits(4 * digits):0{digits}x}"
+
+
+def _guid(r: random.Random) -> str:
+    return f"{_hex(r, 8)}-{_hex(r, 4)}-{_hex(r, 4)}-{_hex(r, 4)}-{_hex(r, 12)}".upper()
+
+
+def _version(r: random.Random) -> str:
+    return f"{r.randint(1, 130)}.0.{r.randint(1000, 26100)}.{r.randint(0, 999)}"
+
+
+TEMPLATES: List[Template] = [
+    # --- System ---
+    Template("System", "Service Control Manager", 7036, "INFO", 30,
+             lambda r: f"The {r.choice(SERVICES)} service entered the {r.choice(['running', 'stopped'])} state."),
+    Template("System", "Service Control Manager", 7031, "ERROR", 2,
+             lambda r: f"The {r.choice(SERVICES)} service terminated unexpectedly. It has done this "
+                       f"{r.randint(1, 9)} time(s). The following corrective action will be taken in "
+                       f"{r.choice([60000, 120000])} milliseconds: Restart the service."),
+    Template("System", "Microsoft-Windows-DistributedCOM", 10016, "WARNING", 12,
+             lambda r: f"The application-specific permission settings do not grant Local Activation permission "
+                       f"for the COM Server application with CLSID {{{_guid(r)}}} and APPID {{{_guid(r)}}} "
+                       f"to the user NT AUTHORITY\\SYSTEM SID (S-1-5-18) from address LocalHost (Using LRPC)."),
+    Template("System", "Microsoft-Windows-Kernel-Power", 41, "ERROR", 0.3,
+             lambda r: "The system has rebooted without cleanly shutting down first. This error could be caused "
+                       "if the system stopped responding, crashed, or lost power unexpectedly."),
+    Template("System", "Microsoft-Windows-Kernel-Power", 42, "INFO", 3,
+             lambda r: f"The system is entering sleep. Sleep Reason: {r.choice(['Application API', 'Button or Lid', 'System Idle'])}"),
+    Template("System", "Microsoft-Windows-Kernel-Processor-Power", 37, "WARNING", 4,
+             lambda r: f"The speed of processor {r.randint(0, 11)} in group 0 is being limited by system firmware. "
+                       f"The processor has been in this reduced performance state for {r.randint(1, 3600)} seconds "
+                       f"since the last report."),
+    Template("System", "Microsoft-Windows-WHEA-Logger", 17, "WARNING", 1,
+             lambda r: f"A corrected hardware error has occurred. Component: PCI Express Root Port "
+                       f"Bus:Device:Function: 0x{r.randint(0, 3)}:0x{r.randint(0, 31):X}:0x0 "
+                       f"Vendor ID:Device ID: 0x17CB:0x{_hex(r, 4).upper()}"),
+    Template("System", "disk", 153, "WARNING", 1,
+             lambda r: f"The IO operation at logical block address 0x{_hex(r, 8)} for Disk {r.randint(0, 1)} "
+                       f"(PDO name: \\Device\\{r.choice(['00000036', '0000004a'])}) was retried."),
+    Template("System", "Microsoft-Windows-Time-Service", 35, "INFO", 2,
+             lambda r: f"The time service is now synchronizing the system time with the time source "
+                       f"time.windows.com,0x9 (ntp.m|0x9|0.0.0.0:123->20.101.57.{r.randint(1, 254)}:123)."),
+    Template("System", "Microsoft-Windows-WLAN-AutoConfig", 8003, "INFO", 3,
+             lambda r: f"WLAN AutoConfig service has successfully disconnected from a wireless network. "
+                       f"Network SSID: {r.choice(['HomeNet', 'Office-5G', 'Guest'])} "
+                       f"Reason: {r.choice(['The network is disconnected by the driver.', 'The system is entering sleep.'])}"),
+    Template("System", "Microsoft-Windows-WER-SystemErrorReporting", 1001, "ERROR", 0.2,
+             lambda r: f"The computer has rebooted from a bugcheck. The bugcheck was: 0x{r.choice(['0000009f', '000000d1', '00000133'])} "
+                       f"(0x{_hex(r, 16)}, 0x{_hex(r, 16)}). A dump was saved in: C:\\WINDOWS\\MEMORY.DMP. "
+                       f"Report Id: {_guid(r)}."),
+    # --- Application ---
+    Template("Application", "Application Error", 1000, "ERROR", 3,
+             lambda r: f"Faulting application name: {r.choice(APPS)}, version: {_version(r)}, time stamp: 0x{_hex(r, 8)} "
+                       f"Faulting module name: {r.choice(MODULES)}, version: {_version(r)}, "
+                       f"Exception code: 0xc0000005 Fault offset: 0x{_hex(r, 16)} Faulting process id: 0x{_hex(r, 4)}"),
+    Template("Application", "Application Hang", 1002, "ERROR", 1.5,
+             lambda r: f"The program {r.choice(APPS)} version {_version(r)} stopped interacting with Windows and was closed."),
+    Template("Application", "Windows Error Reporting", 1001, "INFO", 4,
+             lambda r: f"Fault bucket {r.getrandbits(60)}, type {r.randint(1, 5)} Event Name: "
+                       f"{r.choice(['APPCRASH', 'AppHangB1', 'LiveKernelEvent'])} Response: Not available Cab Id: 0"),
+    Template("Application", "Microsoft-Windows-Security-SPP", 16384, "INFO", 6,
+             lambda r: f"Successfully scheduled Software Protection service for re-start at "
+                       f"2025-{r.randint(1, 12):02d}-{r.randint(1, 28):02d}T{r.randint(0, 23):02d}:{r.randint(0, 59):02d}:00Z. "
+                       f"Reason: RulesEngine."),
+    Template("Application", "ESENT", 455, "ERROR", 1,
+             lambda r: f"svchost ({r.randint(1000, 20000)},R,98) TILEREPOSITORYS-1-5-18: Error -1023 (0xfffffc01) "
+                       f"occurred while opening logfile C:\\WINDOWS\\system32\\config\\systemprofile\\AppData\\Local\\"
+                       f"TileDataLayer\\Database\\EDB.log."),
+    # --- Security ---
+    Template("Security", "Microsoft-Windows-Security-Auditing", 4624, "AUDIT_SUCCESS", 10,
+             lambda r: f"An account was successfully logged on. Logon Type: {r.choice([2, 5, 7, 11])} "
+                       f"New Logon: Account Name: {r.choice(USERS)} Logon ID: 0x{_hex(r, 6)}"),
+    Template("Security", "Microsoft-Windows-Security-Auditing", 4625, "AUDIT_FAILURE", 1,
+             lambda r: f"An account failed to log on. Account Name: {r.choice(USERS)} "
+                       f"Failure Reason: Unknown user name or bad password. Status: 0xC000006D"),
+    Template("Security", "Microsoft-Windows-Security-Auditing", 4672, "AUDIT_SUCCESS", 8,
+             lambda r: f"Special privileges assigned to new logon. Account Name: {r.choice(USERS)} Logon ID: 0x{_hex(r, 6)}"),
+    Template("Security", "Microsoft-Windows-Security-Auditing", 4798, "AUDIT_SUCCESS", 4,
+             lambda r: f"A user's local group membership was enumerated. Account Name: {r.choice(USERS)} "
+                       f"Process Name: C:\\Windows\\System32\\{r.choice(['svchost.exe', 'mmc.exe', 'explorer.exe'])}"),
+]
+
+# Representative help-desk questions with the (source, event ID) pairs in the
+# synthetic logs that answer them
+QUESTIONS = [
+    ("Why does my laptop keep crashing and rebooting?",
+     {("Microsoft-Windows-Kernel-Power", 41), ("Microsoft-Windows-WER-SystemErrorReporting", 1001)}),
+    ("Teams freezes and then closes by itself",
+     {("Application Hang", 1002), ("Application Error", 1000)}),
+    ("Wi-Fi disconnects every time the laptop wakes from sleep",
+     {("Microsoft-Windows-WLAN-AutoConfig", 8003), ("Microsoft-Windows-Kernel-Power", 42)}),
+    ("Did someone try to log in to my account?",
+     {("Microsoft-Windows-Security-Auditing", 4625)}),
+    ("The laptop feels slow, is the CPU being throttled?",
+     {("Microsoft-Windows-Kernel-Processor-Power", 37)}),
+    ("Is my disk failing?",
+     {("disk", 153)}),
+    ("A service keeps stopping unexpectedly",
+     {("Service Control Manager", 7031)}),
+]
+
+
+def synthetic_events(count: int, seed: int = 0, start: float = 1_735_689_600.0,
+                     mean_gap: float = 20.0, first_record: int = 1) -> Iterator[Event]:
+    # `count` events in time order across all channels; record numbers count
+    # up per channel from first_record, so a second call with a later start
+    # and first_record continues the same logs
+    r = random.Random(seed)
+    weights = [t.weight for t in TEMPLATES]
+    records = {}
+    t = start
+    for template in r.choices(TEMPLATES, weights, k=count):
+        t += r.expovariate(1 / mean_gap)
+        record = records.get(template.channel, first_record)
+        records[template.channel] = record + 1
+        yield Event(template.channel, record, round(t, 3), template.level,
+                    template.source, template.event_id, template.message(r))
+
+
+def write_jsonl(path: str, events: Iterator[Event], append: bool = False) -> int:
+    # Same layout JsonSource reads back
+    n = 0
+    with open(path, "a" if append else "w", encoding="utf-8") as f:
+        for ev in events:
+            f.write(json.dumps(ev._asdict()) + "\n")
+            n += 1
+    return n
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a synthetic Windows event log as JSON lines")
+    parser.add_argument("path")
+    parser.add_argument("--events", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(f"wrote {write_jsonl(args.path, synthetic_events(args.events, args.seed))} events to {args.path}")
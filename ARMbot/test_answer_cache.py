@@ -0,0 +1,92 @@
+from answer_cache import AnswerCache, fingerprint, is_standalone, normalize_question
+from event_store import Event
+
+# --- Answer cache tests ---
+
+
+def event(message, source="Disk", event_id=7):
+    return Event("System", 1, 1000.0, "ERROR", source, event_id, message)
+
+
+def test_normalize_question():
+    assert normalize_question("Why does my laptop keep crashing?") == "crash"
+    assert normalize_question("laptop crashes, why?") == "crash"
+    assert normalize_question("Spooler stopped") == normalize_question("spooler stopping")
+    # Negations are part of the question
+    assert normalize_question("Why is the disk not failing?") == "disk fail not"
+    assert normalize_question("Why?") == ""
+
+
+def test_is_standalone():
+    assert is_standalone("Is my disk failing?")
+    assert not is_standalone("Why does it do that?")
+    assert not is_standalone("And the network?")
+    assert not is_standalone("What about the printer?")
+
+
+def test_fingerprint_ignores_variables():
+    a = fingerprint([event("Bad block 12 on Harddisk0"), event("Bad block 40 on Harddisk0")])
+    b = fingerprint([event("Bad block 99 on Harddisk0")])
+    assert a == b
+    assert a != fingerprint([event("Bad block 12 on Harddisk0", event_id=51)])
+
+
+def test_hit_and_near_hit():
+    cache = AnswerCache()
+    cache.put("Why does my laptop keep crashing during updates?", "fp", "Roll back the driver.")
+    assert cache.get("laptop crashes during updates, why?", "fp") == "Roll back the driver."
+    assert cache.get("why crashing during updates and restarts?", "fp") == "Roll back the driver."
+    assert cache.get("Why does my laptop keep crashing during updates?", "other") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["near_hits"], stats["misses"]) == (1, 1, 1)
+
+
+def test_negation_is_not_a_rewording():
+    cache = AnswerCache(similarity=0.5)
+    cache.put("disk failing after update", "fp", "Replace the disk.")
+    assert cache.get("disk not failing after update", "fp") is None
+
+
+def test_new_events_replace_the_answer():
+    cache = AnswerCache()
+    cache.put("Is my disk failing?", "old", "No.")
+    cache.put("Is my disk failing?", "new", "Yes.")
+    assert cache.get("Is my disk failing?", "old") is None
+    assert cache.get("Is my disk failing?", "new") == "Yes."
+    assert cache.stats()["invalidated"] == 1
+
+
+def test_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("answer_cache.time.time", lambda: now[0])
+    cache = AnswerCache(ttl=60)
+    cache.put("Is my disk failing?", "fp", "No.")
+    now[0] += 59
+    assert cache.get("Is my disk failing?", "fp") == "No."
+    now[0] += 2
+    assert cache.get("Is my disk failing?", "fp") is None
+    assert cache.stats()["expired"] == 1
+
+
+def test_least_recently_used_evicted(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("answer_cache.time.time", lambda: now[0])
+    cache = AnswerCache(max_entries=2)
+    cache.put("disk failing", "fp", "disk failing")
+    now[0] += 1
+    cache.put("network dropping", "fp", "network dropping")
+    now[0] += 1
+    cache.get("disk failing", "fp")
+    now[0] += 1
+    cache.put("printer offline", "fp", "printer offline")
+    assert cache.get("disk failing", "fp") == "disk failing"
+    assert cache.get("network dropping", "fp") is None
+    assert cache.stats()["evicted"] == 1
+
+
+def test_persists(tmp_path):
+    path = str(tmp_path / "answers.db")
+    cache = AnswerCache(path)
+    cache.put("Is my disk failing?", "fp", "No.")
+    cache.close()
+    assert AnswerCache(path).get("Is my disk failing?", "fp") == "No."
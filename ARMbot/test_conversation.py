@@ -0,0 +1,84 @@
+from conversation import MESSAGE_OVERHEAD, Conversation, strip_reasoning
+from tokens import count_tokens, truncate_tokens
+
+# --- Conversation memory tests ---
+
+SYSTEM = "You are a Windows troubleshooting assistant."
+
+
+def ask(conv, i, logs=(), answer_words=20):
+    conv.add_user(f"question {i}", " ".join([f"question {i}", *logs]), logs)
+    conv.add_assistant(" ".join(["answer"] * answer_words))
+
+
+def test_token_estimates():
+    assert count_tokens("disk failing") == 2
+    assert count_tokens("2024") == 4                  # one token per digit
+    assert count_tokens("Microsoft-Windows") == 4     # long words cost more, punctuation is its own
+    assert count_tokens(truncate_tokens("one two three four five", 3)) <= 3
+
+
+def test_tokens_counts_every_message():
+    conv = Conversation(SYSTEM)
+    ask(conv, 1)
+    expected = sum(count_tokens(m["content"]) + MESSAGE_OVERHEAD for m in conv.messages())
+    assert conv.tokens() == expected
+
+
+def test_history_fits_budget():
+    conv = Conversation(SYSTEM, budget=120, keep_turns=2)
+    for i in range(10):
+        ask(conv, i)
+        assert conv.tokens() <= conv.budget
+    # The newest turns are kept verbatim, the older ones summarised
+    assert [m["content"] for m in conv.turns[::2]] == ["question 8", "question 9"]
+    assert conv.summary[-1].startswith("- Q: question 7 A: answer")
+    assert conv.messages()[1]["content"].startswith("Earlier in this conversation:")
+
+
+def test_recent_turns_over_budget_drop_the_summary():
+    conv = Conversation(SYSTEM, budget=60, keep_turns=1)
+    ask(conv, 1)
+    ask(conv, 2, answer_words=60)
+    assert conv.summary == []
+    assert len(conv.turns) == 2
+
+
+def test_log_lines_sent_once():
+    conv = Conversation(SYSTEM, budget=100, keep_turns=1)
+    ask(conv, 1, ["disk error 7"])
+    assert conv.new_lines(["disk error 7", "disk error 9"]) == ["disk error 9"]
+    # Folded into the summary: the model no longer has the line
+    ask(conv, 2)
+    ask(conv, 3)
+    assert conv.new_lines(["disk error 7"]) == ["disk error 7"]
+
+
+def test_pop_forgets_logs():
+    conv = Conversation(SYSTEM)
+    conv.add_user("question", "question disk error 7", ["disk error 7"])
+    conv.pop()
+    assert conv.turns == []
+    assert conv.new_lines(["disk error 7"]) == ["disk error 7"]
+
+
+def test_strip_reasoning():
+    assert strip_reasoning("<think>\nthe disk?\n</think>\n\nCheck the disk.") == "Check the disk."
+    conv = Conversation(SYSTEM)
+    conv.add_assistant("<think>hmm</think>Reboot.")
+    assert conv.turns[-1]["content"] == "Reboot."
+
+
+def test_save_and_load(tmp_path):
+    path = str(tmp_path / "session.json")
+    conv = Conversation(SYSTEM, path=path)
+    ask(conv, 1, ["disk error 7"])
+    # Interrupted before the answer
+    conv.add_user("question 2", "question 2", ["disk error 9"])
+    conv.save()
+    restored = Conversation(SYSTEM, path=path)
+    assert restored.load()
+    assert [m["content"] for m in restored.turns] == [m["content"] for m in conv.turns[:2]]
+    assert restored.new_lines(["disk error 7", "disk error 9"]) == ["disk error 9"]
+    restored.clear()
+    assert not Conversation(SYSTEM, path=path).load()
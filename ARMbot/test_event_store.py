@@ -0,0 +1,97 @@
+import json
+
+import pytest
+
+from event_store import Checkpoint, Cleared, Event, EventStore, JsonSource, XmlSource, after_checkpoints, open_source
+
+# --- Event store tests ---
+# Exports are written as small JSON Lines / XML files; the store runs in memory.
+
+
+def write_json(path, records, host=None, start=1000.0, channel="System"):
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            obj = {"channel": channel, "record": record, "time": start + record, "level": "ERROR",
+                   "source": "Disk", "event_id": 7, "message": f"Bad block {record} on Harddisk0"}
+            if host:
+                obj["MachineName"] = host
+            f.write(json.dumps(obj) + "\n")
+    return str(path)
+
+
+XML_EVENT = """<Event xmlns="http://schemas.microsoft.com/win/2004/08/events/event"><System>
+<Provider Name="Service Control Manager"/><EventID>7034</EventID><Level>2</Level><Keywords>0x8080000000000000</Keywords>
+<TimeCreated SystemTime="2024-01-01T00:00:{record:02d}.000Z"/><EventRecordID>{record}</EventRecordID>
+<Channel>System</Channel><Computer>PC-01</Computer></System>
+<RenderingInfo><Message>The Spooler service terminated unexpectedly.</Message></RenderingInfo></Event>
+"""
+
+
+def test_ingest_stops_at_checkpoint(tmp_path):
+    store = EventStore()
+    assert store.ingest(JsonSource(write_json(tmp_path / "a.jsonl", range(1, 11), "PC-01"))) == {"System": 10}
+    assert store.checkpoints() == {("PC-01", "System"): Checkpoint(10, 1010.0)}
+    # A later export overlaps the first one
+    assert store.ingest(JsonSource(write_json(tmp_path / "b.jsonl", range(5, 16), "PC-01"))) == {"System": 5}
+    assert store.count() == 15
+    assert store.checkpoints()[("PC-01", "System")].record == 15
+
+
+def test_hosts_are_kept_apart(tmp_path):
+    store = EventStore()
+    store.ingest(JsonSource(write_json(tmp_path / "a.jsonl", range(1, 11), "PC-01")))
+    assert store.ingest(JsonSource(write_json(tmp_path / "b.jsonl", range(1, 11), "PC-02"))) == {"System": 10}
+    assert store.count() == 20
+    assert set(store.checkpoints()) == {("PC-01", "System"), ("PC-02", "System")}
+
+
+def test_host_defaults_to_file_name(tmp_path):
+    ev = next(JsonSource(write_json(tmp_path / "pc-03.jsonl", [1])).events({}))
+    assert ev.host == "pc-03.jsonl"
+
+
+def test_cleared_log_starts_new_generation(tmp_path):
+    store = EventStore()
+    store.ingest(JsonSource(write_json(tmp_path / "a.jsonl", range(1, 11), "PC-01")))
+    # Cleared, then three events logged: record numbers restart below the checkpoint
+    after_clear = write_json(tmp_path / "b.jsonl", range(1, 4), "PC-01", start=9000.0)
+    assert store.ingest(JsonSource(after_clear)) == {"System": 3}
+    assert store.count() == 13
+    assert store.checkpoints()[("PC-01", "System")] == Checkpoint(3, 9003.0)
+    generations = store.db.execute("SELECT generation, count(*) FROM events GROUP BY generation "
+                                   "ORDER BY generation").fetchall()
+    assert generations == [(0, 10), (1, 3)]
+    # The same export again adds nothing
+    assert store.ingest(JsonSource(after_clear)) == {}
+    assert store.count() == 13
+
+
+def test_after_checkpoints_yields_cleared_once():
+    checkpoints = {("PC-01", "System"): Checkpoint(10, 1010.0)}
+    events = [Event("System", r, t, "INFO", "S", 1, "m", host="PC-01")
+              for r, t in [(9, 1009.0), (1, 5001.0), (2, 5002.0)]]
+    out = list(after_checkpoints(events, checkpoints))
+    assert out == [Cleared("PC-01", "System"), events[1], events[2]]
+
+
+def test_xml_export_with_declaration(tmp_path):
+    path = tmp_path / "system.xml"
+    path.write_text('<?xml version="1.0" encoding="utf-8"?>\n' + "".join(XML_EVENT.format(record=r) for r in (1, 2)),
+                    encoding="utf-8")
+    events = list(XmlSource(str(path)).events({}))
+    assert [ev.record for ev in events] == [1, 2]
+    assert events[0].host == "PC-01"
+    assert events[0].level == "ERROR"
+    assert events[0].message == "The Spooler service terminated unexpectedly."
+
+
+def test_search(tmp_path):
+    store = EventStore()
+    store.ingest(JsonSource(write_json(tmp_path / "a.jsonl", range(1, 4))))
+    assert len(store.search("bad block harddisk")) == 3
+    assert store.search("keyboard") == []
+
+
+def test_open_source_rejects_unknown_type():
+    with pytest.raises(ValueError):
+        open_source("system.csv")
@@ -0,0 +1,77 @@
+from event_store import Event, EventStore
+from log_clusters import WILDCARD, TemplateMiner, tokenize
+
+# --- Template clustering tests ---
+
+
+def event(message, record=1, source="Service Control Manager", event_id=7034, time=1000.0):
+    return Event("System", record, time, "ERROR", source, event_id, message)
+
+
+class ListSource:
+    def __init__(self, events):
+        self.events_ = events
+
+    def events(self, checkpoints):
+        return iter(self.events_)
+
+
+def test_tokenize_masks_variables():
+    tokens = tokenize("Connection to 10.0.0.5:443 failed with 0x80070005 after 3 tries "
+                      "{3F2504E0-4F89-11D3-9A0C-0305E82C3301} at 2024-01-01T10:00:00Z")
+    assert tokens == ["Connection", "to", WILDCARD, "failed", "with", WILDCARD, "after", WILDCARD, "tries",
+                      WILDCARD, "at", WILDCARD]
+    # Digits inside words are not variables
+    assert tokenize("Harddisk0 on win32k") == ["Harddisk0", "on", "win32k"]
+
+
+def test_repeats_join_one_cluster():
+    miner = TemplateMiner()
+    # The name is past the routing prefix (two tokens), so all three reach one leaf
+    clusters = [miner.add(event(f"The service {name} terminated unexpectedly.", i, time=1000.0 + i))
+                for i, name in enumerate(["Spooler", "Audiosrv", "Spooler"])]
+    assert len({c.id for c in clusters}) == 1
+    cluster = clusters[-1]
+    assert cluster.template == f"The service {WILDCARD} terminated unexpectedly."
+    assert cluster.count == 3
+    assert (cluster.first, cluster.last) == (1000.0, 1002.0)
+    assert "(x3 since" in cluster.line()
+
+
+def test_different_events_stay_apart():
+    miner = TemplateMiner()
+    a = miner.add(event("The Spooler service terminated unexpectedly."))
+    b = miner.add(event("The Spooler service terminated unexpectedly.", event_id=7031))
+    c = miner.add(event("Disk write failed on the paging file volume"))
+    assert len({a.id, b.id, c.id}) == 3
+
+
+def test_summarize_orders_by_last_occurrence():
+    miner = TemplateMiner()
+    clusters = miner.summarize([event("Bad block 1", time=2000.0), event("Driver crashed", time=1000.0),
+                                event("Bad block 2", time=3000.0)])
+    assert [c.template for c in clusters] == ["Driver crashed", f"Bad block {WILDCARD}"]
+
+
+def test_row_round_trip():
+    miner = TemplateMiner()
+    for i in range(3):
+        miner.add(event(f"Bad block {i} on Harddisk0", i, time=1000.0 + i))
+    reloaded = TemplateMiner()
+    reloaded.load(c.row() for c in miner.clusters.values())
+    cluster = reloaded.add(event("Bad block 9 on Harddisk0", 9, time=2000.0))
+    assert list(reloaded.clusters) == [1]
+    assert cluster.count == 4
+
+
+def test_store_keeps_templates_across_restarts(tmp_path):
+    path = str(tmp_path / "events.db")
+    store = EventStore(path, miner=TemplateMiner())
+    store.ingest(ListSource([event(f"Bad block {i} on Harddisk0", i, source="Disk", event_id=7) for i in range(1, 4)]))
+    assert {ev.template for ev in store.recent()} == {1}
+    store.close()
+    store = EventStore(path, miner=TemplateMiner())
+    assert store.miner.clusters[1].count == 3
+    store.ingest(ListSource([event("Bad block 4 on Harddisk0", 4, source="Disk", event_id=7)]))
+    assert store.miner.clusters[1].count == 4
+    store.close()
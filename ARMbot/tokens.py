@@ -0,0 +1,31 @@
+import math
+import re
+
+# --- Token estimates ---
+# The local model's tokenizer isn't available through the OpenAI-compatible
+# API, so prompt sizes are estimated. Qwen-style BPE splits numbers into
+# single digits and most punctuation into its own token, while common English
+# words are one token; long identifiers (GUIDs, paths, hex) cost more. The
+# estimate follows that; it is meant for budgeting, not exact accounting.
+
+_PIECES = re.compile(r"[A-Za-z]+|\d|[^\sA-Za-z\d]")
+
+
+def count_tokens(text: str) -> int:
+    n = 0
+    for piece in _PIECES.findall(text):
+        n += math.ceil(len(piece) / 7) if piece[0].isalpha() else 1
+    return n
+
+
+def truncate_tokens(text: str, limit: int) -> str:
+    # Longest prefix of `text` within `limit` tokens, marked when cut
+    if count_tokens(text) <= limit:
+        return text
+    n = 0
+    for m in _PIECES.finditer(text):
+        piece = m.group()
+        n += math.ceil(len(piece) / 7) if piece[0].isalpha() else 1
+        if n > limit - 1:
+            return text[:m.start()].rstrip() + " …"
+    return text
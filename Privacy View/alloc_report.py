@@ -0,0 +1,104 @@
+import argparse
+import tracemalloc
+import cv2
+import numpy as np
+from PIL import Image
+from blur_engine import BlurEngine
+from compositor import GazeCompositor
+from dirty_tiles import DirtyTileBlur
+from frame_pool import FramePool
+from bench_blur import synthetic_screen
+
+# Reports Python-visible allocations (numpy/OpenCV outputs, PIL wrappers) per
+# frame for the old privacy_overlay.py path and the pooled BGRA path.
+# PIL's own pixel storage is allocated in C and is not seen by tracemalloc;
+# the pooled path avoids it anyway by decoding into one persistent image.
+
+
+class FakeGrabber:
+    # Stands in for mss: every grab returns a fresh bytearray, like mss does,
+    # with a small "cursor" moving across the screen so some tiles change.
+    def __init__(self, width, height):
+        self.base = synthetic_screen(width, height, 4)
+        self.width, self.height = width, height
+        self.i = 0
+
+    def grab(self):
+        self.i += 1
+        frame = self.base.copy()
+        x = (self.i * 37) % (self.width - 20)
+        frame[400:420, x:x + 20] = (0, 0, 255, 255)
+        return bytearray(frame.tobytes())
+
+
+def legacy_frame(raw, w, h, cx, cy, radius=130):
+    img_np = np.array(np.frombuffer(raw, np.uint8).reshape(h, w, 4))
+    img = cv2.cvtColor(img_np, cv2.COLOR_BGRA2RGB)
+    blurred = cv2.GaussianBlur(img, (45, 45), 0)
+    mask = np.zeros((h, w), dtype=np.uint8)
+    cv2.circle(mask, (cx, cy), radius, 255, -1)
+    mask_3ch = np.stack([mask] * 3, axis=-1)
+    return Image.fromarray(np.where(mask_3ch == 255, img, blurred))
+
+
+class PooledPath:
+    def __init__(self, w, h):
+        self.w, self.h = w, h
+        self.tile_blur = DirtyTileBlur(BlurEngine("high"))
+        self.compositor = GazeCompositor(radius=130)
+        self.pool = FramePool((h, w, 4))
+        self.pil_frame = Image.new("RGB", (w, h))
+
+    def frame(self, raw, cx, cy):
+        img = np.frombuffer(raw, np.uint8).reshape(self.h, self.w, 4)
+        out = self.pool.back()
+        np.copyto(out, self.tile_blur.update(img))
+        self.compositor.composite(img, out, cx, cy)
+        self.pool.publish()
+        self.pil_frame.frombytes(self.pool.latest(), "raw", "BGRX")
+
+
+def measure(step, grabber, frames, warmup):
+    for i in range(warmup):
+        step(grabber.grab(), i)
+    peaks, nets = [], []
+    for i in range(frames):
+        raw = grabber.grab()  # source allocation, not counted against the path
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        step(raw, i)
+        after, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - before)
+        nets.append(after - before)
+        del raw
+    return np.median(peaks), np.median(nets)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="tracemalloc report for the capture-to-display path")
+    parser.add_argument("--width", type=int, default=2560)
+    parser.add_argument("--height", type=int, default=1600)
+    parser.add_argument("--frames", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=5)
+    args = parser.parse_args()
+    w, h = args.width, args.height
+    frame_mb = w * h * 4 / 1e6
+
+    tracemalloc.start()
+    grabber = FakeGrabber(w, h)
+    gaze = lambda i: (w // 2 + (i * 13) % 200, h // 2)
+
+    legacy = lambda raw, i: legacy_frame(raw, w, h, *gaze(i))
+    pooled_path = PooledPath(w, h)
+    pooled = lambda raw, i: pooled_path.frame(raw, *gaze(i))
+
+    print(f"{w}x{h}, one BGRA frame = {frame_mb:.1f} MB")
+    print(f"{'path':<10}{'peak MB/frame':>16}{'net MB/frame':>14}{'x frame':>9}")
+    for name, step in [("legacy", legacy), ("pooled", pooled)]:
+        peak, net = measure(step, grabber, args.frames, args.warmup)
+        print(f"{name:<10}{peak / 1e6:>16.3f}{net / 1e6:>14.3f}{peak / 1e6 / frame_mb:>9.2f}")
+    tracemalloc.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import math
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from blur_engine import REFERENCE_SIGMA, BlurEngine
+
+# Band-parallel blur. The frame is cut into horizontal bands aligned to the
+# engine's pyramid factor; each band is blurred together with a halo of rows
+# above and below (the same margin DirtyTileBlur uses) so the kernel sees
+# the rows a full-frame pass would, and only the band itself is written to the
+# shared output. The result matches a full-frame call exactly when the height
+# is a multiple of the factor. Otherwise the full frame is resized by a
+# slightly different, non-integer ratio, and the two differ by a few levels. Bands run on an explicitly sized thread pool (OpenCV
+# releases the GIL), optionally pinned to a set of CPUs. OpenCV's own thread
+# pool is a process-wide setting and is left to the caller: with band
+# workers it should be switched off (cv2.setNumThreads(1)) so the blur never
+# uses more cores than given, and that then applies to every OpenCV call.
+
+
+def parse_cpus(spec):
+    # "0-3,6" -> [0, 1, 2, 3, 6]
+    if not spec:
+        return None
+    cpus = []
+    for part in spec.split(","):
+        lo, _, hi = part.partition("-")
+        cpus.extend(range(int(lo), int(hi or lo) + 1))
+    return cpus
+
+
+def pin_current_thread(cpus):
+    # Restrict the calling thread to `cpus`. Returns False where unsupported.
+    if not cpus:
+        return False
+    if hasattr(os, "sched_setaffinity"):
+        # On Linux pid 0 means the calling thread, not the whole process
+        os.sched_setaffinity(0, cpus)
+        return True
+    if sys.platform == "win32":
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        kernel32.GetCurrentThread.restype = ctypes.c_void_p
+        kernel32.SetThreadAffinityMask.argtypes = [ctypes.c_void_p, ctypes.c_size_t]
+        mask = sum(1 << c for c in cpus)
+        return bool(kernel32.SetThreadAffinityMask(kernel32.GetCurrentThread(), mask))
+    return False
+
+
+class BlurPool(ThreadPoolExecutor):
+    # Bounded pool for BandBlur that knows its size; several BandBlurs (e.g.
+    # one per monitor) can share it
+    def __init__(self, workers=None, cpus=None):
+        self.workers = workers or len(cpus or []) or os.cpu_count() or 1
+        super().__init__(max_workers=self.workers, thread_name_prefix="blur",
+                         initializer=pin_current_thread, initargs=(cpus,))
+
+
+def make_blur_pool(workers=None, cpus=None):
+    return BlurPool(workers, cpus)
+
+
+class BandBlur:
+    # Drop-in for BlurEngine (blur(img, dst), factor, sigma, quality), so it
+    # also works under DirtyTileBlur. Frames under min_pixels (e.g. dirty-tile
+    # regions) are blurred on the calling thread; splitting them costs more
+    # than it saves. A shared pool must be a BlurPool.
+    def __init__(self, quality="high", workers=None, cpus=None, pool=None, bands=None,
+                 sigma=REFERENCE_SIGMA, min_pixels=512 * 512):
+        probe = BlurEngine(quality, sigma)
+        self.quality = quality
+        self.sigma = sigma
+        self.factor = probe.factor
+        margin = math.ceil(3 * sigma) + 2 * self.factor
+        self.margin = -(-margin // self.factor) * self.factor
+        self.min_pixels = min_pixels
+        self._own_pool = pool is None
+        self.pool = pool or make_blur_pool(workers, cpus)
+        self.workers = self.pool.workers
+        self.bands = bands or self.workers
+        self._local = threading.local()
+        self._caller = probe
+
+    def _engine(self):
+        # BlurEngine keeps scratch buffers, so every worker thread gets its own
+        engines = getattr(self._local, "engines", None)
+        if engines is None:
+            engines = self._local.engines = {}
+        key = (self.quality, self.sigma)
+        if key not in engines:
+            engines[key] = (BlurEngine(self.quality, self.sigma), [None])
+        return engines[key]
+
+    def _band(self, img, dst, y0, y1):
+        h = img.shape[0]
+        ry0, ry1 = max(y0 - self.margin, 0), min(y1 + self.margin, h)
+        engine, scratch = self._engine()
+        shape = (ry1 - ry0,) + img.shape[1:]
+        buf = scratch[0]
+        if buf is None or buf.shape[0] < shape[0] or buf.shape[1:] != shape[1:] or buf.dtype != img.dtype:
+            buf = scratch[0] = np.empty(shape, img.dtype)
+        region = engine.blur(img[ry0:ry1], buf[:shape[0]])
+        dst[y0:y1] = region[y0 - ry0:y1 - ry0]
+
+    def band_edges(self, height):
+        step = -(-height // self.bands)
+        step = -(-step // self.factor) * self.factor
+        return [(y, min(y + step, height)) for y in range(0, height, step)]
+
+    def blur(self, img, dst=None):
+        if dst is None:
+            dst = np.empty_like(img)
+        h, w = img.shape[:2]
+        if h * w < self.min_pixels or self.bands == 1:
+            return self._caller.blur(img, dst)
+        futures = [self.pool.submit(self._band, img, dst, y0, y1) for y0, y1 in self.band_edges(h)]
+        for f in futures:
+            f.result()
+        return dst
+
+    __call__ = blur
+
+    def close(self):
+        if self._own_pool:
+            self.pool.shutdown()
@@ -0,0 +1,54 @@
+import argparse
+import os
+import cv2
+import numpy as np
+from band_blur import BandBlur, parse_cpus
+from bench_blur import RESOLUTIONS, synthetic_screen, time_ms
+from blur_engine import BlurEngine
+
+# Scaling of the band-parallel blur from 1 to N workers, next to a single
+# BlurEngine call left to OpenCV's own threading. Also checks that the
+# banded result matches the single-call blur: exactly when the height is a
+# multiple of the pyramid factor, within a few levels otherwise (e.g. 1680x1050).
+# Resolutions are names from bench_blur or WxH.
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Band-parallel blur scaling, 1..N workers")
+    parser.add_argument("--quality", default="high")
+    parser.add_argument("--resolutions", default=",".join(RESOLUTIONS))
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count())
+    parser.add_argument("--cpus", help="Pin blur workers to these CPUs, e.g. 2-7")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    cpus = parse_cpus(args.cpus)
+    print(f"quality={args.quality}  cpus available={os.cpu_count()}  pinned={cpus or 'no'}")
+    print(f"{'res':<10}{'workers':>8}{'ms/frame':>10}{'speedup':>9}{'max diff':>10}")
+    for name in args.resolutions.split(","):
+        width, height = RESOLUTIONS[name] if name in RESOLUTIONS else map(int, name.split("x"))
+        img = synthetic_screen(width, height, 4)
+        out = np.empty_like(img)
+
+        # OpenCV's default threading, as privacy_overlay.py used to run it
+        cv2.setNumThreads(-1)
+        engine = BlurEngine(args.quality)
+        reference = engine.blur(img).copy()
+        base = time_ms(lambda im: engine.blur(im, out), img, args.repeat)
+        print(f"{name:<10}{'cv2':>8}{base:>10.2f}{1.0:>8.2f}x{0:>10}")
+
+        # Band workers with OpenCV's pool off, as privacy_overlay.py --blur-workers runs them
+        cv2.setNumThreads(1)
+        single = None
+        for workers in range(1, args.max_workers + 1):
+            bands = BandBlur(args.quality, workers=workers, cpus=cpus)
+            ms = time_ms(lambda im: bands.blur(im, out), img, args.repeat)
+            single = single or ms
+            diff = int(np.abs(out.astype(np.int16) - reference).max())
+            print(f"{'':<10}{workers:>8}{ms:>10.2f}{single / ms:>8.2f}x{diff:>10}")
+            bands.close()
+    cv2.setNumThreads(-1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import argparse
+import time
+import cv2
+import numpy as np
+from blur_engine import BlurEngine, QUALITY_LEVELS, equivalent_sigma, reference_blur
+
+RESOLUTIONS = {
+    "1080p": (1920, 1080),
+    "1440p": (2560, 1440),
+    "4K": (3840, 2160),
+}
+
+
+def synthetic_screen(width, height, channels=4):
+    # Rows of small text on a light background, roughly like a document window
+    img = np.full((height, width, channels), 235, dtype=np.uint8)
+    for y in range(30, height, 22):
+        cv2.putText(img, "The quick brown fox jumps over the lazy dog 0123456789 " * 4,
+                    (10, y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (20, 20, 20, 255), 1, cv2.LINE_AA)
+    return img
+
+
+def time_ms(fn, img, repeats):
+    fn(img)  # warm-up
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        fn(img)
+    return (time.perf_counter() - t0) * 1000 / repeats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare blur engine quality levels with the original 45x45 GaussianBlur")
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--channels", type=int, default=4, choices=[3, 4])
+    args = parser.parse_args()
+
+    engines = {q: BlurEngine(q) for q in QUALITY_LEVELS}
+    print(f"{'variant':<12}{'sigma':>8}" + "".join(f"{name:>12}" for name in RESOLUTIONS))
+
+    ref_row = [time_ms(reference_blur, synthetic_screen(w, h, args.channels), args.repeats)
+               for w, h in RESOLUTIONS.values()]
+    print(f"{'GaussianBlur':<12}{equivalent_sigma(reference_blur):>8.2f}" + "".join(f"{ms:>10.2f}ms" for ms in ref_row))
+
+    for quality, engine in engines.items():
+        row = []
+        for w, h in RESOLUTIONS.values():
+            img = synthetic_screen(w, h, args.channels)
+            dst = np.empty_like(img)
+            row.append(time_ms(lambda im: engine.blur(im, dst), img, args.repeats))
+        print(f"{quality:<12}{equivalent_sigma(engine.blur):>8.2f}" + "".join(f"{ms:>10.2f}ms" for ms in row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+import argparse
+import ctypes
+import os
+import sys
+import time
+
+# Headless runs need PyOpenGL's EGL (or OSMesa) platform chosen before OpenGL.GL loads
+if __name__ == "__main__" and "PYOPENGL_PLATFORM" not in os.environ and sys.platform.startswith("linux"):
+    os.environ["PYOPENGL_PLATFORM"] = "osmesa" if "--osmesa" in sys.argv else "egl"
+    # Mesa EGL without X/Wayland needs the surfaceless platform
+    os.environ.setdefault("EGL_PLATFORM", "surfaceless")
+
+import cv2
+import numpy as np
+from OpenGL.GL import *
+from bench_blur import RESOLUTIONS, synthetic_screen
+from blur_engine import REFERENCE_SIGMA, BlurEngine, equivalent_sigma
+from compositor import GazeCompositor
+from gl_backend import GLStreamCompositor
+
+# Compares the old GLOverlay.paintGL path (CPU blur + composite, then
+# glTexImage2D(frame.tobytes()) and an immediate-mode quad every frame) with
+# GLStreamCompositor (PBO upload of the raw capture, shader blur/composite).
+# Runs on software GL (Mesa llvmpipe via EGL, or OSMesa) with no display.
+
+
+def egl_context():
+    from OpenGL import EGL
+    display = EGL.eglGetDisplay(EGL.EGL_DEFAULT_DISPLAY)
+    major, minor = EGL.EGLint(), EGL.EGLint()
+    if not EGL.eglInitialize(display, ctypes.pointer(major), ctypes.pointer(minor)):
+        raise RuntimeError("eglInitialize failed")
+    attribs = (EGL.EGLint * 13)(EGL.EGL_SURFACE_TYPE, EGL.EGL_PBUFFER_BIT, EGL.EGL_RED_SIZE, 8, EGL.EGL_GREEN_SIZE, 8,
+                                EGL.EGL_BLUE_SIZE, 8, EGL.EGL_ALPHA_SIZE, 8, EGL.EGL_RENDERABLE_TYPE, EGL.EGL_OPENGL_BIT,
+                                EGL.EGL_NONE)
+    config, count = EGL.EGLConfig(), EGL.EGLint()
+    EGL.eglChooseConfig(display, attribs, ctypes.pointer(config), 1, ctypes.pointer(count))
+    if count.value < 1:
+        raise RuntimeError("No EGL config with desktop OpenGL support")
+    surface = EGL.eglCreatePbufferSurface(display, config, (EGL.EGLint * 5)(EGL.EGL_WIDTH, 16, EGL.EGL_HEIGHT, 16,
+                                                                             EGL.EGL_NONE))
+    EGL.eglBindAPI(EGL.EGL_OPENGL_API)
+    context = EGL.eglCreateContext(display, config, EGL.EGL_NO_CONTEXT, None)
+    if not EGL.eglMakeCurrent(display, surface, surface, context):
+        raise RuntimeError("eglMakeCurrent failed")
+    return display, surface, context
+
+
+def osmesa_context():
+    from OpenGL import arrays, osmesa
+    context = osmesa.OSMesaCreateContextExt(osmesa.OSMESA_RGBA, 24, 0, 0, None)
+    buf = arrays.GLubyteArray.zeros((16, 16, 4))
+    osmesa.OSMesaMakeCurrent(context, buf, GL_UNSIGNED_BYTE, 16, 16)
+    return context, buf
+
+
+def framebuffer(width, height):
+    # Render target at full screen size; pbuffers can be smaller than 4K
+    fbo = glGenFramebuffers(1)
+    rbo = glGenRenderbuffers(1)
+    glBindRenderbuffer(GL_RENDERBUFFER, rbo)
+    glRenderbufferStorage(GL_RENDERBUFFER, GL_RGBA8, width, height)
+    glBindFramebuffer(GL_FRAMEBUFFER, fbo)
+    glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_COLOR_ATTACHMENT0, GL_RENDERBUFFER, rbo)
+    if glCheckFramebufferStatus(GL_FRAMEBUFFER) != GL_FRAMEBUFFER_COMPLETE:
+        raise RuntimeError("Framebuffer incomplete")
+    glViewport(0, 0, width, height)
+    return fbo, rbo
+
+
+def legacy_frame(texture, frame_bgra, engine, compositor, cx, cy, width, height):
+    img_rgb = cv2.cvtColor(frame_bgra, cv2.COLOR_BGRA2RGB)
+    result = compositor.composite(img_rgb, engine.blur(img_rgb), cx, cy)
+    glClear(GL_COLOR_BUFFER_BIT)
+    glEnable(GL_TEXTURE_2D)
+    glBindTexture(GL_TEXTURE_2D, texture)
+    glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+    glTexImage2D(GL_TEXTURE_2D, 0, GL_RGB, width, height, 0, GL_RGB, GL_UNSIGNED_BYTE, result.tobytes())
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+    glBegin(GL_QUADS)
+    glTexCoord2f(0, 0); glVertex2f(-1, 1)
+    glTexCoord2f(1, 0); glVertex2f(1, 1)
+    glTexCoord2f(1, 1); glVertex2f(1, -1)
+    glTexCoord2f(0, 1); glVertex2f(-1, -1)
+    glEnd()
+    glDisable(GL_TEXTURE_2D)
+
+
+def read_back(width, height):
+    pixels = glReadPixels(0, 0, width, height, GL_BGRA, GL_UNSIGNED_BYTE)
+    return np.frombuffer(pixels, np.uint8).reshape(height, width, 4)[::-1]
+
+
+def check_output(frame, out, cx, cy, radius):
+    # Inside the window must be the capture; outside must be strongly smoothed
+    inside = np.abs(out[cy - 10:cy + 10, cx - 10:cx + 10, :3].astype(int) - frame[cy - 10:cy + 10, cx - 10:cx + 10, :3])
+    far = out[40:240, 40:240, :3].astype(np.float64)
+    src = frame[40:240, 40:240, :3].astype(np.float64)
+    return float(inside.max()), float(np.abs(np.diff(far, axis=1)).mean() / max(np.abs(np.diff(src, axis=1)).mean(), 1e-6))
+
+
+def stream_blur(img):
+    # Single-channel blur through the shader passes, for equivalent_sigma
+    height, width = img.shape
+    fbo, rbo = framebuffer(width, height)
+    stream = GLStreamCompositor(width, height, radius=0)
+    stream.upload(np.dstack([img, img, img, np.full_like(img, 255)]))
+    stream.draw(-width, -height)
+    out = read_back(width, height)[..., 0].copy()
+    stream.release()
+    glDeleteFramebuffers(1, [fbo])
+    glDeleteRenderbuffers(1, [rbo])
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Legacy vs streaming GL overlay render path on (software) GL")
+    parser.add_argument("--frames", type=int, default=30)
+    parser.add_argument("--resolutions", default=",".join(RESOLUTIONS))
+    parser.add_argument("--osmesa", action="store_true", help="Use OSMesa instead of EGL")
+    args = parser.parse_args()
+
+    keep = osmesa_context() if args.osmesa else egl_context()
+    print(f"GL_RENDERER: {glGetString(GL_RENDERER).decode()}  GL_VERSION: {glGetString(GL_VERSION).decode()}")
+    print(f"shader blur sigma {equivalent_sigma(stream_blur):.2f} (reference {REFERENCE_SIGMA:.2f})")
+    print(f"{'res':<7}{'legacy ms':>11}{'stream ms':>11}{'speedup':>9}{'window err':>12}{'edge ratio':>12}")
+
+    for name in args.resolutions.split(","):
+        width, height = RESOLUTIONS[name]
+        fbo, rbo = framebuffer(width, height)
+        frames = [synthetic_screen(width, height, 4) for _ in range(2)]
+        frames[1][height // 3:height // 3 + 40] = 0
+        cx, cy = width // 2, height // 2
+        radius = int(130 * height / 1600)
+
+        texture = glGenTextures(1)
+        engine, compositor = BlurEngine("high"), GazeCompositor(radius=radius)
+        legacy_frame(texture, frames[0], engine, compositor, cx, cy, width, height)
+        glFinish()
+        t0 = time.perf_counter()
+        for i in range(args.frames):
+            legacy_frame(texture, frames[i % 2], engine, compositor, cx, cy, width, height)
+        glFinish()
+        legacy_ms = (time.perf_counter() - t0) * 1000 / args.frames
+        glDeleteTextures([texture])
+
+        stream = GLStreamCompositor(width, height, radius=radius)
+        stream.upload(frames[0])
+        stream.draw(cx, cy)
+        glFinish()
+        t0 = time.perf_counter()
+        for i in range(args.frames):
+            stream.upload(frames[i % 2])
+            stream.draw(cx, cy)
+        glFinish()
+        stream_ms = (time.perf_counter() - t0) * 1000 / args.frames
+
+        stream.upload(frames[0])
+        stream.flush()
+        stream.draw(cx, cy)
+        window_err, edge_ratio = check_output(frames[0], read_back(width, height), cx, cy, radius)
+        stream.release()
+        glDeleteFramebuffers(1, [fbo])
+        glDeleteRenderbuffers(1, [rbo])
+        print(f"{name:<7}{legacy_ms:>11.2f}{stream_ms:>11.2f}{legacy_ms / stream_ms:>8.1f}x{window_err:>12.0f}{edge_ratio:>12.3f}")
+    del keep
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+import argparse
+import multiprocessing
+import os
+import threading
+import time
+import cv2
+import numpy as np
+from PIL import Image
+from shared_frames import SharedFrameRing, SharedGazeSlot
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Threads vs processes for the overlay pipeline, headless. Both modes run the
+# same gaze, capture/blur/composite and present loops over the same
+# SharedFrameRing / SharedGazeSlot; only the execution unit differs.
+#
+# FaceMesh is stood in for by webcam-sized OpenCV work plus --gaze-gil-ms of
+# pure-Python work per webcam frame, which holds the GIL the way the
+# landmark pre/post-processing does. --kill-gaze kills the gaze process
+# mid-run (processes mode) to check the overlay keeps blurring.
+
+GAZE_STALE_S = 0.5
+
+
+# === Stage loops (shared by both modes) ===
+def gaze_loop(gaze_spec, stop, width, height, gil_ms, webcam_fps=30):
+    from gaze_filter import make_filter, synthetic_trace
+    slot = SharedGazeSlot.attach(gaze_spec)
+    trace = synthetic_trace(seconds=30.0)
+    gaze_filter = make_filter("one_euro")
+    webcam = np.random.default_rng(0).integers(0, 255, (480, 640, 3), dtype=np.uint8)
+    i, next_due = 0, time.perf_counter()
+    while not stop.is_set():
+        wait = next_due - time.perf_counter()
+        if wait > 0:
+            time.sleep(wait)
+        next_due += 1 / webcam_fps
+        t = time.perf_counter()
+        crop = cv2.resize(cv2.cvtColor(cv2.flip(webcam, 1), cv2.COLOR_BGR2RGB), (320, 240))
+        end = time.perf_counter() + gil_ms / 1000
+        acc = 0
+        while time.perf_counter() < end:
+            acc += int(crop[acc % 240, acc % 320, 0])
+        _, x, y, _ = trace[i % len(trace)]
+        x, y = gaze_filter.update(t, x * width / 2560, y * height / 1600)
+        slot.put(x, y, t)
+        i += 1
+    slot.close()
+
+
+def capture_loop(ring_spec, gaze_spec, stop, width, height, target_fps, source_frames, quality_changes):
+    from bench_replay import load_screen_frames
+    from blur_engine import BlurEngine
+    from compositor import GazeCompositor
+    from dirty_tiles import DirtyTileBlur
+    from mp_overlay import adapt_quality
+    from quality_controller import QualityController
+    ring = SharedFrameRing.attach(ring_spec)
+    gaze = SharedGazeSlot.attach(gaze_spec)
+    frames = load_screen_frames(None, width, height, source_frames)
+    # Same quality adaptation as mp_overlay.capture_worker; a --target-fps
+    # above what the machine reaches makes it step the blur quality down
+    controller = QualityController(target_fps=target_fps)
+    tile_blur = DirtyTileBlur(BlurEngine(quality=controller.level.quality), tile=128)
+    compositor = GazeCompositor(radius=int(130 * height / 1600))
+    i = 0
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        # mss hands back a fresh buffer per grab; mimic that copy
+        raw = bytearray(frames[i % len(frames)].data)
+        img = np.frombuffer(raw, np.uint8).reshape(height, width, 4)
+        out = ring.back()
+        np.copyto(out, tile_blur.update(img))
+        sample = gaze.fresh(GAZE_STALE_S)
+        if sample is not None:
+            compositor.composite(img, out, int(sample[0]), int(sample[1]))
+        ring.commit(sample[2] if sample is not None else np.nan)
+        engine = tile_blur.engine
+        tile_blur = adapt_quality(controller, tile_blur, (time.perf_counter() - t0) * 1000)
+        if tile_blur.engine is not engine:
+            quality_changes.value += 1
+        i += 1
+    ring.close()
+    gaze.close()
+
+
+# === One run ===
+def run(mode, args, width, height):
+    ring = SharedFrameRing((height, width, 4), create=True)
+    gaze = SharedGazeSlot(create=True)
+    ctx = multiprocessing.get_context("spawn")
+    stop = ctx.Event() if mode == "processes" else threading.Event()
+    unit = ctx.Process if mode == "processes" else threading.Thread
+    quality_changes = ctx.Value("i", 0)
+    workers = {
+        "gaze": unit(target=gaze_loop, args=(gaze.spec(), stop, width, height, args.gaze_gil_ms), daemon=True),
+        "capture": unit(target=capture_loop, args=(ring.spec(), gaze.spec(), stop, width, height, args.target_fps,
+                                                    args.source_frames, quality_changes), daemon=True),
+    }
+    for w in workers.values():
+        w.start()
+
+    # Presenter: poll like the Tk loop (every 5 ms) and decode into one image
+    pil_frame = Image.new("RGB", (width, height))
+    # Wait for both workers to produce, so spawn/import time is not measured
+    while ring.seq == 0 or gaze.get()[0] == 0:
+        time.sleep(0.01)
+    seq, presented, latency, windowless, killed_at = ring.seq, 0, [], 0, None
+    ring_start, gaze_start = ring.seq, gaze.get()[0]
+    cpu0, t_start = time.process_time(), time.perf_counter()
+    while time.perf_counter() - t_start < args.seconds:
+        now = time.perf_counter()
+        if args.kill_gaze and killed_at is None and mode == "processes" and now - t_start >= args.kill_gaze:
+            workers["gaze"].kill()
+            killed_at = now
+        new_seq, frame, stamp = ring.latest(seq)
+        if frame is not None:
+            pil_frame.frombytes(frame, "raw", "BGRX")
+            if ring.valid(new_seq):
+                seq = new_seq
+                presented += 1
+                if np.isnan(stamp):
+                    windowless += 1
+                else:
+                    latency.append((time.perf_counter() - stamp) * 1000)
+                    if killed_at is not None and stamp > killed_at:
+                        raise AssertionError("Clear window drawn from gaze after the gaze process died")
+        time.sleep(0.005)
+    wall = time.perf_counter() - t_start
+    composited = ring.seq - ring_start
+    gaze_updates = (gaze.get()[0] - gaze_start) / 2
+    cpu = time.process_time() - cpu0
+
+    stop.set()
+    for w in workers.values():
+        w.join(5)
+    if mode == "processes" and resource is not None:
+        # Reaped children only count after join
+        usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+        cpu += usage.ru_utime + usage.ru_stime
+    torn = ring.torn
+    ring.close()
+    ring.unlink()
+    gaze.close()
+    gaze.unlink()
+    return {
+        "mode": mode,
+        "present_fps": presented / wall,
+        "composite_fps": composited / wall,
+        "gaze_hz": gaze_updates / wall,
+        "latency_p50": float(np.percentile(latency, 50)) if latency else float("nan"),
+        "latency_p95": float(np.percentile(latency, 95)) if latency else float("nan"),
+        "cpu_s": cpu,
+        "torn": torn,
+        "windowless": windowless,
+        "gaze_killed": killed_at is not None,
+        "quality_changes": quality_changes.value,
+    }
+
+
+def main():
+    from bench_blur import RESOLUTIONS
+    parser = argparse.ArgumentParser(description="Single-process (threads) vs multi-process overlay pipeline")
+    parser.add_argument("--resolution", default="1440p", choices=list(RESOLUTIONS))
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--target-fps", type=float, default=240,
+                        help="Quality controller target; the default is out of reach so blur quality steps down")
+    parser.add_argument("--source-frames", type=int, default=30)
+    parser.add_argument("--gaze-gil-ms", type=float, default=10.0,
+                        help="Pure-Python (GIL-holding) work per webcam frame standing in for FaceMesh")
+    parser.add_argument("--kill-gaze", type=float, help="Kill the gaze process after this many seconds")
+    parser.add_argument("--modes", default="threads,processes")
+    args = parser.parse_args()
+
+    width, height = RESOLUTIONS[args.resolution]
+    print(f"{args.resolution}, {os.cpu_count()} CPUs, {args.gaze_gil_ms:g} ms GIL-bound gaze work per webcam frame")
+    print(f"{'mode':<11}{'present':>9}{'composite':>11}{'gaze Hz':>9}{'lat p50':>9}{'p95':>8}{'cpu s':>8}"
+          f"{'torn':>6}{'blurred':>9}{'q changes':>11}")
+    for mode in args.modes.split(","):
+        r = run(mode, args, width, height)
+        print(f"{mode:<11}{r['present_fps']:>9.1f}{r['composite_fps']:>11.1f}{r['gaze_hz']:>9.1f}"
+              f"{r['latency_p50']:>9.1f}{r['latency_p95']:>8.1f}{r['cpu_s']:>8.2f}{r['torn']:>6}{r['windowless']:>9}"
+              f"{r['quality_changes']:>11}")
+        if r["gaze_killed"]:
+            print(f"{'':<11}gaze process killed at {args.kill_gaze:g} s; display kept updating, fully blurred "
+                  f"after {GAZE_STALE_S} s")
+
+
+if __name__ == "__main__":
+    main()
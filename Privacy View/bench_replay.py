@@ -0,0 +1,272 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import cv2
+import numpy as np
+from blur_engine import BlurEngine
+from compositor import GazeCompositor
+from dirty_tiles import DirtyTileBlur
+from frame_pool import FramePool
+from gaze_filter import load_trace, make_filter, synthetic_trace
+from bench_blur import RESOLUTIONS, synthetic_screen
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Headless replay of the overlay pipeline: recorded (or synthetic) webcam,
+# screen and gaze sources go through the same gaze -> capture -> blur ->
+# composite -> present stages as privacy_overlay.py, without a webcam,
+# desktop or win32gui. Each resolution runs in a fresh process so peak RSS
+# is per resolution.
+
+STAGES = ["gaze", "capture", "blur", "composite", "present"]
+IMAGE_EXTS = (".png", ".jpg", ".jpeg", ".bmp")
+
+
+def peak_rss_mb():
+    # Peak resident memory of this process, or None where it can't be read
+    if resource is not None:
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # KB on Linux, bytes on macOS
+        return rss / (2 ** 20 if sys.platform == "darwin" else 1024)
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class Counters(ctypes.Structure):
+            # PROCESS_MEMORY_COUNTERS
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [
+                (name, ctypes.c_size_t) for name in (
+                    "PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage", "QuotaPagedPoolUsage",
+                    "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage", "PagefileUsage", "PeakPagefileUsage")]
+
+        kernel32, psapi = ctypes.windll.kernel32, ctypes.windll.psapi
+        kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+        psapi.GetProcessMemoryInfo.argtypes = [wintypes.HANDLE, ctypes.POINTER(Counters), wintypes.DWORD]
+        counters = Counters(cb=ctypes.sizeof(Counters))
+        if psapi.GetProcessMemoryInfo(kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb):
+            # Peak working set, Windows' closest counterpart
+            return counters.PeakWorkingSetSize / 2 ** 20
+    return None
+
+
+# === Sources ===
+def load_screen_frames(path, width, height, limit=30):
+    # Decoded up front so file I/O never shows up in the capture stage
+    frames = []
+    if path is None:
+        base = synthetic_screen(width, height, 4)
+        for i in range(limit):
+            # Scroll by one text line every 10 frames
+            frame = np.roll(base, -(i // 10) * 22, axis=0) if i % 10 == 0 else frames[-1].copy()
+            # A "typing" strip that changes every frame
+            x = 40 + (i * 9) % (width - 80)
+            cv2.rectangle(frame, (x, height // 3), (x + 8, height // 3 + 14), (20, 20, 20, 255), -1)
+            frames.append(frame)
+        return frames
+    if os.path.isdir(path):
+        names = sorted(n for n in os.listdir(path) if n.lower().endswith(IMAGE_EXTS))[:limit]
+        images = (cv2.imread(os.path.join(path, n)) for n in names)
+    else:
+        cap = cv2.VideoCapture(path)
+        images = []
+        while len(images) < limit:
+            ret, img = cap.read()
+            if not ret:
+                break
+            images.append(img)
+        cap.release()
+    for img in images:
+        img = cv2.resize(img, (width, height), interpolation=cv2.INTER_AREA)
+        frames.append(cv2.cvtColor(img, cv2.COLOR_BGR2BGRA))
+    if not frames:
+        raise ValueError(f"No screen frames found in {path}")
+    return frames
+
+
+class TraceGaze:
+    # Replays a gaze trace (screen px at trace_size) scaled to the target screen
+    def __init__(self, trace, width, height, trace_size=(2560, 1600)):
+        self.trace = trace
+        self.sx, self.sy = width / trace_size[0], height / trace_size[1]
+        self.i = 0
+
+    def next(self):
+        t, x, y, _ = self.trace[self.i % len(self.trace)]
+        self.i += 1
+        return x * self.sx, y * self.sy
+
+
+class VideoGaze:
+    # Runs GazeTracker + FaceMesh on a recorded webcam video, looping it
+    def __init__(self, path, width, height):
+        import mediapipe as mp
+        from gaze_tracker import GazeTracker
+        face_mesh = mp.solutions.face_mesh.FaceMesh(static_image_mode=False, max_num_faces=1, refine_landmarks=False)
+        self.tracker = GazeTracker(face_mesh, infer_every=3)
+        self.path = path
+        self.cap = cv2.VideoCapture(path)
+        self.width, self.height = width, height
+
+    def next(self):
+        ret, frame = self.cap.read()
+        if not ret:
+            self.cap.release()
+            self.cap = cv2.VideoCapture(self.path)
+            ret, frame = self.cap.read()
+        eyes = self.tracker.process(cv2.flip(frame, 1)) if ret else None
+        if eyes is None:
+            return self.width / 2, self.height / 2
+        return eyes[0] * self.width, eyes[1] * self.height
+
+
+# === One resolution ===
+def run_resolution(name, width, height, args):
+    frames = load_screen_frames(args.screen, width, height, args.source_frames)
+    if args.webcam:
+        gaze = VideoGaze(args.webcam, width, height)
+    else:
+        trace = load_trace(args.gaze_trace) if args.gaze_trace else synthetic_trace(seconds=30.0)
+        gaze = TraceGaze(trace, width, height)
+
+    gaze_filter = make_filter("one_euro")
+    tile_blur = DirtyTileBlur(BlurEngine(args.quality)) if args.dirty_tiles else None
+    engine = BlurEngine(args.quality)
+    compositor = GazeCompositor(radius=int(130 * height / 1600))
+    pool = FramePool((height, width, 4))
+    try:
+        from PIL import Image
+        pil_frame = Image.new("RGB", (width, height))
+        present = lambda frame: pil_frame.frombytes(frame, "raw", "BGRX")
+    except ImportError:
+        rgb = np.empty((height, width, 3), np.uint8)
+        present = lambda frame: cv2.cvtColor(frame, cv2.COLOR_BGRA2RGB, dst=rgb)
+
+    timings = {stage: [] for stage in STAGES}
+    end_to_end = []
+    cpu0, wall0 = time.process_time(), time.perf_counter()
+    for i in range(args.warmup + args.frames):
+        marks = [time.perf_counter()]
+        gx, gy = gaze.next()
+        cx, cy = gaze_filter.update(marks[0], gx, gy)
+        marks.append(time.perf_counter())
+
+        # mss hands back a fresh buffer per grab; mimic that copy
+        raw = bytearray(frames[i % len(frames)].data)
+        screen = np.frombuffer(raw, np.uint8).reshape(height, width, 4)
+        marks.append(time.perf_counter())
+
+        blurred = tile_blur.update(screen) if tile_blur else engine.blur(screen)
+        marks.append(time.perf_counter())
+
+        out = pool.back()
+        np.copyto(out, blurred)
+        compositor.composite(screen, out, int(cx), int(cy))
+        pool.publish()
+        marks.append(time.perf_counter())
+
+        present(pool.latest())
+        marks.append(time.perf_counter())
+
+        if i == args.warmup:
+            cpu0, wall0 = time.process_time(), marks[0]
+        if i >= args.warmup:
+            for k, stage in enumerate(STAGES):
+                timings[stage].append((marks[k + 1] - marks[k]) * 1000)
+            end_to_end.append((marks[-1] - marks[0]) * 1000)
+    wall = time.perf_counter() - wall0
+    cpu = time.process_time() - cpu0
+
+    def pct(values):
+        return {f"p{p}": round(float(np.percentile(values, p)), 3) for p in (50, 95, 99)}
+
+    peak_rss = peak_rss_mb()
+    return {
+        "resolution": name,
+        "width": width,
+        "height": height,
+        "frames": args.frames,
+        "fps": round(args.frames / wall, 2),
+        "cpu_s": round(cpu, 3),
+        "cpu_per_frame_ms": round(cpu / args.frames * 1000, 3),
+        "peak_rss_mb": round(peak_rss, 1) if peak_rss is not None else None,
+        # Decoded source frames held in memory, included in peak_rss_mb
+        "source_mb": round(sum(f.nbytes for f in frames) / 2 ** 20, 1),
+        "end_to_end_ms": pct(end_to_end),
+        "stages_ms": {stage: pct(values) for stage, values in timings.items()},
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def print_report(report, baseline=None):
+    base = {r["resolution"]: r for r in baseline["results"]} if baseline else {}
+    print(f"commit {report['commit']}  quality={report['config']['quality']}  dirty_tiles={report['config']['dirty_tiles']}")
+    header = f"{'res':<7}{'fps':>8}{'e2e p50':>9}{'p95':>8}{'p99':>8}{'cpu ms':>8}{'rss MB':>8}{'src MB':>8}"
+    print(header + "".join(f"{s:>11}" for s in STAGES))
+    for r in report["results"]:
+        e2e = r["end_to_end_ms"]
+        line = (f"{r['resolution']:<7}{r['fps']:>8.1f}{e2e['p50']:>9.2f}{e2e['p95']:>8.2f}{e2e['p99']:>8.2f}"
+                f"{r['cpu_per_frame_ms']:>8.2f}{(r['peak_rss_mb'] or 0):>8.0f}{r['source_mb']:>8.0f}")
+        line += "".join(f"{r['stages_ms'][s]['p50']:>11.2f}" for s in STAGES)
+        print(line)
+        old = base.get(r["resolution"])
+        if old:
+            change = (e2e["p50"] / old["end_to_end_ms"]["p50"] - 1) * 100
+            print(f"{'':<7}{'vs ' + str(baseline.get('commit')):>8}  e2e p50 {change:+.1f}%  fps {old['fps']:.1f} -> {r['fps']:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless replay benchmark for the privacy overlay pipeline")
+    parser.add_argument("--screen", help="Directory of screen images or a screen recording (synthetic if omitted)")
+    parser.add_argument("--webcam", help="Recorded webcam video; runs GazeTracker + FaceMesh (needs mediapipe)")
+    parser.add_argument("--gaze-trace", help="Gaze trace CSV (t,x,y in 2560x1600 px); synthetic if omitted")
+    parser.add_argument("--resolutions", default=",".join(RESOLUTIONS), help=f"Comma list from {list(RESOLUTIONS)}")
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--source-frames", type=int, default=30, help="Screen frames decoded into memory and looped")
+    parser.add_argument("--quality", default="high")
+    parser.add_argument("--no-dirty-tiles", dest="dirty_tiles", action="store_false")
+    parser.add_argument("--out", help="Write results as JSON here")
+    parser.add_argument("--baseline", help="Earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    results = []
+    for name in args.resolutions.split(","):
+        width, height = RESOLUTIONS[name]
+        # One process per resolution so ru_maxrss is that resolution's peak
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            results.append(pool.submit(run_resolution, name, width, height, args).result())
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": {"platform": platform.platform(), "processor": platform.machine(), "cpus": os.cpu_count()},
+        "config": {k: v for k, v in vars(args).items() if k not in ("out", "baseline")},
+        "results": results,
+    }
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
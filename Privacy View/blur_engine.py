@@ -0,0 +1,132 @@
+import functools
+import math
+import cv2
+import numpy as np
+
+# Sigma OpenCV derives for the original cv2.GaussianBlur(img, (45, 45), 0) call.
+# Every quality level below is tuned to reach at least this much blur.
+REFERENCE_KSIZE = 45
+REFERENCE_SIGMA = 0.3 * ((REFERENCE_KSIZE - 1) * 0.5 - 1) + 0.8
+
+# quality -> (filter, downscale factor)
+QUALITY_LEVELS = {
+    "full": ("gaussian", 1),
+    "high": ("gaussian", 4),
+    "medium": ("stack", 4),
+    "low": ("box", 8),
+}
+
+
+def reference_blur(img):
+    return cv2.GaussianBlur(img, (REFERENCE_KSIZE, REFERENCE_KSIZE), 0)
+
+
+class BlurEngine:
+    # Blurs at a reduced pyramid level and upsamples back to full size.
+    # The area downsample and bilinear upsample already smear the image, so
+    # only the remaining variance is applied at low resolution.
+    def __init__(self, quality="high", sigma=REFERENCE_SIGMA):
+        if quality not in QUALITY_LEVELS:
+            raise ValueError(f"Invalid quality. Must be one of {list(QUALITY_LEVELS)}")
+        self.quality = quality
+        self.sigma = sigma
+        self.filter, self.factor = QUALITY_LEVELS[quality]
+        if self.filter == "stack" and not hasattr(cv2, "stackBlur"):
+            self.filter = "box"
+        self.low_sigma = self._low_res_sigma()
+        self._small = None
+        self._small_blurred = None
+
+    def _low_res_sigma(self):
+        f = self.factor
+        if f == 1:
+            return self.sigma
+        resample_var = (f * f - 1) / 12 + (f * f) / 6
+        return math.sqrt(max(self.sigma ** 2 - resample_var, 0.25)) / f
+
+    def _blur_small(self, src, dst):
+        s = self.low_sigma
+        if self.filter == "gaussian":
+            return cv2.GaussianBlur(src, (0, 0), s, dst=dst)
+        if self.filter == "stack":
+            # Stack blur is a tent of half-width r + 1: variance ((r + 1)^2 - 1) / 6
+            r = max(1, math.ceil(math.sqrt(6 * s * s + 1) - 1))
+            if not dst.flags.c_contiguous:
+                # stackBlur writes a strided dst (a dirty-tile scratch view) as if it were packed
+                np.copyto(dst, cv2.stackBlur(src, (2 * r + 1, 2 * r + 1)))
+                return dst
+            return cv2.stackBlur(src, (2 * r + 1, 2 * r + 1), dst=dst)
+        # Three box passes of width w have variance 3 * (w^2 - 1) / 12
+        w = max(1, round(math.sqrt(4 * s * s + 1)))
+        w += 1 - w % 2
+        cv2.blur(src, (w, w), dst=dst)
+        cv2.blur(dst, (w, w), dst=dst)
+        return cv2.blur(dst, (w, w), dst=dst)
+
+    def _scratch(self, shape, dtype):
+        # Grow-only buffers; smaller requests (e.g. dirty-tile regions) get views
+        h, w = shape[:2]
+        small = self._small
+        if (small is None or small.dtype != dtype or small.shape[2:] != shape[2:]
+                or small.shape[0] < h or small.shape[1] < w):
+            if small is not None and small.dtype == dtype and small.shape[2:] == shape[2:]:
+                shape = (max(h, small.shape[0]), max(w, small.shape[1])) + shape[2:]
+            self._small = np.empty(shape, dtype)
+            self._small_blurred = np.empty(shape, dtype)
+        return self._small[:h, :w], self._small_blurred[:h, :w]
+
+    def blur(self, img, dst=None):
+        h, w = img.shape[:2]
+        if dst is None:
+            dst = np.empty_like(img)
+        if self.factor == 1:
+            return self._blur_small(img, dst)
+
+        sw, sh = max(1, -(-w // self.factor)), max(1, -(-h // self.factor))
+        small, small_blurred = self._scratch((sh, sw) + img.shape[2:], img.dtype)
+        cv2.resize(img, (sw, sh), dst=small, interpolation=cv2.INTER_AREA)
+        self._blur_small(small, small_blurred)
+        return cv2.resize(small_blurred, (w, h), dst=dst, interpolation=cv2.INTER_LINEAR)
+
+    __call__ = blur
+
+
+# === Privacy check ===
+def equivalent_sigma(blur_fn, size=512):
+    # Blur a vertical step edge at a few sub-factor offsets and measure the
+    # spread of the resulting line-spread function. For a Gaussian blur this
+    # equals its sigma, so it is directly comparable to REFERENCE_SIGMA.
+    sigmas = []
+    for offset in range(8):
+        img = np.zeros((64, size), dtype=np.uint8)
+        img[:, size // 2 + offset:] = 255
+        row = blur_fn(img)[32].astype(np.float64)
+        lsf = np.clip(np.diff(row), 0, None)
+        total = lsf.sum()
+        if total == 0:
+            continue
+        x = np.arange(lsf.size)
+        mean = (lsf * x).sum() / total
+        sigmas.append(math.sqrt((lsf * (x - mean) ** 2).sum() / total))
+    return float(np.mean(sigmas)) if sigmas else 0.0
+
+
+def is_unreadable(engine, min_sigma=REFERENCE_SIGMA, tolerance=0.9):
+    return equivalent_sigma(engine.blur) >= min_sigma * tolerance
+
+
+@functools.lru_cache(maxsize=None)
+def level_sigma(quality, capture_scale=1.0, sigma=REFERENCE_SIGMA):
+    # Effective blur of a quality-ladder rung in screen pixels: the pyramid
+    # blur of `quality`, applied to a grab downscaled by capture_scale and
+    # upsampled back, the way process_frame composites reduced-scale frames
+    engine = BlurEngine(quality, sigma)
+    if capture_scale >= 1.0:
+        return equivalent_sigma(engine.blur)
+
+    def blur(img):
+        h, w = img.shape[:2]
+        small = cv2.resize(img, (max(1, int(w * capture_scale)), max(1, int(h * capture_scale))),
+                           interpolation=cv2.INTER_AREA)
+        return cv2.resize(engine.blur(small), (w, h), interpolation=cv2.INTER_LINEAR)
+    return equivalent_sigma(blur)
@@ -0,0 +1,59 @@
+from functools import lru_cache
+import cv2
+import numpy as np
+
+
+@lru_cache(maxsize=16)
+def window_stamp(rx, ry, feather=0):
+    # Alpha stamp for an elliptical clear window with radii (rx, ry).
+    # Hard-edged stamps are boolean masks; feathered stamps are
+    # float32 alpha ramping from 1 to 0 across `feather` pixels at the edge.
+    pad = (feather + 1) // 2
+    hx, hy = rx + pad, ry + pad
+    if feather <= 0:
+        stamp = np.zeros((2 * hy + 1, 2 * hx + 1), dtype=np.uint8)
+        if rx == ry:
+            cv2.circle(stamp, (hx, hy), rx, 255, -1)
+        else:
+            cv2.ellipse(stamp, (hx, hy), (rx, ry), 0, 0, 360, 255, -1)
+        stamp = stamp.astype(bool)
+    else:
+        y, x = np.ogrid[-hy:hy + 1, -hx:hx + 1]
+        r = min(rx, ry)
+        dist = np.sqrt((x / rx) ** 2 + (y / ry) ** 2) * r
+        stamp = np.clip((r + feather / 2 - dist) / feather, 0, 1).astype(np.float32)
+    stamp.setflags(write=False)
+    return stamp
+
+
+class GazeCompositor:
+    # Copies the clear window from the sharp frame into the blurred frame.
+    # Only the window's bounding box is touched, so cost is O(radius^2)
+    # regardless of screen size.
+    def __init__(self, radius=130, aspect=1.0, feather=0):
+        self.radius = radius
+        self.aspect = aspect
+        self.feather = feather
+
+    def composite(self, sharp, blurred, cx, cy):
+        rx = int(self.radius * self.aspect)
+        ry = int(self.radius)
+        stamp = window_stamp(rx, ry, self.feather)
+        sh, sw = stamp.shape
+        h, w = blurred.shape[:2]
+
+        # Clip the stamp's bounding box against the frame
+        x0, y0 = cx - sw // 2, cy - sh // 2
+        fx0, fy0 = max(x0, 0), max(y0, 0)
+        fx1, fy1 = min(x0 + sw, w), min(y0 + sh, h)
+        if fx0 >= fx1 or fy0 >= fy1:
+            return blurred
+
+        stamp = stamp[fy0 - y0:fy1 - y0, fx0 - x0:fx1 - x0]
+        dst = blurred[fy0:fy1, fx0:fx1]
+        src = sharp[fy0:fy1, fx0:fx1]
+        if stamp.dtype == bool:
+            np.copyto(dst, src, where=stamp if dst.ndim == 2 else stamp[..., None])
+        else:
+            dst[:] = cv2.blendLinear(src, dst, stamp, 1 - stamp)
+        return blurred
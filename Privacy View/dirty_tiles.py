@@ -0,0 +1,111 @@
+import math
+import numpy as np
+
+
+def dilate(mask, steps):
+    # Grow a boolean tile grid by `steps` tiles in every direction (square
+    # structuring element), without pulling in scipy.ndimage
+    out = mask.copy()
+    for _ in range(steps):
+        grown = out.copy()
+        grown[1:, :] |= out[:-1, :]
+        grown[:-1, :] |= out[1:, :]
+        grown[:, 1:] |= grown[:, :-1].copy()
+        grown[:, :-1] |= grown[:, 1:].copy()
+        out = grown
+    return out
+
+
+class DirtyTileBlur:
+    # Keeps a persistent blurred framebuffer and only re-blurs the tiles that
+    # changed since the previous grab. A change spreads through the blur
+    # kernel into neighbouring tiles up to `margin` pixels away, so the dirty
+    # set is grown by ceil(margin / tile) tiles before re-blurring, and each
+    # region is blurred with `margin` pixels of surrounding source as context.
+    # The result is close to a full-frame blur but not bit-identical: the
+    # Gaussian is cut at 3 sigma and the pyramid resampling is aligned to
+    # each region rather than to the frame.
+    # Change detection is an exact per-pixel compare (cheap next to a blur).
+    def __init__(self, blur_engine, tile=128, full_frame_ratio=0.5):
+        self.engine = blur_engine
+        factor = blur_engine.factor
+        self.tile = max(factor, tile - tile % factor)
+        # 3 sigma covers the Gaussian tail; two low-res pixels cover the
+        # resampling kernels. Rounded up so regions stay on the pyramid grid.
+        margin = math.ceil(3 * blur_engine.sigma) + 2 * factor
+        self.margin = -(-margin // factor) * factor
+        self.spread = -(-self.margin // self.tile)  # tiles a change reaches through the kernel
+        self.full_frame_ratio = full_frame_ratio
+        self.prev = None
+        self.blurred = None
+        self._diff = None
+        self.last_dirty = 0
+        self.total_tiles = 0
+
+    def _reset(self, frame):
+        self.prev = frame.copy()
+        self.blurred = self.engine.blur(frame)
+        self._diff = np.empty(frame.shape[:2], dtype=bool)
+        h, w = frame.shape[:2]
+        # Largest region is one full-width tile row plus margins
+        self._region = np.empty((min(self.tile + 2 * self.margin, h), w) + frame.shape[2:], frame.dtype)
+        self._rows = np.arange(0, h, self.tile)
+        self._cols = np.arange(0, w, self.tile)
+        self.total_tiles = self.last_dirty = len(self._rows) * len(self._cols)
+
+    def _pixels(self, frame):
+        # View 3/4-channel uint8 pixels as single elements so one compare covers a pixel
+        if frame.ndim == 3 and frame.shape[2] == 4 and frame.flags.c_contiguous:
+            return frame.view(np.uint32)[..., 0]
+        return frame
+
+    def dirty_tiles(self, frame):
+        cur, prev = self._pixels(frame), self._pixels(self.prev)
+        if cur.ndim == 3:
+            np.any(cur != prev, axis=2, out=self._diff)
+        else:
+            np.not_equal(cur, prev, out=self._diff)
+        if self._diff.shape[1] % 8 == 0 and self.tile % 8 == 0:
+            # OR eight booleans at a time through a uint64 view
+            by_row = np.bitwise_or.reduceat(self._diff.view(np.uint64), self._rows, axis=0)
+            return np.bitwise_or.reduceat(by_row, self._cols // 8, axis=1) != 0
+        by_row = np.logical_or.reduceat(self._diff, self._rows, axis=0)
+        return np.logical_or.reduceat(by_row, self._cols, axis=1)
+
+    def update(self, frame):
+        if self.prev is None or self.prev.shape != frame.shape:
+            self._reset(frame)
+            return self.blurred
+
+        changed = self.dirty_tiles(frame)
+        if not changed.any():
+            self.last_dirty = 0
+            return self.blurred
+
+        # Neighbours within the kernel's reach blur differently now too
+        dirty = dilate(changed, self.spread)
+        self.last_dirty = int(dirty.sum())
+        np.copyto(self.prev, frame)
+        if self.last_dirty >= self.full_frame_ratio * self.total_tiles:
+            self.engine.blur(frame, self.blurred)
+            return self.blurred
+
+        h, w = frame.shape[:2]
+        t, m = self.tile, self.margin
+        for ty in range(dirty.shape[0]):
+            # Merge horizontal runs of dirty tiles into one blurred region
+            tx = 0
+            while tx < dirty.shape[1]:
+                if not dirty[ty, tx]:
+                    tx += 1
+                    continue
+                start = tx
+                while tx < dirty.shape[1] and dirty[ty, tx]:
+                    tx += 1
+                x0, x1 = start * t, min(tx * t, w)
+                y0, y1 = ty * t, min((ty + 1) * t, h)
+                rx0, ry0 = max(x0 - m, 0), max(y0 - m, 0)
+                rx1, ry1 = min(x1 + m, w), min(y1 + m, h)
+                region = self.engine.blur(frame[ry0:ry1, rx0:rx1], self._region[:ry1 - ry0, :rx1 - rx0])
+                self.blurred[y0:y1, x0:x1] = region[y0 - ry0:y1 - ry0, x0 - rx0:x1 - rx0]
+        return self.blurred
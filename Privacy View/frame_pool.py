@@ -0,0 +1,46 @@
+import threading
+import numpy as np
+
+
+def grab_bgra(sct, monitor):
+    # Wrap the mss screenshot buffer as an (h, w, 4) BGRA array without copying.
+    # mss hands back a fresh bytearray per grab, so the view stays valid for as
+    # long as the array is referenced.
+    shot = sct.grab(monitor)
+    return np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+
+
+class FramePool:
+    # Three preallocated frames shared by one writer and one reader
+    # (triple buffering). The writer fills back(), publish() swaps it with the
+    # ready frame, and latest() hands the reader the newest published frame.
+    # Unread frames are simply overwritten, so the reader always gets the
+    # newest one and nothing is ever allocated after construction.
+    def __init__(self, shape, dtype=np.uint8):
+        self._frames = [np.zeros(shape, dtype) for _ in range(3)]
+        self._back, self._ready, self._front = 0, 1, 2
+        self._fresh = False
+        self._lock = threading.Lock()
+        self.published = 0
+        self.dropped = 0
+
+    def back(self):
+        return self._frames[self._back]
+
+    def publish(self):
+        with self._lock:
+            if self._fresh:
+                self.dropped += 1
+            self._back, self._ready = self._ready, self._back
+            self._fresh = True
+            self.published += 1
+
+    def latest(self):
+        # Returns the newest frame, or None if nothing new was published since
+        # the last call. The frame stays untouched until the next latest().
+        with self._lock:
+            if not self._fresh:
+                return None
+            self._front, self._ready = self._ready, self._front
+            self._fresh = False
+            return self._frames[self._front]
@@ -0,0 +1,239 @@
+import argparse
+import csv
+import math
+import numpy as np
+
+# Gaze filters take timestamped measurements (seconds, screen px) and return
+# a smoothed position predicted `horizon` seconds ahead, so the clear window
+# lands where the eyes will be when the composited frame is actually shown.
+# Everything is driven by timestamps, so behaviour doesn't change with FPS.
+
+
+def _alpha(cutoff, dt):
+    tau = 1.0 / (2 * math.pi * cutoff)
+    return 1.0 / (1.0 + tau / dt)
+
+
+class OneEuroFilter:
+    # Casiez et al. One-Euro filter: heavy smoothing while the gaze is still,
+    # the cutoff rises with speed so fast moves aren't lagged.
+    def __init__(self, min_cutoff=1.0, beta=0.01, d_cutoff=1.0, horizon=0.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.horizon = horizon
+        self.reset()
+
+    def reset(self):
+        self._t = None
+        self._x = None
+        self._dx = np.zeros(2)
+
+    def update(self, t, x, y):
+        z = np.array([x, y], dtype=np.float64)
+        if self._t is None:
+            self._t, self._x = t, z
+            return tuple(z)
+        if t <= self._t:
+            return tuple(self._x)
+        dt = t - self._t
+        self._t = t
+        a_d = _alpha(self.d_cutoff, dt)
+        self._dx = a_d * (z - self._x) / dt + (1 - a_d) * self._dx
+        cutoff = self.min_cutoff + self.beta * float(np.linalg.norm(self._dx))
+        a = _alpha(cutoff, dt)
+        self._x = a * z + (1 - a) * self._x
+        return tuple(self._x + self._dx * self.horizon)
+
+
+class KalmanFilter:
+    # Constant-velocity Kalman filter on [x, y, vx, vy]. `accel` is the
+    # expected acceleration noise (px/s^2), `noise` the measurement noise (px).
+    def __init__(self, accel=3000.0, noise=6.0, horizon=0.0):
+        self.accel = accel
+        self.noise = noise
+        self.horizon = horizon
+        self.reset()
+
+    def reset(self):
+        self._t = None
+        self._s = np.zeros(4)
+        self._P = np.eye(4) * 1e4
+
+    def update(self, t, x, y):
+        z = np.array([x, y], dtype=np.float64)
+        if self._t is None:
+            self._t = t
+            self._s[:2] = z
+            return tuple(z)
+        dt = max(t - self._t, 0.0)
+        self._t = max(t, self._t)
+
+        F = np.eye(4)
+        F[0, 2] = F[1, 3] = dt
+        # Discrete white-noise acceleration model
+        q = self.accel ** 2
+        dt2, dt3, dt4 = dt * dt, dt ** 3, dt ** 4
+        Q = np.zeros((4, 4))
+        Q[0, 0] = Q[1, 1] = dt4 / 4 * q
+        Q[0, 2] = Q[2, 0] = Q[1, 3] = Q[3, 1] = dt3 / 2 * q
+        Q[2, 2] = Q[3, 3] = dt2 * q
+        self._s = F @ self._s
+        self._P = F @ self._P @ F.T + Q
+
+        H = np.eye(2, 4)
+        S = H @ self._P @ H.T + np.eye(2) * self.noise ** 2
+        K = self._P @ H.T @ np.linalg.inv(S)
+        self._s = self._s + K @ (z - H @ self._s)
+        self._P = (np.eye(4) - K @ H) @ self._P
+        return tuple(self._s[:2] + self._s[2:] * self.horizon)
+
+
+class ExponentialFilter:
+    # The fixed per-frame EMA the overlays used before; kept for comparison.
+    def __init__(self, alpha=0.2, horizon=0.0):
+        self.alpha = alpha
+        self.horizon = horizon
+        self.reset()
+
+    def reset(self):
+        self._x = None
+
+    def update(self, t, x, y):
+        z = np.array([x, y], dtype=np.float64)
+        self._x = z if self._x is None else self.alpha * z + (1 - self.alpha) * self._x
+        return tuple(self._x)
+
+
+FILTERS = {
+    "one_euro": OneEuroFilter,
+    "kalman": KalmanFilter,
+    "ema": ExponentialFilter,
+}
+
+
+def make_filter(kind="one_euro", **kwargs):
+    if kind not in FILTERS:
+        raise ValueError(f"Invalid filter. Must be one of {list(FILTERS)}")
+    return FILTERS[kind](**kwargs)
+
+
+# === Recorded traces ===
+# CSV with a header row: t,x,y[,true_x,true_y]. t in seconds, positions in
+# screen px. Rows with an empty x/y are frames where no face was found.
+def load_trace(path):
+    rows = []
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            if not row.get("x") or not row.get("y"):
+                continue
+            truth = (float(row["true_x"]), float(row["true_y"])) if row.get("true_x") else None
+            rows.append((float(row["t"]), float(row["x"]), float(row["y"]), truth))
+    return rows
+
+
+def save_trace(path, trace):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["t", "x", "y", "true_x", "true_y"])
+        for t, x, y, truth in trace:
+            writer.writerow([f"{t:.4f}", f"{x:.1f}", f"{y:.1f}"] + ([f"{truth[0]:.1f}", f"{truth[1]:.1f}"] if truth else ["", ""]))
+
+
+def synthetic_trace(seconds=20.0, fps=30.0, width=2560, height=1600, noise=5.0, seed=0):
+    # Head-driven gaze: holds of 0.4-1.5 s joined by smooth 0.25-0.6 s moves,
+    # sampled at a jittery frame rate with Gaussian landmark noise
+    rng = np.random.default_rng(seed)
+    moves, t = [], 0.0
+    pos = np.array([width / 2, height / 2])
+    while t < seconds:
+        hold = rng.uniform(0.4, 1.5)
+        dur = rng.uniform(0.25, 0.6)
+        nxt = rng.uniform([width * 0.1, height * 0.1], [width * 0.9, height * 0.9])
+        moves.append((t + hold, dur, pos, nxt))
+        pos = nxt
+        t += hold + dur
+
+    def true_pos(ts):
+        p = np.array([width / 2, height / 2])
+        for start, dur, p0, p1 in moves:
+            if ts < start:
+                break
+            k = min(1.0, (ts - start) / dur)
+            # Minimum-jerk profile
+            p = p0 + (p1 - p0) * (10 * k ** 3 - 15 * k ** 4 + 6 * k ** 5)
+        return p
+
+    trace, ts = [], 0.0
+    while ts < seconds:
+        truth = true_pos(ts)
+        meas = truth + rng.normal(0, noise, 2)
+        trace.append((ts, float(meas[0]), float(meas[1]), (float(truth[0]), float(truth[1]))))
+        ts += rng.uniform(0.8, 1.2) / fps
+    return trace
+
+
+def _lag(t, out, ref, max_lag=0.3, step=0.002):
+    # Delay d (s) for which out(t) best matches ref(t - d); negative when the
+    # prediction runs ahead of the reference
+    best, best_d = np.inf, 0.0
+    for d in np.arange(-max_lag, max_lag + step, step):
+        shifted = np.stack([np.interp(t - d, t, ref[:, k]) for k in range(2)], axis=1)
+        err = float(np.mean(np.sum((out - shifted) ** 2, axis=1)))
+        if err < best:
+            best, best_d = err, d
+    return best_d
+
+
+def evaluate(filt, trace, latency=0.0):
+    # Jitter: RMS frame-to-frame movement during fixations (px).
+    # Lag: delay behind the reference (ground truth if recorded, otherwise
+    # the raw measurements) once the display latency is added, in ms; 0 means
+    # the window lands where the eyes are when the frame is shown.
+    # Error: RMS distance from where the eyes are when the frame is shown.
+    filt.reset()
+    t = np.array([row[0] for row in trace])
+    raw = np.array([row[1:3] for row in trace])
+    has_truth = all(row[3] is not None for row in trace)
+    ref = np.array([row[3] for row in trace]) if has_truth else raw
+    out = np.array([filt.update(ti, x, y) for ti, x, y in zip(t, raw[:, 0], raw[:, 1])])
+
+    shown_at = t + latency
+    seen = np.stack([np.interp(shown_at, t, ref[:, k]) for k in range(2)], axis=1)
+    ref_step = np.linalg.norm(np.diff(ref, axis=0), axis=1)
+    still = ref_step < np.median(ref_step) + 1.0
+    out_step = np.linalg.norm(np.diff(out, axis=0), axis=1)
+    return {
+        "jitter_px": float(np.sqrt(np.mean(out_step[still] ** 2))) if still.any() else 0.0,
+        "lag_ms": (_lag(t, out, ref) + latency) * 1000,
+        "error_px": float(np.sqrt(np.mean(np.sum((out - seen) ** 2, axis=1)))),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate gaze filters on a recorded or synthetic trace")
+    parser.add_argument("trace", nargs="?", help="CSV trace (t,x,y[,true_x,true_y]); synthetic if omitted")
+    parser.add_argument("--latency", type=float, default=0.06, help="Capture-to-display latency in seconds")
+    parser.add_argument("--save-synthetic", help="Write the synthetic trace to this CSV")
+    args = parser.parse_args()
+
+    trace = load_trace(args.trace) if args.trace else synthetic_trace()
+    if args.save_synthetic and not args.trace:
+        save_trace(args.save_synthetic, trace)
+
+    candidates = {
+        "raw": make_filter("ema", alpha=1.0),
+        "ema 0.2": make_filter("ema", alpha=0.2),
+        "one_euro": make_filter("one_euro"),
+        "one_euro+pred": make_filter("one_euro", horizon=args.latency),
+        "kalman": make_filter("kalman"),
+        "kalman+pred": make_filter("kalman", horizon=args.latency),
+    }
+    print(f"{'filter':<16}{'jitter px':>10}{'lag ms':>9}{'error px':>10}")
+    for name, filt in candidates.items():
+        m = evaluate(filt, trace, latency=args.latency)
+        print(f"{name:<16}{m['jitter_px']:>10.2f}{m['lag_ms']:>9.1f}{m['error_px']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
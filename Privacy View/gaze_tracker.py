@@ -0,0 +1,175 @@
+import cv2
+import numpy as np
+
+# FaceMesh landmarks used for the gaze centre (outer eye corners)
+LEFT_EYE, RIGHT_EYE = 33, 263
+
+LK_PARAMS = dict(
+    winSize=(15, 15),
+    maxLevel=2,
+    criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03),
+)
+
+
+class GazeTracker:
+    # Runs FaceMesh only every `infer_every` frames, on a downscaled crop
+    # around the face, and follows the two eye corners with Lucas-Kanade
+    # optical flow in between. When flow loses the eyes (too few points
+    # tracked, or the eyes drift apart) that frame falls back to a
+    # full-frame FaceMesh pass.
+    #
+    # tracker="velocity" replaces optical flow with a constant-velocity
+    # extrapolation from the last two inferences, which is cheaper still.
+    def __init__(self, face_mesh, infer_every=3, infer_width=320, roi_scale=3.0,
+                 tracker="flow", min_confidence=0.6):
+        if tracker not in ("flow", "velocity"):
+            raise ValueError("Invalid tracker. Must be one of ['flow', 'velocity']")
+        self.face_mesh = face_mesh
+        self.infer_every = infer_every
+        self.infer_width = infer_width
+        self.roi_scale = roi_scale
+        self.tracker = tracker
+        self.min_confidence = min_confidence
+
+        self.eyes = None        # (2, 2) pixel positions of left/right eye
+        self.roi = None         # (x0, y0, x1, y1) crop fed to FaceMesh
+        self.confidence = 0.0
+        self._since_infer = 0
+        self._prev_gray = None
+        self._points = None     # flow points around both eyes
+        self._history = []      # [(t, eyes)] of the last two inferences
+
+        self.inferences = 0
+        self.full_frame_inferences = 0
+        self.tracked_frames = 0
+        self.lost_frames = 0
+
+    # === FaceMesh ===
+    def _run_face_mesh(self, frame, box):
+        x0, y0, x1, y1 = box
+        crop = frame[y0:y1, x0:x1]
+        scale = min(1.0, self.infer_width / max(1, crop.shape[1]))
+        if scale < 1.0:
+            crop = cv2.resize(crop, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        results = self.face_mesh.process(cv2.cvtColor(crop, cv2.COLOR_BGR2RGB))
+        if not results.multi_face_landmarks:
+            return None
+        landmarks = results.multi_face_landmarks[0].landmark
+        w, h = x1 - x0, y1 - y0
+        return np.array([[x0 + landmarks[i].x * w, y0 + landmarks[i].y * h]
+                         for i in (LEFT_EYE, RIGHT_EYE)], dtype=np.float32)
+
+    def _face_box(self, frame_shape):
+        # Crop centred on the eyes, sized from the inter-eye distance
+        h, w = frame_shape[:2]
+        centre = self.eyes.mean(axis=0)
+        half = max(32.0, float(np.linalg.norm(self.eyes[1] - self.eyes[0])) * self.roi_scale / 2)
+        x0, y0 = int(max(0, centre[0] - half)), int(max(0, centre[1] - half))
+        x1, y1 = int(min(w, centre[0] + half)), int(min(h, centre[1] + half))
+        return x0, y0, x1, y1
+
+    def _roi_still_fits(self):
+        # Keep the crop fixed while the eyes stay in its inner half, so
+        # FaceMesh's own frame-to-frame tracking sees a stable image
+        if self.roi is None or self.eyes is None:
+            return False
+        x0, y0, x1, y1 = self.roi
+        qx, qy = (x1 - x0) / 4, (y1 - y0) / 4
+        return bool(np.all((self.eyes[:, 0] > x0 + qx) & (self.eyes[:, 0] < x1 - qx) &
+                           (self.eyes[:, 1] > y0 + qy) & (self.eyes[:, 1] < y1 - qy)))
+
+    def _infer(self, frame, t, full_frame=False):
+        h, w = frame.shape[:2]
+        eyes = None
+        if self.eyes is not None and not full_frame:
+            if not self._roi_still_fits():
+                self.roi = self._face_box(frame.shape)
+            eyes = self._run_face_mesh(frame, self.roi)
+        if eyes is None:
+            self.full_frame_inferences += 1
+            eyes = self._run_face_mesh(frame, (0, 0, w, h))
+        self.inferences += 1
+        self._since_infer = 0
+        if eyes is None:
+            self._lose()
+            return None
+        self.eyes = eyes
+        if self.roi is None or not self._roi_still_fits():
+            self.roi = self._face_box(frame.shape)
+        self.confidence = 1.0
+        self._history = (self._history + [(t, eyes)])[-2:]
+        self._points = None
+        return eyes
+
+    def _lose(self):
+        self.eyes = self.roi = self._points = None
+        self._history = []
+        self.confidence = 0.0
+
+    # === Tracking between inferences ===
+    def _seed_points(self):
+        spread = max(2.0, float(np.linalg.norm(self.eyes[1] - self.eyes[0])) * 0.08)
+        offsets = np.array([(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)], np.float32) * spread
+        return np.concatenate([eye + offsets for eye in self.eyes]).reshape(-1, 1, 2)
+
+    def _track_flow(self, gray):
+        if self._points is None:
+            self._points = self._seed_points()
+        new, status, _ = cv2.calcOpticalFlowPyrLK(self._prev_gray, gray, self._points, None, **LK_PARAMS)
+        status = status.reshape(-1).astype(bool)
+        n = len(status) // 2
+        moved = (new - self._points).reshape(-1, 2)
+        eyes = self.eyes.copy()
+        for k in range(2):
+            ok = status[k * n:(k + 1) * n]
+            if not ok.any():
+                self.confidence = 0.0
+                return None
+            eyes[k] += np.median(moved[k * n:(k + 1) * n][ok], axis=0)
+
+        # Both eye corners belong to one rigid face: the inter-eye distance
+        # should barely change between frames
+        old_d = float(np.linalg.norm(self.eyes[1] - self.eyes[0]))
+        new_d = float(np.linalg.norm(eyes[1] - eyes[0]))
+        rigidity = 1.0 - min(1.0, abs(new_d - old_d) / max(old_d, 1.0) * 5)
+        self.confidence *= float(status.mean()) * rigidity
+        self._points = new
+        return eyes
+
+    def _track_velocity(self, t):
+        if len(self._history) < 2:
+            return self.eyes
+        (t0, e0), (t1, e1) = self._history
+        if t1 <= t0:
+            return self.eyes
+        return e1 + (e1 - e0) * ((t - t1) / (t1 - t0))
+
+    # === Public API ===
+    def process(self, frame, t=None):
+        # frame: mirrored BGR webcam frame. Returns the normalised eye centre
+        # (x, y) in [0, 1], or None when no face is found.
+        h, w = frame.shape[:2]
+        t = cv2.getTickCount() / cv2.getTickFrequency() if t is None else t
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if self.tracker == "flow" else None
+
+        eyes = None
+        if self.eyes is not None and self._since_infer + 1 < self.infer_every:
+            if self.tracker == "flow":
+                eyes = self._track_flow(gray)
+            else:
+                eyes = self._track_velocity(t)
+            if eyes is not None and self.confidence >= self.min_confidence:
+                self.eyes = eyes
+                self._since_infer += 1
+                self.tracked_frames += 1
+            else:
+                # Tracking lost: go straight back to a full-frame detection
+                eyes = self._infer(frame, t, full_frame=True)
+        else:
+            eyes = self._infer(frame, t)
+        self._prev_gray = gray
+        if eyes is None:
+            self.lost_frames += 1
+            return None
+        centre = eyes.mean(axis=0)
+        return float(centre[0] / w), float(centre[1] / h)
@@ -0,0 +1,257 @@
+import ctypes
+import numpy as np
+from OpenGL.GL import *
+
+# Streaming render backend for the GL overlay. The raw BGRA capture is the
+# only thing the CPU touches: it is copied into one of two pixel buffer
+# objects while the frame in the other one is streamed into a texture that
+# was allocated once, so the copy and the transfer overlap at the cost of one
+# frame of display latency. Blur and the clear gaze window are done in
+# shaders, as a GPU version of the CPU pyramid blur:
+#   1. 8x8 box downsample of the capture into a 1/8-scale texture
+#   2. tent blur at 1/8 scale
+#   3. full-screen composite: bilinear upsample of the blur, capture inside
+#      the gaze circle (centre/radius uniforms)
+# Only pass 3 runs per screen pixel, with one or two texture taps. GLSL 1.20
+# and plain vertex attributes keep it working in Qt's default compatibility
+# context and on software GL (Mesa llvmpipe / OSMesa).
+
+FACTOR = 8
+# Tent tap offset in 1/8-scale texels. A pair of bilinear taps at +-d gives
+# weights [d/2, 1-d, d/2], variance d; 0.55 brings the whole chain to the
+# reference privacy sigma (~7.1 px, see blur_engine.equivalent_sigma).
+TENT_SPREAD = 0.55
+
+VERTEX_SHADER = """
+#version 120
+attribute vec2 position;
+uniform float flip;       // 1.0 when drawing to the window (capture rows are top first)
+varying vec2 uv;
+void main() {
+    uv = vec2(position.x * 0.5 + 0.5, flip > 0.5 ? 0.5 - position.y * 0.5 : 0.5 + position.y * 0.5);
+    gl_Position = vec4(position, 0.0, 1.0);
+}
+"""
+
+# Sixteen bilinear taps on odd texel offsets average an 8x8 block exactly
+DOWNSAMPLE_SHADER = """
+#version 120
+uniform sampler2D src;
+uniform vec2 texel;
+varying vec2 uv;
+void main() {
+    vec4 sum = vec4(0.0);
+    for (int i = 0; i < 4; i++) {
+        for (int j = 0; j < 4; j++) {
+            sum += texture2D(src, uv + texel * vec2(float(2 * i - 3), float(2 * j - 3)));
+        }
+    }
+    gl_FragColor = sum / 16.0;
+}
+"""
+
+# Four bilinear taps at +-spread make a separable 3x3 tent
+TENT_SHADER = """
+#version 120
+uniform sampler2D src;
+uniform vec2 spread;      // tap offset in uv units
+varying vec2 uv;
+void main() {
+    vec2 d = spread;
+    gl_FragColor = 0.25 * (texture2D(src, uv + d) + texture2D(src, uv - d)
+                         + texture2D(src, uv + vec2(d.x, -d.y)) + texture2D(src, uv + vec2(-d.x, d.y)));
+}
+"""
+
+COMPOSITE_SHADER = """
+#version 120
+uniform sampler2D screen;
+uniform sampler2D blurred;
+uniform vec2 size;        // screen size in px
+uniform vec2 center;      // gaze centre in px, y down
+uniform float radius;     // clear window radius in px
+uniform float feather;    // soft edge width in px
+varying vec2 uv;
+void main() {
+    float dist = distance(uv * size, center);
+    float a = clamp((radius + feather * 0.5 - dist) / max(feather, 0.001), 0.0, 1.0);
+    // Most of the screen is pure blur, so only sample what the pixel needs
+    vec4 color;
+    if (a <= 0.0) {
+        color = texture2D(blurred, uv);
+    } else if (a >= 1.0) {
+        color = texture2D(screen, uv);
+    } else {
+        color = mix(texture2D(blurred, uv), texture2D(screen, uv), a);
+    }
+    gl_FragColor = vec4(color.rgb, 1.0);
+}
+"""
+
+
+def _compile(kind, source):
+    shader = glCreateShader(kind)
+    glShaderSource(shader, source)
+    glCompileShader(shader)
+    if not glGetShaderiv(shader, GL_COMPILE_STATUS):
+        raise RuntimeError(f"Shader compile failed: {glGetShaderInfoLog(shader)}")
+    return shader
+
+
+def _program(fragment_source, uniforms):
+    program = glCreateProgram()
+    glAttachShader(program, _compile(GL_VERTEX_SHADER, VERTEX_SHADER))
+    glAttachShader(program, _compile(GL_FRAGMENT_SHADER, fragment_source))
+    glBindAttribLocation(program, 0, "position")
+    glLinkProgram(program)
+    if not glGetProgramiv(program, GL_LINK_STATUS):
+        raise RuntimeError(f"Shader link failed: {glGetProgramInfoLog(program)}")
+    return program, {name: glGetUniformLocation(program, name) for name in ("flip",) + uniforms}
+
+
+def _texture(width, height):
+    texture = glGenTextures(1)
+    glBindTexture(GL_TEXTURE_2D, texture)
+    glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA8, width, height, 0, GL_BGRA, GL_UNSIGNED_BYTE, None)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
+    glBindTexture(GL_TEXTURE_2D, 0)
+    return texture
+
+
+class GLStreamCompositor:
+    # Must be created and used with the overlay's GL context current
+    # (e.g. from initializeGL / paintGL). draw() renders into whatever
+    # framebuffer was bound when it was called.
+    def __init__(self, width, height, radius=130, feather=0.0):
+        self.width, self.height = width, height
+        self.radius = radius
+        self.feather = feather
+        self.small_w, self.small_h = -(-width // FACTOR), -(-height // FACTOR)
+        self.frame_bytes = width * height * 4
+        self._next_pbo = 0   # PBO the next frame is copied into
+        self._pending = None  # PBO holding a frame not yet streamed into the texture
+        self.uploads = 0
+
+        self.down, self._down_u = _program(DOWNSAMPLE_SHADER, ("src", "texel"))
+        self.tent, self._tent_u = _program(TENT_SHADER, ("src", "spread"))
+        self.composite, self._comp_u = _program(
+            COMPOSITE_SHADER, ("screen", "blurred", "size", "center", "radius", "feather"))
+
+        # Fullscreen quad as a triangle strip
+        quad = np.array([-1, -1, 1, -1, -1, 1, 1, 1], dtype=np.float32)
+        self.vbo = glGenBuffers(1)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glBufferData(GL_ARRAY_BUFFER, quad.nbytes, quad, GL_STATIC_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+        # All storage is allocated once; frames only ever go through glTexSubImage2D
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 4)
+        self.texture = _texture(width, height)
+        self.small = [_texture(self.small_w, self.small_h) for _ in range(2)]
+        target = glGetIntegerv(GL_FRAMEBUFFER_BINDING)
+        self.fbos = glGenFramebuffers(2)
+        for fbo, texture in zip(self.fbos, self.small):
+            glBindFramebuffer(GL_FRAMEBUFFER, fbo)
+            glFramebufferTexture2D(GL_FRAMEBUFFER, GL_COLOR_ATTACHMENT0, GL_TEXTURE_2D, texture, 0)
+        glBindFramebuffer(GL_FRAMEBUFFER, target)
+
+        self.pbos = glGenBuffers(2)
+        for pbo in self.pbos:
+            glBindBuffer(GL_PIXEL_UNPACK_BUFFER, pbo)
+            glBufferData(GL_PIXEL_UNPACK_BUFFER, self.frame_bytes, None, GL_STREAM_DRAW)
+        glBindBuffer(GL_PIXEL_UNPACK_BUFFER, 0)
+
+    def upload(self, frame):
+        # frame: (height, width, 4) uint8 BGRA, e.g. straight from frame_pool.grab_bgra.
+        # Double-buffered PBOs: the texture is streamed from the PBO filled on
+        # the previous call while this frame is copied into the other one, so
+        # the CPU copy and the GPU transfer overlap. The texture therefore
+        # shows the previous frame; flush() streams the latest one right away.
+        frame = np.ascontiguousarray(frame)
+        if self._pending is not None:
+            self._stream(self._pending)
+            self._pending = None
+        pbo = self.pbos[self._next_pbo]
+        glBindBuffer(GL_PIXEL_UNPACK_BUFFER, pbo)
+        # Orphan the old storage so mapping never waits on a pending transfer
+        glBufferData(GL_PIXEL_UNPACK_BUFFER, self.frame_bytes, None, GL_STREAM_DRAW)
+        ptr = glMapBuffer(GL_PIXEL_UNPACK_BUFFER, GL_WRITE_ONLY)
+        if ptr:
+            ctypes.memmove(ptr, frame.ctypes.data, self.frame_bytes)
+            glUnmapBuffer(GL_PIXEL_UNPACK_BUFFER)
+            self._pending = pbo
+            self._next_pbo ^= 1
+        glBindBuffer(GL_PIXEL_UNPACK_BUFFER, 0)
+        if self.uploads == 0:
+            # Nothing to show yet: the first frame goes straight in
+            self.flush()
+
+    def flush(self):
+        # Stream the last uploaded frame into the texture now
+        if self._pending is not None:
+            self._stream(self._pending)
+            self._pending = None
+
+    def _stream(self, pbo):
+        glBindBuffer(GL_PIXEL_UNPACK_BUFFER, pbo)
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glTexSubImage2D(GL_TEXTURE_2D, 0, 0, 0, self.width, self.height, GL_BGRA, GL_UNSIGNED_BYTE,
+                        ctypes.c_void_p(0))
+        glBindTexture(GL_TEXTURE_2D, 0)
+        glBindBuffer(GL_PIXEL_UNPACK_BUFFER, 0)
+        self.uploads += 1
+
+    def _pass(self, program, uniforms, flip, textures):
+        glUseProgram(program)
+        glUniform1f(uniforms["flip"], flip)
+        for unit, (name, texture) in enumerate(textures):
+            glActiveTexture(GL_TEXTURE0 + unit)
+            glBindTexture(GL_TEXTURE_2D, texture)
+            glUniform1i(uniforms[name], unit)
+        glDrawArrays(GL_TRIANGLE_STRIP, 0, 4)
+
+    def draw(self, cx, cy):
+        target = glGetIntegerv(GL_FRAMEBUFFER_BINDING)
+        viewport = glGetIntegerv(GL_VIEWPORT)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glEnableVertexAttribArray(0)
+        glVertexAttribPointer(0, 2, GL_FLOAT, GL_FALSE, 0, ctypes.c_void_p(0))
+
+        glViewport(0, 0, self.small_w, self.small_h)
+        glBindFramebuffer(GL_FRAMEBUFFER, self.fbos[0])
+        glUseProgram(self.down)
+        glUniform2f(self._down_u["texel"], 1.0 / self.width, 1.0 / self.height)
+        self._pass(self.down, self._down_u, 0.0, [("src", self.texture)])
+
+        glBindFramebuffer(GL_FRAMEBUFFER, self.fbos[1])
+        glUseProgram(self.tent)
+        glUniform2f(self._tent_u["spread"], TENT_SPREAD / self.small_w, TENT_SPREAD / self.small_h)
+        self._pass(self.tent, self._tent_u, 0.0, [("src", self.small[0])])
+
+        glBindFramebuffer(GL_FRAMEBUFFER, target)
+        glViewport(*viewport)
+        u = self._comp_u
+        glUseProgram(self.composite)
+        glUniform2f(u["size"], self.width, self.height)
+        glUniform2f(u["center"], cx, cy)
+        glUniform1f(u["radius"], self.radius)
+        glUniform1f(u["feather"], self.feather)
+        self._pass(self.composite, u, 1.0, [("screen", self.texture), ("blurred", self.small[1])])
+
+        glDisableVertexAttribArray(0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        for unit in (1, 0):
+            glActiveTexture(GL_TEXTURE0 + unit)
+            glBindTexture(GL_TEXTURE_2D, 0)
+        glUseProgram(0)
+
+    def release(self):
+        glDeleteBuffers(2, self.pbos)
+        glDeleteBuffers(1, [self.vbo])
+        glDeleteFramebuffers(2, self.fbos)
+        glDeleteTextures([self.texture] + list(self.small))
+        for program in (self.down, self.tent, self.composite):
+            glDeleteProgram(program)
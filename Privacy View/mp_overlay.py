@@ -0,0 +1,249 @@
+import argparse
+import multiprocessing
+import time
+import numpy as np
+from shared_frames import SharedFrameRing, SharedGazeSlot
+
+# Multi-process variant of privacy_overlay.py. Webcam + FaceMesh, screen
+# capture + blur + composite, and Tk presentation each run in their own
+# process, so they are not sharing one GIL. Composited frames go through a
+# SharedFrameRing and gaze through a SharedGazeSlot; nothing is pickled per
+# frame. The main process presents and supervises: a crashed worker is
+# restarted, and while gaze is missing the capture process blurs everything.
+#
+#   python mp_overlay.py [--monitor 2] [--target-fps 30]
+#
+# Everything a worker needs is imported inside it, so a spawned process only
+# loads its own dependencies.
+
+GAZE_STALE_S = 0.5     # no gaze update for this long -> no clear window
+GAZE_HORIZON_S = 0.05  # fixed One-Euro prediction (capture runs in another process)
+
+
+# === Gaze process: webcam + FaceMesh ===
+def gaze_worker(gaze_spec, stop, width, height, infer_every=3):
+    import cv2
+    import mediapipe as mp
+    from gaze_tracker import GazeTracker
+    from gaze_filter import make_filter
+
+    slot = SharedGazeSlot.attach(gaze_spec)
+    face_mesh = mp.solutions.face_mesh.FaceMesh(static_image_mode=False, max_num_faces=1, refine_landmarks=False)
+    tracker = GazeTracker(face_mesh, infer_every=infer_every)
+    gaze_filter = make_filter("one_euro", min_cutoff=1.0, beta=0.01, horizon=GAZE_HORIZON_S)
+    cap = cv2.VideoCapture(0)
+    try:
+        while not stop.is_set():
+            ret, frame = cap.read()
+            t = time.perf_counter()
+            if not ret:
+                time.sleep(0.033)
+                continue
+            eyes = tracker.process(cv2.flip(frame, 1))
+            if eyes is None:
+                gaze_filter.reset()
+                slot.put(width // 2, height // 2, t)
+                continue
+            x, y = gaze_filter.update(t, eyes[0] * width, eyes[1] * height)
+            slot.put(x, y, t)
+    finally:
+        cap.release()
+        slot.close()
+
+
+# === Capture process: grab + blur + composite ===
+def adapt_quality(controller, tile_blur, frame_ms):
+    # Feeds one frame time to the controller and returns the DirtyTileBlur to
+    # use from now on: a new one when the blur quality changed
+    from blur_engine import BlurEngine
+    from dirty_tiles import DirtyTileBlur
+    if controller.observe(frame_ms) and controller.level.quality != tile_blur.engine.quality:
+        return DirtyTileBlur(BlurEngine(quality=controller.level.quality), tile=128)
+    return tile_blur
+
+
+def capture_worker(ring_spec, gaze_spec, stop, hwnd, monitor, hidden, target_fps):
+    import mss
+    import win32con
+    import win32gui
+    from blur_engine import BlurEngine
+    from compositor import GazeCompositor
+    from dirty_tiles import DirtyTileBlur
+    from frame_pool import grab_bgra
+    from quality_controller import QualityController
+
+    ring = SharedFrameRing.attach(ring_spec)
+    gaze = SharedGazeSlot.attach(gaze_spec)
+    # Blur quality and refresh interval adapt as in privacy_overlay.py; the
+    # processing scale and FaceMesh cadence stay fixed in this mode
+    controller = QualityController(target_fps=target_fps)
+    tile_blur = DirtyTileBlur(BlurEngine(quality=controller.level.quality), tile=128)
+    compositor = GazeCompositor(radius=130)
+    flags = win32con.SWP_NOSIZE | win32con.SWP_NOZORDER
+    next_due = 0.0
+    try:
+        with mss.mss() as sct:
+            while not stop.is_set():
+                wait = next_due - time.perf_counter()
+                if wait > 0:
+                    time.sleep(wait)
+                t0 = time.perf_counter()
+                next_due = t0 + controller.level.interval_ms / 1000
+
+                win32gui.SetWindowPos(hwnd, None, hidden[0], hidden[1], 0, 0, flags)
+                time.sleep(0.005)  # small delay to avoid flicker
+                img = grab_bgra(sct, monitor)
+                win32gui.SetWindowPos(hwnd, None, monitor['left'], monitor['top'], 0, 0, flags)
+
+                out = ring.back()
+                np.copyto(out, tile_blur.update(img))
+                sample = gaze.fresh(GAZE_STALE_S)
+                if sample is not None:
+                    compositor.composite(img, out, int(sample[0]), int(sample[1]))
+                ring.commit(sample[2] if sample is not None else np.nan)
+
+                tile_blur = adapt_quality(controller, tile_blur, (time.perf_counter() - t0) * 1000)
+    finally:
+        ring.close()
+        gaze.close()
+
+
+# === Supervision ===
+class Supervisor:
+    # Starts the worker processes and restarts any that exit while the overlay
+    # is running, backing off between attempts and giving up after
+    # max_restarts so a worker that can never start doesn't spin forever
+    def __init__(self, ctx, stop, max_restarts=5, backoff=1.0):
+        self.ctx = ctx
+        self.stop = stop
+        self.max_restarts = max_restarts
+        self.backoff = backoff
+        self.workers = {}
+
+    def add(self, name, target, args):
+        self.workers[name] = {"target": target, "args": args, "process": None, "restarts": 0, "retry_at": 0.0}
+
+    def _spawn(self, name):
+        w = self.workers[name]
+        w["process"] = self.ctx.Process(target=w["target"], args=w["args"], name=name, daemon=True)
+        w["process"].start()
+
+    def start(self):
+        for name in self.workers:
+            self._spawn(name)
+
+    def poll(self):
+        # Returns the names of workers found dead since the last poll
+        died = []
+        now = time.perf_counter()
+        for name, w in self.workers.items():
+            p = w["process"]
+            if self.stop.is_set() or p is None or p.is_alive():
+                continue
+            if w["retry_at"] == 0.0:
+                died.append(name)
+                print(f"[supervisor] {name} exited with code {p.exitcode}")
+                w["retry_at"] = now + self.backoff * (2 ** w["restarts"])
+            elif w["restarts"] < self.max_restarts and now >= w["retry_at"]:
+                w["restarts"] += 1
+                w["retry_at"] = 0.0
+                self._spawn(name)
+        return died
+
+    def shutdown(self, timeout=2.0):
+        self.stop.set()
+        for w in self.workers.values():
+            p = w["process"]
+            if p is None:
+                continue
+            p.join(timeout)
+            if p.is_alive():
+                p.terminate()
+                p.join(timeout)
+
+
+# === Presentation process (main) ===
+def main():
+    parser = argparse.ArgumentParser(description="Privacy overlay with gaze, capture and display in separate processes")
+    parser.add_argument("--monitor", type=int, default=1, help="mss monitor number")
+    parser.add_argument("--target-fps", type=float, default=30)
+    args = parser.parse_args()
+
+    import mss
+    import tkinter as tk
+    import win32api
+    import win32con
+    import win32gui
+    from PIL import Image, ImageTk
+    from blur_engine import BlurEngine
+    from multi_monitor import VirtualDesktop
+
+    with mss.mss() as sct:
+        monitor = sct.monitors[args.monitor]
+        # The window hides for each grab off the whole virtual desktop, not
+        # just left of and above the primary monitor
+        hidden = VirtualDesktop(sct.monitors[1:] + [monitor]).offscreen(-1)
+    width, height = monitor['width'], monitor['height']
+
+    root = tk.Tk()
+    root.title("Privacy Overlay")
+    root.geometry(f"{width}x{height}+{monitor['left']}+{monitor['top']}")
+    root.configure(bg='white')
+    root.attributes('-transparentcolor', 'white')
+    root.attributes('-topmost', True)
+    root.overrideredirect(True)
+    label = tk.Label(root, bg='white')
+    label.pack(fill='both', expand=True)
+    root.update()
+
+    hwnd = win32gui.FindWindow(None, "Privacy Overlay")
+    exStyle = win32gui.GetWindowLong(hwnd, win32con.GWL_EXSTYLE)
+    win32gui.SetWindowLong(hwnd, win32con.GWL_EXSTYLE, exStyle | win32con.WS_EX_LAYERED | win32con.WS_EX_TRANSPARENT)
+    win32gui.SetLayeredWindowAttributes(hwnd, win32api.RGB(255, 255, 255), 0, win32con.LWA_COLORKEY)
+
+    pil_frame = Image.new("RGB", (width, height), "white")
+    photo_img = ImageTk.PhotoImage(pil_frame)
+    label.configure(image=photo_img)
+
+    # Spawn on every platform, so Linux runs behave like Windows
+    ctx = multiprocessing.get_context("spawn")
+    stop = ctx.Event()
+    ring = SharedFrameRing((height, width, 4), create=True)
+    gaze = SharedGazeSlot(create=True)
+    supervisor = Supervisor(ctx, stop)
+    supervisor.add("gaze", gaze_worker, (gaze.spec(), stop, width, height))
+    supervisor.add("capture", capture_worker, (ring.spec(), gaze.spec(), stop, hwnd, monitor, hidden, args.target_fps))
+    supervisor.start()
+
+    fallback = BlurEngine(quality="high")
+    state = {"seq": 0}
+
+    def update():
+        seq, frame, _ = ring.latest(state["seq"])
+        if frame is not None:
+            pil_frame.frombytes(frame, "raw", "BGRX")
+            # Skip a frame the capture process overwrote while it was decoded
+            if ring.valid(seq):
+                photo_img.paste(pil_frame)
+                state["seq"] = seq
+        if "capture" in supervisor.poll():
+            # The last frame may show a clear window; blur what is on screen
+            # until the restarted capture process delivers again
+            blurred = fallback.blur(np.asarray(pil_frame))
+            pil_frame.paste(Image.fromarray(blurred))
+            photo_img.paste(pil_frame)
+        root.after(5, update)
+
+    try:
+        update()
+        root.mainloop()
+    finally:
+        supervisor.shutdown()
+        ring.close()
+        ring.unlink()
+        gaze.close()
+        gaze.unlink()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+import time
+
+# Geometry and scheduling for covering several monitors. mss reports every
+# monitor in one virtual-desktop coordinate space (monitors[0] is the bounding
+# box, monitors[1:] the displays, with possibly negative left/top). Gaze is
+# mapped into that space; the monitor under it is processed at full rate and
+# the others only keep a blurred copy of their content fresh.
+
+
+def parse_monitors(spec, available):
+    # spec: "all", "primary" or a comma list of mss monitor numbers (1-based)
+    # available: number of physical monitors (len(sct.monitors) - 1)
+    if spec == "all":
+        return list(range(1, available + 1))
+    if spec == "primary":
+        return [1]
+    try:
+        numbers = [int(n) for n in spec.split(",")]
+    except ValueError:
+        raise ValueError(f"Invalid monitors '{spec}'. Must be 'all', 'primary' or a comma list of monitor numbers")
+    bad = [n for n in numbers if not 1 <= n <= available]
+    if bad:
+        raise ValueError(f"Invalid monitor {bad[0]}. Must be one of {list(range(1, available + 1))}")
+    return numbers
+
+
+class VirtualDesktop:
+    def __init__(self, monitors):
+        # monitors: mss monitor dicts (left, top, width, height)
+        self.monitors = list(monitors)
+        self.left = min(m["left"] for m in self.monitors)
+        self.top = min(m["top"] for m in self.monitors)
+        self.right = max(m["left"] + m["width"] for m in self.monitors)
+        self.bottom = max(m["top"] + m["height"] for m in self.monitors)
+        self.width = self.right - self.left
+        self.height = self.bottom - self.top
+
+    def from_normalized(self, nx, ny):
+        # Webcam eye position (0..1) to a point on the virtual desktop
+        return self.left + nx * self.width, self.top + ny * self.height
+
+    def locate(self, x, y):
+        # Monitor containing the point, else the nearest one (gaps between
+        # monitors of different sizes are not on any display)
+        best, best_d = 0, None
+        for i, m in enumerate(self.monitors):
+            dx = max(m["left"] - x, 0, x - (m["left"] + m["width"] - 1))
+            dy = max(m["top"] - y, 0, y - (m["top"] + m["height"] - 1))
+            d = dx * dx + dy * dy
+            if d == 0:
+                return i
+            if best_d is None or d < best_d:
+                best, best_d = i, d
+        return best
+
+    def to_local(self, index, x, y):
+        m = self.monitors[index]
+        return int(x - m["left"]), int(y - m["top"])
+
+    def center(self, index):
+        m = self.monitors[index]
+        return m["left"] + m["width"] // 2, m["top"] + m["height"] // 2
+
+    def offscreen(self, index):
+        # Window position that takes monitor `index`'s overlay off every display,
+        # used to hide it for a grab (-width, -height can land on a monitor left of
+        # or above the primary)
+        m = self.monitors[index]
+        return self.left - m["width"] - 64, self.top - m["height"] - 64
+
+
+class MonitorScheduler:
+    # Decides which monitors to grab. The gazed monitor is grabbed every frame.
+    # The others are grabbed every `idle_interval` s while their content is
+    # static, and every `busy_interval` s after a grab found changed tiles.
+    # The monitor gaze just left is grabbed immediately, so its clear window is
+    # replaced by blur within a frame.
+    def __init__(self, count, idle_interval=1.0, busy_interval=0.25, active=0):
+        self.count = count
+        self.idle_interval = idle_interval
+        self.busy_interval = busy_interval
+        self.active = active
+        self.next_due = [0.0] * count
+        self.switches = 0
+
+    def set_active(self, index, now=None):
+        # Returns the monitor gaze left, or None if it didn't move
+        if index == self.active:
+            return None
+        previous, self.active = self.active, index
+        self.next_due[previous] = now if now is not None else time.perf_counter()
+        self.switches += 1
+        return previous
+
+    def is_active(self, index):
+        return index == self.active
+
+    def due(self, index, now):
+        return index == self.active or now >= self.next_due[index]
+
+    def wait_time(self, index, now):
+        return 0.0 if self.due(index, now) else self.next_due[index] - now
+
+    def grabbed(self, index, now, changed):
+        if index != self.active:
+            self.next_due[index] = now + (self.busy_interval if changed else self.idle_interval)
+
+
+if __name__ == "__main__":
+    # Blur/composite cost of covering 1 vs N monitors of the same size, with
+    # gaze hopping between them, at a fixed frame rate
+    import argparse
+    import numpy as np
+    from bench_blur import RESOLUTIONS, synthetic_screen
+    from blur_engine import BlurEngine
+    from compositor import GazeCompositor
+    from dirty_tiles import DirtyTileBlur
+
+    parser = argparse.ArgumentParser(description="Per-second processing cost for 1..N monitors")
+    parser.add_argument("--monitors", type=int, default=3)
+    parser.add_argument("--resolution", default="1440p", choices=list(RESOLUTIONS))
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--fps", type=float, default=30)
+    parser.add_argument("--dwell", type=float, default=3.0, help="Seconds gaze stays on one monitor")
+    args = parser.parse_args()
+
+    width, height = RESOLUTIONS[args.resolution]
+    base = synthetic_screen(width, height, 4)
+
+    def simulate(count):
+        monitors = [{"left": i * width, "top": 0, "width": width, "height": height} for i in range(count)]
+        desktop = VirtualDesktop(monitors)
+        scheduler = MonitorScheduler(count)
+        blurs = [DirtyTileBlur(BlurEngine("high")) for _ in range(count)]
+        compositor = GazeCompositor(radius=int(130 * height / 1600))
+        out = np.empty_like(base)
+        screens = [base.copy() for _ in range(count)]
+        frames = int(args.seconds * args.fps)
+        grabs, busy = 0, 0.0
+        for n in range(frames):
+            now = n / args.fps
+            gx, gy = desktop.center(int(now / args.dwell) % count)
+            scheduler.set_active(desktop.locate(gx, gy), now)
+            for i in range(count):
+                # Every monitor has a line of text changing every frame
+                x = 40 + (n * 9) % (width - 80)
+                screens[i][height // 3:height // 3 + 14, x:x + 8] = n % 255
+                if not scheduler.due(i, now):
+                    continue
+                grabs += 1
+                t0 = time.perf_counter()
+                blurred = blurs[i].update(screens[i])
+                np.copyto(out, blurred)
+                if scheduler.is_active(i):
+                    compositor.composite(screens[i], out, *desktop.to_local(i, gx, gy))
+                busy += time.perf_counter() - t0
+                scheduler.grabbed(i, now, blurs[i].last_dirty > 0)
+        return grabs / args.seconds, busy / args.seconds * 1000
+
+    single_grabs, single_ms = simulate(1)
+    print(f"{'monitors':<10}{'grabs/s':>9}{'busy ms/s':>11}{'vs 1':>8}")
+    print(f"{1:<10}{single_grabs:>9.1f}{single_ms:>11.1f}{1.0:>7.2f}x")
+    for count in range(2, args.monitors + 1):
+        grabs, ms = simulate(count)
+        print(f"{count:<10}{grabs:>9.1f}{ms:>11.1f}{ms / single_ms:>7.2f}x")
@@ -0,0 +1,79 @@
+import threading
+import time
+
+
+# === Latest-value slot ===
+# Holds only the newest item. Writers never block and readers never queue up
+# behind stale frames: a put() simply replaces whatever has not been read yet.
+class LatestSlot:
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._value = None
+        self._seq = 0
+
+    def put(self, value):
+        with self._cond:
+            self._value = value
+            self._seq += 1
+            self._cond.notify_all()
+
+    def peek(self):
+        with self._cond:
+            return self._seq, self._value
+
+    def wait_newer(self, last_seq, timeout=None):
+        # Returns (seq, value) once something newer than last_seq is available,
+        # or (last_seq, None) if the timeout expires first.
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._seq > last_seq, timeout):
+                return last_seq, None
+            return self._seq, self._value
+
+
+# === Pipeline stage ===
+# Runs step() in a loop on its own daemon thread until stop is set and keeps
+# a few counters so the slowest stage is easy to spot. init() runs once on the
+# stage's thread first (e.g. to pin it to CPUs).
+class Stage(threading.Thread):
+    def __init__(self, name, step, stop, init=None):
+        super().__init__(name=name, daemon=True)
+        self.step = step
+        self.stop = stop
+        self.init = init
+        self.frames = 0
+        self.last_ms = 0.0
+        self.error = None
+
+    def run(self):
+        try:
+            if self.init is not None:
+                self.init()
+            while not self.stop.is_set():
+                t0 = time.perf_counter()
+                if self.step() is False:
+                    continue
+                self.last_ms = (time.perf_counter() - t0) * 1000
+                self.frames += 1
+        except Exception as e:
+            self.error = e
+            print(f"[{self.name}] stage stopped: {e}")
+
+
+class Pipeline:
+    def __init__(self):
+        self.stop = threading.Event()
+        self.stages = []
+
+    def add(self, name, step, init=None):
+        stage = Stage(name, step, self.stop, init)
+        self.stages.append(stage)
+        return stage
+
+    def start(self):
+        for stage in self.stages:
+            stage.start()
+
+    def shutdown(self, timeout=1.0):
+        self.stop.set()
+        for stage in self.stages:
+            stage.join(timeout)
@@ -0,0 +1,170 @@
+import os
+import time
+import cv2
+import numpy as np
+
+# Presence detection for idle mode. FaceMesh and the screen grab are the
+# expensive parts of the loop; when nobody has been at the screen for a while
+# the overlay shows one static, fully blurred frame and only probes the webcam
+# with a cheap detector until someone comes back.
+
+PRESENT, ABSENT, MULTIPLE = "present", "absent", "multiple"
+STATES = (PRESENT, ABSENT, MULTIPLE)
+
+
+class PresenceDetector:
+    # Cheap per-frame evidence: the number of faces a Haar cascade finds on a
+    # downscaled frame, and how much the scene moved since the previous call
+    # (mean abs difference of an 80x60 grey thumbnail). Without a cascade
+    # (OpenCV 5 moved CascadeClassifier out of the main package, and some
+    # builds ship no cv2.data) only motion is available and faces() is None.
+    def __init__(self, width=240, cascade=None, motion_threshold=4.0):
+        self.width = width
+        self.motion_threshold = motion_threshold
+        if cascade is None and hasattr(cv2, "data"):
+            cascade = os.path.join(cv2.data.haarcascades, "haarcascade_frontalface_default.xml")
+        self.cascade = None
+        if cascade and os.path.exists(cascade) and hasattr(cv2, "CascadeClassifier"):
+            self.cascade = cv2.CascadeClassifier(cascade)
+            if self.cascade.empty():
+                self.cascade = None
+        self._thumb = None
+
+    def faces(self, frame):
+        if self.cascade is None:
+            return None
+        h, w = frame.shape[:2]
+        small = cv2.resize(frame, (self.width, self.width * h // w), interpolation=cv2.INTER_AREA)
+        grey = cv2.equalizeHist(cv2.cvtColor(small, cv2.COLOR_BGR2GRAY))
+        return len(self.cascade.detectMultiScale(grey, scaleFactor=1.15, minNeighbors=4, minSize=(16, 16)))
+
+    def motion(self, frame):
+        thumb = cv2.resize(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), (80, 60), interpolation=cv2.INTER_AREA)
+        prev, self._thumb = self._thumb, thumb
+        if prev is None:
+            return 0.0
+        return float(cv2.absdiff(thumb, prev).mean())
+
+    def moved(self, frame):
+        return self.motion(frame) >= self.motion_threshold
+
+
+class PresenceMonitor:
+    # present  -> absent   no face and no motion for absent_after s
+    # absent   -> present  a face or motion at any probe
+    # present  -> multiple 2+ faces for multiple_after s
+    # multiple -> present  at most one face for multiple_after s
+    # While absent the webcam is probed every probe_interval s, so wake-up
+    # takes at most probe_interval plus one detector pass.
+    def __init__(self, absent_after=10.0, multiple_after=0.5, probe_interval=0.5, on_change=None, now=None):
+        self.absent_after = absent_after
+        self.multiple_after = multiple_after
+        self.probe_interval = probe_interval
+        self.on_change = on_change
+        now = time.perf_counter() if now is None else now
+        self.state = PRESENT
+        self.since = now
+        self._started = now
+        self._last_seen = now
+        self._multi_since = None
+        self._single_since = None
+        self.time_in = {s: 0.0 for s in STATES}
+        self.transitions = []
+
+    @property
+    def idle(self):
+        return self.state == ABSENT
+
+    def observe(self, t, faces=None, activity=False):
+        # faces: faces counted in this frame (None if not counted);
+        # activity: other sign of a person (face tracked, scene moved)
+        if faces or activity:
+            self._last_seen = t
+        if self.state == ABSENT:
+            if faces or activity:
+                self._set(PRESENT, t)
+            return self.state
+
+        if faces is not None and faces >= 2:
+            self._single_since = None
+            self._multi_since = t if self._multi_since is None else self._multi_since
+            if self.state == PRESENT and t - self._multi_since >= self.multiple_after:
+                self._set(MULTIPLE, t)
+        elif faces is not None:
+            self._multi_since = None
+            self._single_since = t if self._single_since is None else self._single_since
+            if self.state == MULTIPLE and t - self._single_since >= self.multiple_after:
+                self._set(PRESENT, t)
+
+        if t - self._last_seen >= self.absent_after:
+            self._set(ABSENT, t)
+        return self.state
+
+    def _set(self, state, t):
+        old = self.state
+        self.time_in[old] += t - self.since
+        self.state, self.since = state, t
+        self._multi_since = self._single_since = None
+        self.transitions.append((round(t - self._started, 3), old, state))
+        if self.on_change is not None:
+            self.on_change(old, state)
+
+    def report(self, now=None):
+        now = time.perf_counter() if now is None else now
+        time_in = dict(self.time_in)
+        time_in[self.state] += now - self.since
+        return {
+            "state": self.state,
+            "transitions": len(self.transitions),
+            "time_s": {s: round(v, 1) for s, v in time_in.items()},
+            "recent": self.transitions[-10:],
+        }
+
+
+if __name__ == "__main__":
+    # Scripted session (face counts per second) through the state machine at a
+    # 30 fps webcam: frames processed per state, and wake-up latency
+    import argparse
+    parser = argparse.ArgumentParser(description="Presence state machine replay")
+    parser.add_argument("--absent-after", type=float, default=10.0)
+    parser.add_argument("--probe-interval", type=float, default=0.5)
+    parser.add_argument("--cascade", help="Haar cascade XML (defaults to cv2.data's frontal face model)")
+    args = parser.parse_args()
+
+    detector = PresenceDetector(cascade=args.cascade)
+    webcam = np.random.default_rng(0).integers(0, 255, (480, 640, 3), dtype=np.uint8)
+    n = 100
+    t0 = time.perf_counter()
+    for _ in range(n):
+        detector.faces(webcam)
+    faces_ms = (time.perf_counter() - t0) * 1000 / n
+    t0 = time.perf_counter()
+    for _ in range(n):
+        detector.moved(webcam)
+    motion_ms = (time.perf_counter() - t0) * 1000 / n
+    print(f"detector: faces {faces_ms:.2f} ms" if detector.cascade is not None else "detector: no face cascade",
+          f"| motion {motion_ms:.2f} ms")
+
+    # (seconds, faces): at the desk, away, back, someone looking over the shoulder, alone again
+    script = [(20, 1), (60, 0), (10, 1), (5, 2), (10, 1)]
+    monitor = PresenceMonitor(absent_after=args.absent_after, probe_interval=args.probe_interval, now=0.0)
+    processed = {s: 0 for s in STATES}
+    t, end, wake, returned_at = 0.0, 0.0, [], None
+    for seconds, faces in script:
+        start, end = end, end + seconds
+        if faces and monitor.idle:
+            returned_at = start
+        while t < end:
+            state = monitor.observe(t, faces)
+            processed[state] += 1
+            if returned_at is not None and state != ABSENT:
+                wake.append(t - returned_at)
+                returned_at = None
+            t += monitor.probe_interval if monitor.idle else 1 / 30
+    report = monitor.report(now=t)
+    print(f"{'state':<10}{'time s':>8}{'frames/s':>10}")
+    for s in STATES:
+        secs = report["time_s"][s]
+        print(f"{s:<10}{secs:>8.1f}{processed[s] / secs if secs else 0:>10.1f}")
+    print(f"transitions: {report['recent']}")
+    print(f"wake-up: {max(wake) * 1000:.0f} ms (bound {args.probe_interval * 1000:.0f} ms + one detector pass)")
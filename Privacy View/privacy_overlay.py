@@ -1,39 +1,125 @@
-import cv2
-import numpy as np
-import mss
 import time
-import mediapipe as mp
+LAUNCHED = time.perf_counter()
+
+# Only what the protective frame and the windows need is imported up front.
+# OpenCV and the blur pipeline follow once the screen is covered; MediaPipe
+# and the webcam load on background threads.
+import argparse
+import threading
 import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
+import mss
+import numpy as np
 import win32gui
 import win32con
 import win32api
-from PIL import Image, ImageTk
+from PIL import ImageTk
+from startup import StartupClock, protective_frame
+from pipeline import LatestSlot, Pipeline
+from frame_pool import FramePool, grab_bgra
+from telemetry import Telemetry
+from multi_monitor import MonitorScheduler, VirtualDesktop, parse_monitors
+
+# === CLI / Telemetry ===
+parser = argparse.ArgumentParser()
+parser.add_argument("--telemetry", action="store_true", help="Record per-stage timings from startup")
+parser.add_argument("--telemetry-log", help="Append a JSON-lines stats snapshot to this file every few seconds")
+parser.add_argument("--telemetry-port", type=int,
+                    help="Serve stats on http://127.0.0.1:PORT/stats (/enable and /disable toggle recording)")
+parser.add_argument("--target-fps", type=float, default=30,
+                    help="Frame rate the adaptive quality controller tries to hold")
+parser.add_argument("--monitors", default="all",
+                    help="Monitors to cover: 'all', 'primary' or a comma list of mss monitor numbers")
+parser.add_argument("--idle-refresh", type=float, default=1.0,
+                    help="Seconds between grabs of monitors you are not looking at")
+parser.add_argument("--blur-workers", type=int, default=0,
+                    help="Blur in horizontal bands on this many worker threads (0: one OpenCV call)")
+parser.add_argument("--blur-cpus", help="Pin blur workers to these CPUs, e.g. 2-7")
+parser.add_argument("--gaze-cpus", help="Pin the webcam + FaceMesh stage to these CPUs, e.g. 0-1")
+parser.add_argument("--absent-after", type=float, default=10.0,
+                    help="Seconds without a face or motion before going idle (static blurred frame)")
+parser.add_argument("--probe-interval", type=float, default=0.5,
+                    help="Seconds between webcam probes while idle (bounds wake-up time)")
+args = parser.parse_args()
+
+# Startup milestones (ms since launch) go into telemetry and are printed once
+# the first frame with a clear window is up
+startup = StartupClock(LAUNCHED)
+telemetry = Telemetry(enabled=args.telemetry)
+telemetry.add_source("startup", startup.report)
+if args.telemetry_log:
+    telemetry.write_jsonl(args.telemetry_log, interval=5.0)
+if args.telemetry_port:
+    telemetry.serve(args.telemetry_port)
+
+# === Background Init ===
+# Opening the webcam and building the FaceMesh graph are the slowest parts of
+# startup; they run on their own threads while the screen is already covered.
+init_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="init")
+
+def open_camera():
+    import cv2
+    cap = cv2.VideoCapture(0)
+    startup.mark("camera_open")
+    return cap
 
-# === MediaPipe Setup ===
-mp_face_mesh = mp.solutions.face_mesh
-face_mesh = mp_face_mesh.FaceMesh(static_image_mode=False, max_num_faces=1, refine_landmarks=True)
+def load_face_mesh():
+    import mediapipe as mp
+    # Only the eye corners (33, 263) are used, so the iris refinement model is skipped
+    face_mesh = mp.solutions.face_mesh.FaceMesh(static_image_mode=False, max_num_faces=1, refine_landmarks=False)
+    startup.mark("face_mesh_ready")
+    return face_mesh
+
+camera_ready = init_pool.submit(open_camera)
+face_mesh_ready = init_pool.submit(load_face_mesh)
 
 # === Screen Setup ===
-sct = mss.mss()
-monitor = sct.monitors[1]
-screen_width, screen_height = monitor['width'], monitor['height']
+# mss handles are per-thread, so each capture stage opens its own instance.
+# Gaze lives in virtual-desktop coordinates spanning all covered monitors.
+with mss.mss() as sct:
+    monitors = [sct.monitors[n] for n in parse_monitors(args.monitors, len(sct.monitors) - 1)]
+desktop = VirtualDesktop(monitors)
+# Only the gazed monitor is grabbed and composited every frame; the others
+# keep a blurred copy refreshed every --idle-refresh s (faster while changing)
+scheduler = MonitorScheduler(len(monitors), idle_interval=args.idle_refresh,
+                             busy_interval=min(0.25, args.idle_refresh))
+
+# === Protective Frame ===
+# Grabbed before any overlay window exists, blurred with PIL alone
+with mss.mss() as sct:
+    protective = [protective_frame(sct, m) for m in monitors]
 
-# === Tkinter Transparent Fullscreen Window ===
+# === Tkinter Transparent Fullscreen Windows ===
+# One overlay window per monitor, showing the protective frame until the
+# pipeline delivers
 root = tk.Tk()
-root.title("Privacy Overlay")
-root.geometry(f"{screen_width}x{screen_height}+0+0")
-root.configure(bg='white')
-root.attributes('-transparentcolor', 'white')
-root.attributes('-topmost', True)
-root.overrideredirect(True)
 
-label = tk.Label(root, bg='white')
-label.pack(fill='both', expand=True)
+def overlay_window(index, monitor, image):
+    window = root if index == 0 else tk.Toplevel(root)
+    window.title("Privacy Overlay" if index == 0 else f"Privacy Overlay {index + 1}")
+    window.geometry(f"{monitor['width']}x{monitor['height']}+{monitor['left']}+{monitor['top']}")
+    window.configure(bg='white')
+    window.attributes('-transparentcolor', 'white')
+    window.attributes('-topmost', True)
+    window.overrideredirect(True)
+    photo = ImageTk.PhotoImage(image)
+    label = tk.Label(window, bg='white', image=photo)
+    label.pack(fill='both', expand=True)
+    return window, photo
+
+windows = [overlay_window(i, m, image) for i, (m, image) in enumerate(zip(monitors, protective))]
+root.update()
+startup.mark("first_protected_frame")
 
 # === Click-Through Window ===
-def make_window_click_through(window_title="Privacy Overlay", retries=10, delay=0.2):
+def make_window_click_through(window, retries=10, delay=0.2):
+    # Tk reports its own top-level HWND; polling FindWindow is only a fallback
+    try:
+        hwnd = int(window.wm_frame(), 16)
+    except (tk.TclError, ValueError):
+        hwnd = 0
     for _ in range(retries):
-        hwnd = win32gui.FindWindow(None, window_title)
+        hwnd = hwnd or win32gui.FindWindow(None, window.title())
         if hwnd:
             exStyle = win32gui.GetWindowLong(hwnd, win32con.GWL_EXSTYLE)
             win32gui.SetWindowLong(hwnd, win32con.GWL_EXSTYLE,
@@ -41,75 +127,318 @@ def make_window_click_through(window_title="Privacy Overlay", retries=10, delay=
             win32gui.SetLayeredWindowAttributes(hwnd, win32api.RGB(255, 255, 255), 0, win32con.LWA_COLORKEY)
             return hwnd
         time.sleep(delay)
-    raise RuntimeError(f"Window '{window_title}' not found.")
+    raise RuntimeError(f"Window '{window.title()}' not found.")
 
-root.update()
-hwnd = make_window_click_through("Privacy Overlay")
+# === Deferred Imports ===
+import cv2
+from blur_engine import BlurEngine
+from compositor import GazeCompositor
+from dirty_tiles import DirtyTileBlur
+from gaze_tracker import GazeTracker
+from gaze_filter import make_filter
+from quality_controller import QualityController
+from band_blur import BandBlur, make_blur_pool, parse_cpus, pin_current_thread
+from presence import PresenceDetector, PresenceMonitor, PRESENT
+
+# === Adaptive Quality ===
+# Picks blur quality, processing scale, FaceMesh cadence and refresh interval
+# to hold the target frame budget, never going below the default privacy floor
+controller = QualityController(target_fps=args.target_fps)
+
+# === Blur Workers ===
+# With --blur-workers every monitor's blur is split into bands on one shared,
+# fixed-size pool, so blur can't spread over the cores gaze tracking uses
+blur_pool = None
+if args.blur_workers or args.blur_cpus:
+    blur_pool = make_blur_pool(args.blur_workers, parse_cpus(args.blur_cpus))
+    # Process-wide: OpenCV's own pool would spread every call (webcam
+    # resizes included) over all cores again
+    cv2.setNumThreads(1)
+
+# === Presence ===
+# Without anybody at the screen there is nothing to track: FaceMesh, capture
+# and blur stop, every monitor keeps one fully blurred frame, and the webcam is
+# only probed by a cheap face/motion detector. Several faces (someone looking
+# over the shoulder) remove the clear window.
+presence_detector = PresenceDetector()
+awake = threading.Event()
+awake.set()
+
+def on_presence_change(old, new):
+    telemetry.count(f"presence.{new}")
+    if presence.idle:
+        awake.clear()
+    else:
+        awake.set()
 
-# === Webcam ===
-cap = cv2.VideoCapture(0)
-photo_img = None
+presence = PresenceMonitor(absent_after=args.absent_after, probe_interval=args.probe_interval,
+                           on_change=on_presence_change)
+telemetry.add_source("presence", presence.report)
+MULTI_CHECK_EVERY = 10  # count faces with the cascade every Nth webcam frame
+
+# === Per-Monitor Surfaces ===
+# Each monitor has its own window, capture/composite stages, blur state and
+# display buffers. Frames stay BGRA from capture to display. The composite
+# stage writes into a preallocated triple buffer; the Tk side decodes it into
+# one persistent PIL image (BGRX -> RGB during the copy) and pastes that into
+# one PhotoImage.
+class Surface:
+    def __init__(self, index, monitor, window, photo, image):
+        self.index = index
+        self.monitor = monitor
+        self.width, self.height = monitor['width'], monitor['height']
+        self.window = window
+        self.hwnd = make_window_click_through(window)
+
+        self.frame_pool = FramePool((self.height, self.width, 4))
+        # Display buffers start out holding the protective frame
+        self.pil_frame = image
+        self.photo_img = photo
+
+        self.screen_slot = LatestSlot()  # latest BGRA screen grab
+        # Each grab briefly moves the overlay off-screen, so don't grab again
+        # until the composite stage has picked up the previous one
+        self.screen_taken = threading.Event()
+        self.screen_taken.set()
+        self.next_due = 0.0
+        self.capture_ms = 0.0
+        self.sct = None
+        self.composite_seq = 0
+        self.static = False  # a fully blurred frame is up and presence is idle
+        self.scaled_buffers = {}
+        self.compositor = GazeCompositor(radius=130)
+        # Quality posted by apply_quality; the surface's own composite stage
+        # switches to it, so blur state is never swapped under a running blur
+        self.quality = controller.level.quality
+        self.set_quality(self.quality)
+
+    def set_quality(self, quality):
+        # "full" reproduces the old 45x45 GaussianBlur; lower levels blur at
+        # 1/4 or 1/8 scale. Only tiles that changed since the last grab are
+        # re-blurred. Engines keep scratch buffers, so each surface has its own.
+        if blur_pool is not None:
+            self.blur_engine = BandBlur(quality, pool=blur_pool)
+        else:
+            self.blur_engine = BlurEngine(quality=quality)
+        self.tile_blur = DirtyTileBlur(self.blur_engine, tile=128)
+
+surfaces = [Surface(i, m, window, photo, image)
+            for i, (m, (window, photo), image) in enumerate(zip(monitors, windows, protective))]
+
+# === Pipeline Slots ===
+# (x, y, t) in virtual-desktop coordinates, t = webcam frame time. Empty
+# until FaceMesh has produced a gaze: no clear window before then.
+gaze_slot = LatestSlot()
 
 # === Smoothing ===
-smooth_cx, smooth_cy = screen_width // 2, screen_height // 2
-alpha = 0.2  # Smoothing factor
-
-def capture_screen_without_overlay():
-    # Temporarily move window off-screen instead of hiding
-    win32gui.SetWindowPos(hwnd, None, -screen_width, -screen_height, 0, 0, win32con.SWP_NOSIZE | win32con.SWP_NOZORDER)
-    time.sleep(0.005)  # small delay to avoid flicker
-    img = sct.grab(monitor)
-    img_np = np.array(img)
+# One-Euro filter predicting ahead by the measured webcam-to-display latency
+gaze_filter = make_filter("one_euro", min_cutoff=1.0, beta=0.01)
+max_horizon = 0.2  # never extrapolate further than this (s)
+
+def capture_screen_without_overlay(surface, sct):
+    # Temporarily move window off every monitor instead of hiding
+    with telemetry.span("capture.hide"):
+        x, y = desktop.offscreen(surface.index)
+        win32gui.SetWindowPos(surface.hwnd, None, x, y, 0, 0, win32con.SWP_NOSIZE | win32con.SWP_NOZORDER)
+        time.sleep(0.005)  # small delay to avoid flicker
+    with telemetry.span("capture.grab"):
+        img_np = grab_bgra(sct, surface.monitor)
     # Move window back instantly
-    win32gui.SetWindowPos(hwnd, None, 0, 0, 0, 0, win32con.SWP_NOSIZE | win32con.SWP_NOZORDER)
-    return cv2.cvtColor(img_np, cv2.COLOR_BGRA2RGB)
+    with telemetry.span("capture.show"):
+        win32gui.SetWindowPos(surface.hwnd, None, surface.monitor['left'], surface.monitor['top'], 0, 0,
+                              win32con.SWP_NOSIZE | win32con.SWP_NOZORDER)
+    return img_np
 
-def fast_blur_except_circle(img, cx, cy, radius=130):
-    blurred = cv2.GaussianBlur(img, (45, 45), 0)
-    mask = np.zeros((screen_height, screen_width), dtype=np.uint8)
-    cv2.circle(mask, (cx, cy), radius, 255, -1)
-    mask_3ch = np.stack([mask]*3, axis=-1)
-    return np.where(mask_3ch == 255, img, blurred)
+def fast_blur_except_circle(surface, img, cx, cy, radius=130, out=None):
+    # Copy so the clear window never lands in the persistent blurred framebuffer.
+    # cx=None blurs everything (monitors nobody is looking at).
+    with telemetry.span("blur"):
+        blurred = surface.tile_blur.update(img)
+    telemetry.count("blur.dirty_tiles", surface.tile_blur.last_dirty)
+    with telemetry.span("composite"):
+        if out is None:
+            out = np.empty_like(blurred)
+        np.copyto(out, blurred)
+        if cx is None:
+            return out
+        surface.compositor.radius = radius
+        return surface.compositor.composite(img, out, cx, cy)
 
-def update():
-    global photo_img, smooth_cx, smooth_cy
+def process_frame(surface, img, cx, cy, out, scale=1.0):
+    # Below scale 1.0 the grab is blurred and composited at reduced size and
+    # upsampled into the display buffer
+    if scale >= 1.0:
+        return fast_blur_except_circle(surface, img, cx, cy, out=out)
+    w, h = int(surface.width * scale), int(surface.height * scale)
+    if (w, h) not in surface.scaled_buffers:
+        surface.scaled_buffers.clear()
+        surface.scaled_buffers[(w, h)] = (np.empty((h, w, 4), np.uint8), np.empty((h, w, 4), np.uint8))
+    small, small_out = surface.scaled_buffers[(w, h)]
+    cv2.resize(img, (w, h), dst=small, interpolation=cv2.INTER_AREA)
+    if cx is not None:
+        cx, cy = int(cx * scale), int(cy * scale)
+    fast_blur_except_circle(surface, small, cx, cy, radius=int(130 * scale), out=small_out)
+    return cv2.resize(small_out, (surface.width, surface.height), dst=out, interpolation=cv2.INTER_LINEAR)
+
+gaze_tracker = None  # created on the gaze stage once FaceMesh is loaded
+cap = None
+
+def apply_quality(level):
+    for surface in surfaces:
+        surface.quality = level.quality
+    if gaze_tracker is not None:
+        gaze_tracker.infer_every = level.infer_every
 
-    ret, frame = cap.read()
+apply_quality(controller.level)
+
+# === Stage: webcam grab + FaceMesh ===
+gaze_frames = 0
+
+def gaze_init():
+    global gaze_tracker, cap
+    pin_current_thread(parse_cpus(args.gaze_cpus))
+    cap = camera_ready.result()
+    # FaceMesh runs every few frames on a face crop; optical flow tracks the
+    # eyes in between (cadence set by the quality controller)
+    gaze_tracker = GazeTracker(face_mesh_ready.result(), infer_every=controller.level.infer_every)
+
+def gaze_step():
+    global gaze_frames
+    if presence.idle:
+        # Idle: probe at a low rate with the cheap detector only
+        time.sleep(presence.probe_interval)
+        ret, frame = cap.read()
+        if ret:
+            with telemetry.span("presence.probe"):
+                presence.observe(time.perf_counter(), presence_detector.faces(frame),
+                                 presence_detector.moved(frame))
+        return False
+
+    with telemetry.span("webcam.read"):
+        ret, frame = cap.read()
+    t = time.perf_counter()
     if not ret:
-        root.after(33, update)
-        return
+        telemetry.count("webcam.read_failed")
+        time.sleep(0.033)
+        return False
 
     frame = cv2.flip(frame, 1)
-    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    results = face_mesh.process(rgb)
+    with telemetry.span("gaze.track"):
+        eyes = gaze_tracker.process(frame)
 
-    target_cx, target_cy = screen_width // 2, screen_height // 2
+    gaze_frames += 1
+    faces = presence_detector.faces(frame) if gaze_frames % MULTI_CHECK_EVERY == 0 else None
+    # moved() runs every frame so its reference thumbnail stays current
+    moved = presence_detector.moved(frame)
+    presence.observe(t, faces, eyes is not None or moved)
 
-    if results.multi_face_landmarks:
-        landmarks = results.multi_face_landmarks[0].landmark
-        left_eye = landmarks[33]
-        right_eye = landmarks[263]
-        eye_x = (left_eye.x + right_eye.x) / 2
-        eye_y = (left_eye.y + right_eye.y) / 2
-        target_cx = int(eye_x * screen_width)
-        target_cy = int(eye_y * screen_height)
+    if eyes is None:
+        telemetry.count("gaze.face_not_found")
+        gaze_filter.reset()
+        gx, gy = desktop.center(scheduler.active)
+    else:
+        gx, gy = gaze_filter.update(t, *desktop.from_normalized(*eyes))
+    if scheduler.set_active(desktop.locate(gx, gy)) is not None:
+        telemetry.count("monitor.switches")
+    gaze_slot.put((int(gx), int(gy), t))
 
-    # Smooth
-    # smooth_cx = int(alpha * target_cx + (1 - alpha) * smooth_cx)
-    # smooth_cy = int(alpha * target_cy + (1 - alpha) * smooth_cy)
+# === Stage: screen capture (one per monitor) ===
+# Grabs of the gazed monitor are paced to the controller's refresh interval;
+# the other monitors are grabbed when the scheduler says they are due.
+def capture_step(surface):
+    if presence.idle and surface.static:
+        awake.wait(0.1)
+        return False
+    if not surface.screen_taken.wait(0.1):
+        return False
+    wait = scheduler.wait_time(surface.index, time.perf_counter())
+    if wait > 0:
+        # Re-check at least every 50 ms, so gaze arriving here is picked up quickly
+        time.sleep(min(wait, 0.05))
+        return False
+    wait = surface.next_due - time.perf_counter()
+    if wait > 0:
+        time.sleep(wait)
+    t0 = time.perf_counter()
+    surface.next_due = t0 + controller.level.interval_ms / 1000
+    surface.screen_taken.clear()
+    if surface.sct is None:
+        surface.sct = mss.mss()
+    surface.screen_slot.put(capture_screen_without_overlay(surface, surface.sct))
+    surface.capture_ms = (time.perf_counter() - t0) * 1000
 
-    smooth_cx = target_cx
-    smooth_cy = target_cy
+# === Stage: blur + composite (one per monitor) ===
+def composite_step(surface):
+    seq, screen_np = surface.screen_slot.wait_newer(surface.composite_seq, timeout=0.1)
+    if screen_np is None:
+        return False
+    surface.composite_seq = seq
+    surface.screen_taken.set()
+    _, gaze = gaze_slot.peek()
+    active = scheduler.is_active(surface.index)
+    t0 = time.perf_counter()
+    if gaze is not None and active and presence.state == PRESENT:
+        gx, gy, t_gaze = gaze
+        cx, cy = desktop.to_local(surface.index, gx, gy)
+    else:
+        cx = cy = None
+        telemetry.count("monitor.idle_refreshes")
+    if surface.quality != surface.blur_engine.quality:
+        surface.set_quality(surface.quality)
+    pool = surface.frame_pool
+    process_frame(surface, screen_np, cx, cy, pool.back(), controller.level.capture_scale)
+    dropped = pool.dropped
+    pool.publish()
+    # A published frame the display never picked up
+    telemetry.count("display.dropped_frames", pool.dropped - dropped)
+    surface.static = presence.idle
+    startup.mark("first_blurred_frame")
+    if cx is not None and startup.mark("first_gaze_frame"):
+        print(f"startup (ms since launch): {startup.report()}")
+    if not active:
+        scheduler.grabbed(surface.index, time.perf_counter(), surface.tile_blur.last_dirty > 0)
+        return
+    if cx is None:
+        # No clear window this frame (no gaze, nobody present, or more than
+        # one face): no gaze latency to measure
+        return
+    # Webcam frame to screen: add half the Tk polling interval for display
+    latency = time.perf_counter() - t_gaze + 0.0025
+    gaze_filter.horizon = min(max_horizon, 0.9 * gaze_filter.horizon + 0.1 * latency)
+    telemetry.record("gaze.latency", latency * 1000)
 
-    screen_np = capture_screen_without_overlay()
-    processed_np = fast_blur_except_circle(screen_np, smooth_cx, smooth_cy)
+    # Capture and composite overlap, so the slower of the two sets the frame
+    # time. Only the gazed monitor runs at frame rate, so it alone drives quality.
+    frame_ms = max((time.perf_counter() - t0) * 1000, surface.capture_ms)
+    if controller.observe(frame_ms):
+        apply_quality(controller.level)
+        telemetry.count("quality.changes")
+
+# === Display (Tk thread) ===
+def update():
+    for surface in surfaces:
+        frame = surface.frame_pool.latest()
+        if frame is not None:
+            with telemetry.span("present"):
+                surface.pil_frame.frombytes(frame, "raw", "BGRX")
+                surface.photo_img.paste(surface.pil_frame)
+            telemetry.count("display.frames")
 
-    final_img = Image.fromarray(processed_np)
-    photo_img = ImageTk.PhotoImage(final_img)
-    label.configure(image=photo_img)
+    root.after(50 if presence.idle else 5, update)
 
-    root.after(100, update)
+pipeline = Pipeline()
+pipeline.add("gaze", gaze_step, init=gaze_init)
+for surface in surfaces:
+    pipeline.add(f"capture.{surface.index + 1}", lambda s=surface: capture_step(s))
+    pipeline.add(f"composite.{surface.index + 1}", lambda s=surface: composite_step(s))
+pipeline.start()
 
 update()
 root.mainloop()
-cap.release()
+pipeline.shutdown()
+if blur_pool is not None:
+    blur_pool.shutdown(wait=False)
+telemetry.close()
+camera_ready.result().release()
+init_pool.shutdown(wait=False)
+print(f"presence: {presence.report()}")
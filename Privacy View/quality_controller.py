@@ -0,0 +1,102 @@
+from collections import namedtuple
+from blur_engine import REFERENCE_SIGMA, level_sigma
+
+# One rung of the quality ladder. interval_ms is a multiple of the target
+# frame interval (1.0 = run at the target FPS).
+QualityLevel = namedtuple("QualityLevel", "quality capture_scale infer_every interval_ms")
+
+# Best first. Every blur quality reaches the same privacy sigma; the cheaper
+# rungs trade off clear-window sharpness, gaze cadence and refresh rate.
+DEFAULT_LADDER = [
+    ("high", 1.0, 2, 1.0),
+    ("high", 1.0, 3, 1.0),
+    ("medium", 1.0, 3, 1.0),
+    ("low", 1.0, 4, 1.0),
+    ("low", 0.75, 5, 1.5),
+    ("low", 0.5, 6, 2.0),
+]
+
+
+class PrivacyFloor:
+    # Limits the controller may never cross, however far behind it falls.
+    # The blur limit is checked against each level's measured effective
+    # sigma (quality and capture scale together), with the same 10 %
+    # tolerance as blur_engine.is_unreadable.
+    def __init__(self, min_sigma=REFERENCE_SIGMA, max_interval_ms=250, max_infer_every=6, min_capture_scale=0.5,
+                 tolerance=0.9):
+        self.min_sigma = min_sigma
+        self.tolerance = tolerance
+        self.max_interval_ms = max_interval_ms
+        self.max_infer_every = max_infer_every
+        self.min_capture_scale = min_capture_scale
+
+    def allows(self, level, sigma=REFERENCE_SIGMA):
+        # sigma: the blur the engines are configured for
+        effective = level_sigma(level.quality, level.capture_scale, sigma)
+        return (effective >= self.min_sigma * self.tolerance and level.interval_ms <= self.max_interval_ms
+                and level.infer_every <= self.max_infer_every
+                and level.capture_scale >= self.min_capture_scale)
+
+
+class QualityController:
+    # Feeds on measured frame times and walks the ladder to keep them within
+    # the frame budget. Steps down after `down_after` consecutive frames over
+    # budget, steps up only after `up_after` frames with `headroom` to spare,
+    # and ignores the first `cooldown` frames after each change, so one slow
+    # frame or a brief lull doesn't make quality oscillate.
+    def __init__(self, target_fps=30, floor=None, ladder=DEFAULT_LADDER, start=1, sigma=REFERENCE_SIGMA,
+                 down_after=10, up_after=90, headroom=0.7, cooldown=30, smoothing=0.1):
+        self.budget_ms = 1000.0 / target_fps
+        self.floor = floor or PrivacyFloor()
+        levels = [QualityLevel(q, s, n, self.budget_ms * k) for q, s, n, k in ladder]
+        self.levels = [lv for lv in levels if self.floor.allows(lv, sigma)]
+        if not self.levels:
+            raise ValueError("No quality level satisfies the privacy floor")
+        self.index = min(start, len(self.levels) - 1)
+        self.down_after = down_after
+        self.up_after = up_after
+        self.headroom = headroom
+        self.cooldown = cooldown
+        self.smoothing = smoothing
+
+        self.frame_ms = None
+        self._over = 0
+        self._under = 0
+        self._hold = 0
+        self.changes = 0
+
+    @property
+    def level(self):
+        return self.levels[self.index]
+
+    def observe(self, frame_ms):
+        # Returns True when the level changed and the caller should re-apply it
+        a = self.smoothing
+        self.frame_ms = frame_ms if self.frame_ms is None else a * frame_ms + (1 - a) * self.frame_ms
+        if self._hold > 0:
+            self._hold -= 1
+            return False
+
+        if self.frame_ms > self.budget_ms:
+            self._over += 1
+            self._under = 0
+        elif self.frame_ms < self.budget_ms * self.headroom:
+            self._under += 1
+            self._over = 0
+        else:
+            self._over = self._under = 0
+
+        if self._over >= self.down_after and self.index < len(self.levels) - 1:
+            return self._move(+1)
+        if self._under >= self.up_after and self.index > 0:
+            return self._move(-1)
+        return False
+
+    def _move(self, step):
+        self.index += step
+        self._over = self._under = 0
+        self._hold = self.cooldown
+        # Measurements taken at the old level no longer apply
+        self.frame_ms = None
+        self.changes += 1
+        return True
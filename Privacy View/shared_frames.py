@@ -0,0 +1,198 @@
+import contextlib
+import multiprocessing
+import platform
+import time
+from multiprocessing import shared_memory
+import numpy as np
+
+# Cross-process counterparts of LatestSlot / FramePool for the multi-process
+# overlay. Everything lives in multiprocessing.shared_memory, so frames and
+# gaze samples are never pickled: both structures are single-writer
+# seqlocks. A reader checks the sequence number again after using the data
+# and drops anything the writer touched in the meantime.
+#
+# A seqlock relies on the other process seeing the stores in program order.
+# x86-64 guarantees that (stores are not reordered with stores, nor loads
+# with loads), so there the header is read and written without a lock.
+# ARM64 does not: without barriers a reader could see a new sequence number
+# before the data, or miss the -1 invalidation. Python has no fences, so on
+# ARM64 (the Snapdragon target) and other CPUs the header accesses and the
+# gaze sample go under a small process-shared lock, whose acquire/release
+# orders them. Frame data is still copied outside the lock.
+STRONGLY_ORDERED = platform.machine().lower() in ("x86_64", "amd64", "x86", "i386", "i686")
+
+_HEADER_ALIGN = 64
+
+
+def _header_lock(lock, create):
+    # Created with the spawn context so it can be handed to spawned workers
+    # in spec(); a no-op on x86
+    if lock is None and create and not STRONGLY_ORDERED:
+        lock = multiprocessing.get_context("spawn").Lock()
+    return lock
+
+
+class SharedFrameRing:
+    # `slots` frame buffers with one writer and any number of readers.
+    # Header: int64 [latest_seq, slot_seq * slots] + float64 [stamp * slots].
+    # The writer fills the slot after the newest one, so with 3 slots a reader
+    # has two full frame times to finish with the frame it picked up.
+    def __init__(self, shape, slots=3, name=None, create=False, dtype=np.uint8, lock=None):
+        self.shape = tuple(shape)
+        self.slots = slots
+        self.dtype = np.dtype(dtype)
+        frame_bytes = int(np.prod(self.shape)) * self.dtype.itemsize
+        header = -(-16 * (slots + 1) // _HEADER_ALIGN) * _HEADER_ALIGN
+        self.shm = shared_memory.SharedMemory(name=name, create=create,
+                                              size=header + frame_bytes * slots if create else 0)
+        self.name = self.shm.name
+        self._seqs = np.ndarray(slots + 1, np.int64, self.shm.buf)
+        self._stamps = np.ndarray(slots, np.float64, self.shm.buf, offset=8 * (slots + 1))
+        self._frames = np.ndarray((slots,) + self.shape, self.dtype, self.shm.buf, offset=header)
+        if create:
+            self._seqs[:] = 0
+            self._stamps[:] = np.nan
+        self.lock = _header_lock(lock, create)
+        self._header = self.lock or contextlib.nullcontext()
+        self._writing = None
+        self.torn = 0
+
+    def spec(self):
+        # Picklable description for attaching from another process
+        return {"name": self.name, "shape": self.shape, "slots": self.slots, "dtype": self.dtype.str,
+                "lock": self.lock}
+
+    @classmethod
+    def attach(cls, spec):
+        return cls(spec["shape"], spec["slots"], name=spec["name"], dtype=spec["dtype"], lock=spec["lock"])
+
+    # === Writer ===
+    def back(self):
+        # Slot to render the next frame into, in place
+        with self._header:
+            seq = int(self._seqs[0]) + 1
+            slot = seq % self.slots
+            self._seqs[1 + slot] = -1
+        self._writing = seq
+        return self._frames[slot]
+
+    def commit(self, stamp=np.nan):
+        # stamp: per-frame float for the reader (e.g. gaze time, NaN if none)
+        seq, self._writing = self._writing, None
+        slot = seq % self.slots
+        with self._header:
+            self._stamps[slot] = stamp
+            self._seqs[1 + slot] = seq
+            self._seqs[0] = seq
+        return seq
+
+    def put(self, frame, stamp=np.nan):
+        np.copyto(self.back(), frame)
+        return self.commit(stamp)
+
+    # === Readers ===
+    @property
+    def seq(self):
+        return int(self._seqs[0])
+
+    def latest(self, last_seq):
+        # Returns (seq, frame view, stamp) for the newest frame after last_seq,
+        # or (last_seq, None, nan). The view is only good while valid(seq).
+        with self._header:
+            seq = int(self._seqs[0])
+            if seq <= last_seq:
+                return last_seq, None, np.nan
+            slot = seq % self.slots
+            stamp = float(self._stamps[slot])
+        return seq, self._frames[slot], stamp
+
+    def valid(self, seq):
+        # False once the writer has started reusing the slot holding seq
+        with self._header:
+            current = int(self._seqs[1 + seq % self.slots])
+        if current == seq:
+            return True
+        self.torn += 1
+        return False
+
+    def read_into(self, last_seq, out):
+        # Copying read; returns (seq, stamp) or (last_seq, None) if nothing new
+        # (or the copy was torn)
+        seq, frame, stamp = self.latest(last_seq)
+        if frame is None:
+            return last_seq, None
+        np.copyto(out, frame)
+        if not self.valid(seq):
+            return last_seq, None
+        return seq, stamp
+
+    def wait_newer(self, last_seq, out, timeout=None, poll=0.001):
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        while True:
+            seq, stamp = self.read_into(last_seq, out)
+            if stamp is not None or (deadline is not None and time.perf_counter() >= deadline):
+                return seq, stamp
+            time.sleep(poll)
+
+    def close(self):
+        # Drop our views before closing the mapping
+        self._seqs = self._stamps = self._frames = None
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
+
+
+class SharedGazeSlot:
+    # Newest gaze sample: float64 [seq, x, y, t]. seq is odd while the writer
+    # is mid-update. t doubles as the gaze process heartbeat.
+    def __init__(self, name=None, create=False, lock=None):
+        self.shm = shared_memory.SharedMemory(name=name, create=create, size=32 if create else 0)
+        self.name = self.shm.name
+        self._values = np.ndarray(4, np.float64, self.shm.buf)
+        if create:
+            self._values[:] = (0.0, 0.0, 0.0, -np.inf)
+        self.lock = _header_lock(lock, create)
+        self._sample = self.lock or contextlib.nullcontext()
+
+    def spec(self):
+        return {"name": self.name, "lock": self.lock}
+
+    @classmethod
+    def attach(cls, spec):
+        return cls(name=spec["name"], lock=spec["lock"])
+
+    def put(self, x, y, t):
+        v = self._values
+        with self._sample:
+            seq = v[0]
+            v[0] = seq + 1
+            v[1], v[2], v[3] = x, y, t
+            v[0] = seq + 2
+
+    def get(self, retries=100):
+        # Returns (seq, x, y, t); (0, 0, 0, -inf) before the first put
+        v = self._values
+        for _ in range(retries):
+            with self._sample:
+                seq = v[0]
+                if seq % 2:
+                    continue
+                x, y, t = float(v[1]), float(v[2]), float(v[3])
+                if v[0] == seq:
+                    return int(seq), x, y, t
+        return 0, 0.0, 0.0, -np.inf
+
+    def fresh(self, max_age, now=None):
+        # Gaze to use for the clear window, or None when the gaze process has
+        # not reported within max_age seconds (dead, hung or not started)
+        _, x, y, t = self.get()
+        now = time.perf_counter() if now is None else now
+        return (x, y, t) if now - t <= max_age else None
+
+    def close(self):
+        self._values = None
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
@@ -0,0 +1,177 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+
+# Stage timings and counters for the running overlay. Spans go into a
+# fixed-size ring buffer per stage, so the snapshot always describes the most
+# recent frames. Disabled telemetry hands out one shared no-op span, so the
+# instrumented code pays an attribute check and nothing else.
+
+HIST_EDGES_MS = [0, 1, 2, 5, 10, 20, 33, 50, 100, 200, 500, float("inf")]
+
+
+class Ring:
+    def __init__(self, size=1024):
+        self._values = np.zeros(size, dtype=np.float64)
+        self._n = 0
+
+    def add(self, value):
+        self._values[self._n % len(self._values)] = value
+        self._n += 1
+
+    def values(self):
+        return self._values[:min(self._n, len(self._values))].copy()
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class _Span:
+    __slots__ = ("telemetry", "name", "t0")
+
+    def __init__(self, telemetry, name):
+        self.telemetry = telemetry
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.telemetry.record(self.name, (time.perf_counter() - self.t0) * 1000)
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Telemetry:
+    def __init__(self, enabled=False, ring_size=1024):
+        self.enabled = enabled
+        self.ring_size = ring_size
+        self._rings = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+        self._started = time.time()
+        self._stop = threading.Event()
+        self._server = None
+        self._sources = {}
+
+    # === Recording ===
+    def span(self, name):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def record(self, name, ms):
+        if not self.enabled:
+            return
+        with self._lock:
+            ring = self._rings.get(name)
+            if ring is None:
+                ring = self._rings[name] = Ring(self.ring_size)
+            ring.add(ms)
+
+    def count(self, name, n=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def set_enabled(self, enabled):
+        self.enabled = enabled
+
+    def add_source(self, name, fn):
+        # fn() -> JSON-able dict, included in every snapshot under `name`
+        self._sources[name] = fn
+
+    # === Reporting ===
+    def snapshot(self):
+        with self._lock:
+            rings = {name: ring.values() for name, ring in self._rings.items()}
+            counters = dict(self._counters)
+        stages = {}
+        for name, values in rings.items():
+            if not len(values):
+                continue
+            hist, _ = np.histogram(values, bins=HIST_EDGES_MS)
+            stages[name] = {
+                "n": int(len(values)),
+                "mean_ms": round(float(values.mean()), 3),
+                "p50_ms": round(float(np.percentile(values, 50)), 3),
+                "p95_ms": round(float(np.percentile(values, 95)), 3),
+                "max_ms": round(float(values.max()), 3),
+                "hist": dict(zip([f"<{e:g}" for e in HIST_EDGES_MS[1:]], hist.tolist())),
+            }
+        return {
+            "time": round(time.time(), 3),
+            "uptime_s": round(time.time() - self._started, 1),
+            "enabled": self.enabled,
+            "counters": counters,
+            "stages": stages,
+            **{name: fn() for name, fn in self._sources.items()},
+        }
+
+    def write_jsonl(self, path, interval=5.0):
+        # Appends one snapshot per interval while enabled
+        def _loop():
+            while not self._stop.wait(interval):
+                if self.enabled:
+                    with open(path, "a") as f:
+                        f.write(json.dumps(self.snapshot()) + "\n")
+        threading.Thread(target=_loop, name="telemetry-jsonl", daemon=True).start()
+
+    def serve(self, port=8765):
+        # Local-only stats endpoint:
+        #   GET /stats    -> JSON snapshot
+        #   GET /enable   -> turn recording on
+        #   GET /disable  -> turn recording off
+        telemetry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/enable":
+                    telemetry.set_enabled(True)
+                elif self.path == "/disable":
+                    telemetry.set_enabled(False)
+                elif self.path != "/stats":
+                    self.send_error(404)
+                    return
+                body = json.dumps(telemetry.snapshot()).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        threading.Thread(target=self._server.serve_forever, name="telemetry-http", daemon=True).start()
+        return self._server.server_address[1]
+
+    def close(self):
+        self._stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+
+if __name__ == "__main__":
+    # Per-span overhead, disabled vs enabled
+    n = 200000
+    for enabled in (False, True):
+        tel = Telemetry(enabled=enabled)
+        t0 = time.perf_counter()
+        for _ in range(n):
+            with tel.span("stage"):
+                pass
+        print(f"enabled={enabled}: {(time.perf_counter() - t0) / n * 1e9:.0f} ns/span")
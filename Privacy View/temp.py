@@ -1,6 +1,5 @@
 from PyQt5 import QtWidgets, QtGui, QtCore, QtOpenGL
 from OpenGL.GL import *
-import numpy as np
 import cv2
 import mss
 import mediapipe as mp
@@ -9,6 +8,9 @@ import sys
 import time
 import win32gui
 import win32con
+from frame_pool import grab_bgra
+from gaze_filter import make_filter
+from gl_backend import GLStreamCompositor
 
 # === MediaPipe Setup ===
 mp_face_mesh = mp.solutions.face_mesh
@@ -20,8 +22,9 @@ monitor = sct.monitors[1]
 screen_width, screen_height = monitor['width'], monitor['height']
 
 # === Smooth Tracking ===
+# One-Euro filter predicting ahead by the measured webcam-to-paint latency
 smooth_x, smooth_y = screen_width // 2, screen_height // 2
-alpha = 0.2
+gaze_filter = make_filter("one_euro", min_cutoff=1.0, beta=0.01)
 
 
 class GLOverlay(QtOpenGL.QGLWidget):
@@ -42,7 +45,9 @@ class GLOverlay(QtOpenGL.QGLWidget):
 
         self.capture = cv2.VideoCapture(0)
         self.radius = 130
-        self.texture_id = None  # Will be initialized in initializeGL
+        self.stream = None  # Needs the GL context, created in initializeGL
+        self.frame_time = time.perf_counter()
+        self.paint_time = self.frame_time
 
         self.hwnd = None
         QtCore.QTimer.singleShot(1000, self.get_hwnd)  # Delay to ensure window is visible
@@ -55,9 +60,13 @@ class GLOverlay(QtOpenGL.QGLWidget):
         win32gui.EnumWindows(_enum_handler, None)
 
     def initializeGL(self):
-        self.texture_id = glGenTextures(1)
+        # Texture, PBOs and shaders are allocated once; blur and the clear
+        # window are drawn on the GPU from the raw capture
+        self.stream = GLStreamCompositor(screen_width, screen_height, radius=self.radius)
 
-    def get_blurred_screen(self):
+    def grab_screen(self):
+        # Returns the capture and whether the gaze is tracked; without a
+        # camera frame nothing may be shown clearly
         global smooth_x, smooth_y
 
         # Hide overlay before capture
@@ -66,7 +75,7 @@ class GLOverlay(QtOpenGL.QGLWidget):
                                   win32con.SWP_NOSIZE | win32con.SWP_NOZORDER)
             time.sleep(0.005)
 
-        img = sct.grab(monitor)
+        img = grab_bgra(sct, monitor)
 
         # Show overlay again
         if self.hwnd:
@@ -74,8 +83,10 @@ class GLOverlay(QtOpenGL.QGLWidget):
                                   win32con.SWP_NOSIZE | win32con.SWP_NOZORDER)
 
         ret, frame = self.capture.read()
+        self.frame_time = time.perf_counter()
         if not ret:
-            return np.zeros((screen_height, screen_width, 3), dtype=np.uint8)
+            gaze_filter.reset()
+            return img, False
 
         frame = cv2.flip(frame, 1)
         rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
@@ -90,41 +101,34 @@ class GLOverlay(QtOpenGL.QGLWidget):
             eye_y = (left_eye.y + right_eye.y) / 2
             target_x = int(eye_x * screen_width)
             target_y = int(eye_y * screen_height)
+            fx, fy = gaze_filter.update(self.frame_time, target_x, target_y)
+            smooth_x, smooth_y = int(fx), int(fy)
+        else:
+            gaze_filter.reset()
+            smooth_x, smooth_y = target_x, target_y
 
-        smooth_x = int(alpha * target_x + (1 - alpha) * smooth_x)
-        smooth_y = int(alpha * target_y + (1 - alpha) * smooth_y)
-
-        img_np = np.array(img)
-        img_rgb = cv2.cvtColor(img_np, cv2.COLOR_BGRA2RGB)
-        blurred = cv2.GaussianBlur(img_rgb, (45, 45), 0)
-
-        mask = np.zeros((screen_height, screen_width), dtype=np.uint8)
-        cv2.circle(mask, (smooth_x, smooth_y), self.radius, 255, -1)
-        mask_3ch = np.stack([mask] * 3, axis=-1)
-        result = np.where(mask_3ch == 255, img_rgb, blurred)
-
-        return result
+        return img, True
 
     def paintGL(self):
-        if self.texture_id is None:
+        if self.stream is None:
             return
 
-        frame = self.get_blurred_screen()
+        frame, tracked = self.grab_screen()
 
         glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
-        glEnable(GL_TEXTURE_2D)
-        glBindTexture(GL_TEXTURE_2D, self.texture_id)
-        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGB, screen_width, screen_height, 0, GL_RGB, GL_UNSIGNED_BYTE, frame.tobytes())
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
-
-        glBegin(GL_QUADS)
-        glTexCoord2f(0, 0); glVertex2f(-1, 1)
-        glTexCoord2f(1, 0); glVertex2f(1, 1)
-        glTexCoord2f(1, 1); glVertex2f(1, -1)
-        glTexCoord2f(0, 1); glVertex2f(-1, -1)
-        glEnd()
-
-        glDisable(GL_TEXTURE_2D)
+        self.stream.radius = self.radius
+        self.stream.upload(frame)
+        if tracked:
+            self.stream.draw(smooth_x, smooth_y)
+        else:
+            # No camera frame: the window goes off screen, all of it is blurred
+            self.stream.draw(-screen_width, -screen_height)
+
+        # The PBO ping-pong shows the previous upload, one paint interval late
+        now = time.perf_counter()
+        latency = (now - self.frame_time) + (now - self.paint_time)
+        self.paint_time = now
+        gaze_filter.horizon = min(0.2, 0.9 * gaze_filter.horizon + 0.1 * latency)
 
 
 if __name__ == "__main__":